@@ -12,6 +12,19 @@ import os
 
 from utils import *
 from learning import *
-from grid_world import GridWorld
+from grid_world import GridWorld, slip_action_probabilities
 from agent import Agent
+from replay import ReplayBuffer
+from model import TabularModel
+from priority_queue import IndexedMaxHeap
+from alias import AliasTable
+from async_learning import asynchronous_Q_learning
+from checkpoint import save_checkpoint, load_checkpoint, load_checkpoint_metadata
+from policy import GreedyPolicy
+from result_cache import ResultCache
+from progress import ProgressReporter
+from trajectory import reconstruct_trajectory
+from multi_agent import MultiAgentGridWorld, multi_agent_epsilon_greedy_selection, multi_agent_Q_learning_episode
+from multi_resolution import coarsen_grid_world, upsample_q_table, multi_resolution_Q_learning
+from streaming import Transition, stream_episode, batch_transitions, q_learning_stage, q_lambda_stage, replay_stage, callback_stage, consume_stream
 from typing import Tuple
@@ -27,11 +27,21 @@ def main():
         agent_start = (0, 0) # None = random, yet to account for random position in graphing though!
 
         # Agent Possible Actions
-        actions = {'up': 0, 'down': 1, 'left': 2, 'right': 3}
+        actions = environment.get_actions() # {'up': 0, 'down': 1, 'left': 2, 'right': 3} in 2-D, grows by two actions per extra dimension
+
+        # Stochastic Dynamics Settings
+        slip_probability = 0.0 # Chance an action slips into a perpendicular direction, 0 keeps moves deterministic
+        wind_action = None # Action the wind pushes towards (e.g. 'down'), None disables wind
+        wind_probability = 0.0 # Chance the wind action is executed instead of the chosen one
+        action_probabilities = None # Executed action probabilities per chosen action, None for deterministic dynamics
+        if (slip_probability > 0) or (wind_action is not None and wind_probability > 0):
+            action_probabilities = slip_action_probabilities(len(environment.get_grid_dim()), slip_probability, actions.get(wind_action), wind_probability)
+            environment.set_stochastic_dynamics(action_probabilities)
 
         # Learning Settings
-        learning_algorithms = {'Q-Learning': Q_learning_episode, 'Q-Lambda': Q_lambda_episode}
-        enable_learning_algorithms = [True, True] # Enable Q-Learning, Q-Lambda, etc...
+        learning_algorithms = {'Q-Learning': Q_learning_episode, 'Q-Lambda': Q_lambda_episode, 'Dyna-Q': Dyna_Q_episode,
+                               'Prioritized-Sweeping': prioritized_sweeping_episode, 'N-Step-Q-Learning': n_step_Q_learning_episode}
+        enable_learning_algorithms = [True, True, False, False, False] # Enable Q-Learning, Q-Lambda, Dyna-Q, Prioritized-Sweeping, N-Step-Q-Learning, etc...
 
         # Q-learning Settings
         episodes = 300
@@ -42,10 +52,42 @@ def main():
         # Q-Lambda Settings (uses ^^^ settings)
         lambda_value = 0.5 # Lambda value for Q-Lambda learning
 
+        # N-Step Q-learning Settings (uses Q-learning settings)
+        n_step = 4 # Rewards summed before bootstrapping, each step updates the Q-value from n steps ago
+
+        # Dyna-Q Settings (uses Q-learning settings)
+        planning_steps = 10 # Simulated backups per real step
+        replay_capacity = 10000 # Transitions kept in the replay memory
+
+        # Prioritized Sweeping Settings (uses Q-learning settings and planning_steps)
+        sweeping_theta = 1e-4 # Minimum TD error for a state-action pair to be queued
+
+        # Multi-Resolution Warm Start Settings (uses Q-learning settings)
+        warm_start_factors = None # e.g. (4, 2) first trains grids downsampled 4x then 2x and starts from their upsampled Q-table, None disables it
+        warm_start_episodes = 50 # Q-learning episodes per downsampled level
+
+        # Asynchronous Q-learning Settings (uses Q-learning settings)
+        enable_asynchronous_training = False # Train one shared Q-table with several worker processes
+        asynchronous_workers = os.cpu_count() # Number of worker processes, each runs `episodes` episodes
+        asynchronous_lock_mode = 'none' # 'none' for lock-free (Hogwild-style) writes, 'striped' for striped locks
+
+        # Multi-Agent Q-learning Settings (uses Q-learning settings)
+        enable_multi_agent_training = False # Train many agents moving at the same time on one shared grid
+        multi_agent_count = 4 # Number of agents, all start at random cells every episode
+        multi_agent_shared_q_table = True # One Q-table for every agent, or one Q-table per agent
+
         # Enable recording of action sequence, total rewards, steps taken, and Q-table history
         enable_record_set_1 = [True, True, True, True] # Applies to first and last episode
         enable_record_set_2 = [True, True, True, True] # Applies to everything between first and last episode
         
+        # Progress Settings
+        progress_interval = 1.0 # Seconds between progress reports, 0 reports every episode
+        metrics_feed_file = None # JSON-lines file the progress reports are appended to, None disables it
+        metrics_http_port = None # Local port serving the latest progress report as JSON for dashboards, None disables it
+
+        # Evaluation Settings
+        evaluate_greedy_policy = True # Follow each trained greedy policy from every start state and report its success rate and path lengths
+
         # Plotting Settings
         fps = 600 # Frames per second for the plot animation, disables animation at 0
 
@@ -53,6 +95,8 @@ def main():
         enable_episode_plots = True # Enable episode plots such as rewards/steps over time
         enable_first_action_sequence_plots = True
         enable_last_action_sequence_plots = True
+        animation_export_format = None # Write the first/last action sequences to 'gif' or 'mp4' files without opening a window, None disables it
+        animation_max_frames = 600 # Maximum frames per exported animation, longer sequences are decimated
 
         # Summarize training settings for display purposes
         training_settings_summary = f"{grid_length}x{grid_width} Grid World\nEpisodes: {episodes}, Alpha: {alpha}, Gamma: {gamma}, Epsilon: {epsilon}\nRewards: {reward_vector}"
@@ -62,31 +106,104 @@ def main():
         # File Saving Settings
         save_training_data = True # Enable saving of training data
         save_directory = "training_data" # Directory to save the CSV files
+        save_greedy_policy = True # Export each trained Q-table as a precomputed greedy policy (memory-mappable .npy files)
+
+        # Result Cache Settings
+        random_seed = None # Seed for NumPy's random generator before each algorithm, runs are only cached when it is set
+        enable_result_cache = True # Reuse stored results of runs with identical settings and code instead of training again
+        result_cache_directory = os.path.join(save_directory, "cache") # Directory to store the cached results in
+        result_cache_max_bytes = 500 * 1024**2 # Maximum size of the result cache, least recently used results are evicted first
+
+        # Checkpoint Settings
+        checkpoint_interval = 50 # Episodes between checkpoints, disables checkpointing at 0
+        resume_from_checkpoint = True # Continue from the last checkpoint of each algorithm if its settings match
+        checkpoint_directory = os.path.join(save_directory, "checkpoints") # Directory to save the checkpoint files
 
-        # Ensure the directory exists
+        # Ensure the directories exist
         if not os.path.exists(save_directory):
             os.makedirs(save_directory)
+        if (checkpoint_interval > 0) and not os.path.exists(checkpoint_directory):
+            os.makedirs(checkpoint_directory)
+
+        # Without a seed runs are not reproducible, so there is nothing to reuse
+        result_cache = ResultCache(result_cache_directory, result_cache_max_bytes) if (enable_result_cache and random_seed is not None) else None
 
         for algorithm_name, algorithm_function in learning_algorithms.items():
 
             algorithm_settings_summary = f"Trained w/ {algorithm_name} and Epsilon-Greedy Selection"
 
             # Initialize Q-table with zeros
-            q_table = np.zeros((grid_length, grid_width, len(actions)), dtype = float) # Initialize Q-table with zeros
+            q_table = np.zeros((environment.get_num_states(), len(actions)), dtype = float) # Initialize Q-table with zeros, one row per flat state index
 
             training_data = []
+
+            replay_buffer = ReplayBuffer(replay_capacity) # Only used by Dyna-Q, persists across episodes
+            model = TabularModel(environment.get_num_states(), len(actions)) # Only used by Prioritized-Sweeping, persists across episodes
+            queue = IndexedMaxHeap(environment.get_num_states()*len(actions))
+            learner_components = {'Dyna-Q': {'replay_buffer': replay_buffer},
+                                  'Prioritized-Sweeping': {'model': model, 'queue': queue}}.get(algorithm_name, {})
             
             enable_record = enable_record_set_1
             
             if enable_learning_algorithms[list(learning_algorithms.keys()).index(algorithm_name)]:
-                for episode in range(episodes):
+                # Checkpoints only resume runs with identical settings
+                checkpoint_file = os.path.join(checkpoint_directory, f"checkpoint_{algorithm_name}.npz")
+                checkpoint_metadata = (f"{training_settings_summary}\n{agent_settings_summary}\n{algorithm_name}, Lambda: {lambda_value}, "
+                                       f"N-Step: {n_step}, Planning Steps: {planning_steps}, Replay Capacity: {replay_capacity}, Theta: {sweeping_theta}, "
+                                       f"Records: {enable_record_set_1}, {enable_record_set_2}, "
+                                       f"Warm Start: {warm_start_factors} x {warm_start_episodes}, "
+                                       f"Slip: {slip_probability}, Wind: {wind_action} {wind_probability}")
+                start_episode = 0
+
+                if random_seed is not None:
+                    np.random.seed(random_seed)
+
+                cache_key, cached_result = None, None
+                if result_cache is not None:
+                    run_config = {'grid_dim': (grid_length, grid_width), 'goal': environment.get_goal(), 'reward_vector': reward_vector,
+                                  'agent_start': agent_start, 'algorithm': algorithm_name, 'episodes': episodes,
+                                  'alpha': alpha, 'gamma': gamma, 'lambda': lambda_value, 'n_step': n_step,
+                                  'selection': {'function': decaying_epsilon_greedy_Q_selection.__name__, 'epsilon': epsilon, 'decay': 0.80},
+                                  'planning_steps': planning_steps, 'replay_capacity': replay_capacity, 'theta': sweeping_theta,
+                                  'warm_start': (warm_start_factors, warm_start_episodes),
+                                  'slip': slip_probability, 'wind': (wind_action, wind_probability),
+                                  'records': (enable_record_set_1, enable_record_set_2), 'seed': random_seed}
+                    cache_key = result_cache.make_key(run_config)
+                    cached_result = result_cache.get(cache_key)
+
+                if cached_result is not None:
+                    q_table[:] = cached_result['q_table']
+                    training_data = cached_result['training_data']
+                    start_episode = episodes # Nothing left to train
+                    print(f"Loaded {algorithm_name} results from the result cache.")
+                elif resume_from_checkpoint and os.path.exists(checkpoint_file):
+                    if load_checkpoint_metadata(checkpoint_file) == checkpoint_metadata:
+                        checkpoint = load_checkpoint(checkpoint_file, learner_components)
+                        q_table[:] = checkpoint['q_table']
+                        training_data = checkpoint['training_data']
+                        start_episode = checkpoint['episode']
+                        np.random.set_state(checkpoint['random_state'])
+                        print(f"Resuming {algorithm_name} training from checkpoint after {start_episode} of {episodes} episodes.")
+                    else:
+                        print(f"Ignoring {algorithm_name} checkpoint with different settings.")
+
+                if (warm_start_factors is not None) and (start_episode == 0):
+                    print(f"Warm starting {algorithm_name} on grids downsampled by {warm_start_factors}...", end=' ')
+                    q_table[:], _, warm_start_steps = multi_resolution_Q_learning(
+                        environment, warm_start_factors, warm_start_episodes, epsilon, alpha, gamma, agent_start)
+                    print(f"Completed in {sum(steps.sum() for steps in warm_start_steps)} steps!!!")
+
+                progress = ProgressReporter(f"Training {algorithm_name}", episodes, progress_interval,
+                                            jsonl_filename=metrics_feed_file, http_port=metrics_http_port)
+
+                checkpointed_episodes = start_episode # Training data records already in the checkpoint's segments
+                for episode in range(start_episode, episodes):
                     environment.reset()
                     if (episode == 0) or (episode == episodes - 1):
                         enable_record = enable_record_set_1
                     else:
                         enable_record = enable_record_set_2
 
-                    print(f"Training {algorithm_name} agent Episode {episode + 1} of {episodes}...", end=' ')
                     # Run a single episode of the learning algorithm
                     action_sequence, total_reward, steps_taken, q_table_history = None, None, None, None
                     if algorithm_name == 'Q-Learning':
@@ -99,12 +216,36 @@ def main():
                             environment, None, actions, q_table, 
                             decaying_epsilon_greedy_Q_selection, {'q_table': q_table, 'epsilon': epsilon, 'decay': 0.80, 'episode': episodes},
                             alpha, gamma, lambda_value, agent_start, enable_record)
+                    elif algorithm_name == 'Dyna-Q':
+                        action_sequence, total_reward, steps_taken, q_table_history = algorithm_function(
+                            environment, None, actions, q_table, 
+                            decaying_epsilon_greedy_Q_selection, {'q_table': q_table, 'epsilon': epsilon, 'decay': 0.80, 'episode': episodes},
+                            alpha, gamma, replay_buffer, planning_steps, agent_start, enable_record)
+                    elif algorithm_name == 'Prioritized-Sweeping':
+                        action_sequence, total_reward, steps_taken, q_table_history = algorithm_function(
+                            environment, None, actions, q_table, 
+                            decaying_epsilon_greedy_Q_selection, {'q_table': q_table, 'epsilon': epsilon, 'decay': 0.80, 'episode': episodes},
+                            alpha, gamma, model, queue, planning_steps, sweeping_theta, agent_start, enable_record)
+                    elif algorithm_name == 'N-Step-Q-Learning':
+                        action_sequence, total_reward, steps_taken, q_table_history = algorithm_function(
+                            environment, None, actions, q_table, 
+                            decaying_epsilon_greedy_Q_selection, {'q_table': q_table, 'epsilon': epsilon, 'decay': 0.80, 'episode': episodes},
+                            alpha, gamma, n_step, agent_start, enable_record)
                     
                     training_data.append([action_sequence, total_reward, steps_taken, q_table_history])
-                    print(f"Completed!!! Total Reward: {total_reward}, Steps Taken: {steps_taken}.")
+                    progress.update(episode, total_reward, steps_taken)
 
+                    if (checkpoint_interval > 0) and (((episode + 1) % checkpoint_interval == 0) or (episode == episodes - 1)):
+                        save_checkpoint(checkpoint_file, episode + 1, q_table, training_data,
+                                        components=learner_components, metadata=checkpoint_metadata, saved_episodes=checkpointed_episodes)
+                        checkpointed_episodes = len(training_data)
+
+                progress.close()
                 print(f"{algorithm_name} Training completed.")
 
+                if (cache_key is not None) and (cached_result is None):
+                    result_cache.put(cache_key, q_table, training_data, run_config)
+
                 # Extract total rewards and steps taken per episode
                 raw_action_sequence_history = [data[0] for data in training_data]
                 q_table_history = [data[3] for data in training_data]
@@ -164,6 +305,17 @@ def main():
                                         + "\n" + agent_settings_summary
                                             + "\n" + algorithm_settings_summary),
                                             fps=fps)
+
+                if(animation_export_format is not None):
+                    # Export the first and last action sequences as animation files
+                    for sequence_name, action_sequence in (('first', training_data[0][0]), ('last', training_data[-1][0])):
+                        export_action_sequence_animation(action_sequence, grid_length, grid_width,
+                                                         os.path.join(save_directory, f"{sequence_name}_action_sequence_{algorithm_name}.{animation_export_format}"),
+                                                         f"{sequence_name.capitalize()} Action Sequence",
+                                                         (training_settings_summary
+                                                         + "\n" + agent_settings_summary
+                                                             + "\n" + algorithm_settings_summary),
+                                                         max_frames=animation_max_frames)
                 
                 if(save_training_data):
                     save_training_data_to_csv(os.path.join(save_directory, f"training_data_{algorithm_name}.csv"), training_data)
@@ -176,6 +328,101 @@ def main():
                         interpreted_action_sequence = interpret_action_sequence(action_sequence, actions)
                         interpreted_action_sequence_history.append(interpreted_action_sequence)
                     save_training_data_set_to_csv(os.path.join(save_directory, f"interpreted_action_sequence_history_{algorithm_name}.csv"), interpreted_action_sequence_history, "Action Sequence")
+
+                if(save_greedy_policy):
+                    GreedyPolicy.from_q_table(q_table, (grid_length, grid_width)).save(os.path.join(save_directory, f"policy_{algorithm_name}"))
+
+                if(evaluate_greedy_policy):
+                    print_policy_evaluation(algorithm_name, GreedyPolicy.from_q_table(q_table, (grid_length, grid_width)).evaluate(environment, gamma))
+
+        if(enable_asynchronous_training):
+            algorithm_name = 'Async-Q-Learning'
+            algorithm_settings_summary = f"Trained w/ {algorithm_name} ({asynchronous_workers} workers, lock mode '{asynchronous_lock_mode}') and Epsilon-Greedy Selection"
+
+            print(f"Training {algorithm_name} with {asynchronous_workers} workers...", end=' ')
+            q_table, total_rewards, steps_taken = asynchronous_Q_learning(
+                (grid_length, grid_width), goal_position, reward_vector, actions,
+                asynchronous_workers, episodes, alpha, gamma, epsilon, agent_start, asynchronous_lock_mode,
+                seed=random_seed, action_probabilities=action_probabilities)
+            print("Completed!!!")
+
+            # Average over workers, episode i of every worker runs concurrently
+            mean_total_rewards = total_rewards.mean(axis=0)
+            mean_steps_taken = steps_taken.mean(axis=0)
+
+            if(enable_episode_plots):
+                plot_episode_data(mean_total_rewards, episodes, 'Mean Total Reward per Episode', 
+                                training_settings_summary
+                                    + "\n" + agent_settings_summary
+                                    + "\n" + algorithm_settings_summary,
+                                        ylabel='Total Reward', label='Total Reward', color='blue')
+                plot_episode_data(mean_steps_taken, episodes, 'Mean Steps Taken per Episode',
+                                training_settings_summary
+                                    + "\n" + agent_settings_summary
+                                    + "\n" + algorithm_settings_summary,
+                                        ylabel='Steps Taken', label='Steps Taken', color='orange')
+
+            if(save_training_data):
+                save_training_data_set_to_csv(os.path.join(save_directory, f"total_rewards_{algorithm_name}.csv"), mean_total_rewards, "Total Rewards")
+                save_training_data_set_to_csv(os.path.join(save_directory, f"steps_taken_{algorithm_name}.csv"), mean_steps_taken, "Steps Taken")
+                save_training_data_set_to_csv(os.path.join(save_directory, f"q_table_history_{algorithm_name}.csv"), [q_table], "Q-table")
+
+            if(save_greedy_policy):
+                GreedyPolicy.from_q_table(q_table, (grid_length, grid_width)).save(os.path.join(save_directory, f"policy_{algorithm_name}"))
+
+            if(evaluate_greedy_policy):
+                print_policy_evaluation(algorithm_name, GreedyPolicy.from_q_table(q_table, (grid_length, grid_width)).evaluate(environment, gamma))
+
+        if(enable_multi_agent_training):
+            algorithm_name = 'Multi-Agent-Q-Learning'
+            algorithm_settings_summary = (f"Trained w/ {algorithm_name} ({multi_agent_count} agents, "
+                                          f"{'shared' if multi_agent_shared_q_table else 'separate'} Q-tables) and Epsilon-Greedy Selection")
+
+            multi_agent_environment = MultiAgentGridWorld((grid_length, grid_width), multi_agent_count, goal_position, reward_vector)
+            multi_agent_environment.set_stochastic_dynamics(action_probabilities)
+            q_table_shape = (multi_agent_environment.get_num_states(), len(actions))
+            q_table = np.zeros(q_table_shape if multi_agent_shared_q_table else (multi_agent_count,) + q_table_shape)
+
+            total_rewards = np.zeros((multi_agent_count, episodes))
+            steps_taken = np.zeros((multi_agent_count, episodes))
+            progress = ProgressReporter(f"Training {algorithm_name}", episodes, progress_interval,
+                                        jsonl_filename=metrics_feed_file, http_port=metrics_http_port)
+            for episode in range(episodes):
+                total_rewards[:, episode], steps_taken[:, episode] = multi_agent_Q_learning_episode(
+                    multi_agent_environment, q_table, epsilon, alpha, gamma)
+                progress.update(episode, total_rewards[:, episode].mean(), steps_taken[:, episode].mean())
+            progress.close()
+            print(f"Training {algorithm_name} Completed!!!")
+
+            # Average over agents, every agent runs each episode at the same time
+            mean_total_rewards = total_rewards.mean(axis=0)
+            mean_steps_taken = steps_taken.mean(axis=0)
+
+            if(enable_episode_plots):
+                plot_episode_data(mean_total_rewards, episodes, 'Mean Total Reward per Episode', 
+                                training_settings_summary
+                                    + "\n" + algorithm_settings_summary,
+                                        ylabel='Total Reward', label='Total Reward', color='blue')
+                plot_episode_data(mean_steps_taken, episodes, 'Mean Steps Taken per Episode',
+                                training_settings_summary
+                                    + "\n" + algorithm_settings_summary,
+                                        ylabel='Steps Taken', label='Steps Taken', color='orange')
+
+            if(save_training_data):
+                save_training_data_set_to_csv(os.path.join(save_directory, f"total_rewards_{algorithm_name}.csv"), mean_total_rewards, "Total Rewards")
+                save_training_data_set_to_csv(os.path.join(save_directory, f"steps_taken_{algorithm_name}.csv"), mean_steps_taken, "Steps Taken")
+
+            if(save_greedy_policy):
+                agent_q_tables = [q_table] if multi_agent_shared_q_table else list(q_table)
+                for agent_id, agent_q_table in enumerate(agent_q_tables):
+                    suffix = "" if multi_agent_shared_q_table else f"_agent_{agent_id}"
+                    GreedyPolicy.from_q_table(agent_q_table, (grid_length, grid_width)).save(os.path.join(save_directory, f"policy_{algorithm_name}{suffix}"))
+
+            if(evaluate_greedy_policy):
+                agent_q_tables = [q_table] if multi_agent_shared_q_table else list(q_table)
+                for agent_id, agent_q_table in enumerate(agent_q_tables):
+                    suffix = "" if multi_agent_shared_q_table else f" (Agent {agent_id})"
+                    print_policy_evaluation(f"{algorithm_name}{suffix}", GreedyPolicy.from_q_table(agent_q_table, (grid_length, grid_width)).evaluate(environment, gamma))
     pass
 
 main()
\ No newline at end of file
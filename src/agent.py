@@ -6,60 +6,109 @@ Author: Lucas Pinto
 Date: February 10, 2025
 
 Modules:
-    None
+    functools - For caching the per-dimension action tables.
 
 Classes:
     Agent
 
 Functions:
-    None
+    get_actions
+    get_action_moves
 
 Usage:
     agent = Agent((0, 0))
     agent.move('up', (5, 5))
+    agent = Agent((0, 0, 0))
+    agent.move('forward', (5, 5, 5))
 """
+from functools import lru_cache
 from typing import Tuple
 
+@lru_cache(maxsize=None)
+def get_action_moves(n_dims: int = 2) -> Tuple[Tuple[str, int, int], ...]:
+    """
+    Get the move made by each action in a grid with the given number of dimensions.
+    Every axis has a pair of actions, one decreasing and one increasing its coordinate.
+    The first two pairs keep the 2-D names: 'up'/'down' move along y (axis 1) and 'left'/'right' along x (axis 0).
+    A third axis uses 'backward'/'forward', and any further axis k uses 'axis{k}-'/'axis{k}+'.
+
+    Args:
+        n_dims (int, optional): Number of grid dimensions. Defaults to 2.
+
+    Returns:
+        Tuple[Tuple[str, int, int], ...]: (name, axis, delta) for each action, in action index order.
+    """
+    axis_names = {0: ('left', 'right'), 1: ('up', 'down'), 2: ('backward', 'forward')}
+    axis_order = [1, 0] + list(range(2, n_dims)) if n_dims >= 2 else [0]
+
+    moves = []
+    for axis in axis_order:
+        decrease, increase = axis_names.get(axis, (f"axis{axis}-", f"axis{axis}+"))
+        moves.append((decrease, axis, -1))
+        moves.append((increase, axis, 1))
+    return tuple(moves)
+
+def get_actions(n_dims: int = 2) -> dict:
+    """
+    Get the dictionary of action names to action indices for a grid with the given number of dimensions.
+    For 2-D grids this is {'up': 0, 'down': 1, 'left': 2, 'right': 3}.
+
+    Args:
+        n_dims (int, optional): Number of grid dimensions. Defaults to 2.
+
+    Returns:
+        dict: Dictionary mapping action names to indices.
+    """
+    return {name: index for index, (name, _, _) in enumerate(get_action_moves(n_dims))}
+
+@lru_cache(maxsize=None)
+def _get_moves_by_name(n_dims: int) -> dict:
+    """
+    Get the (axis, delta) of each action by name, for fast lookups in Agent.move.
+
+    Args:
+        n_dims (int): Number of grid dimensions.
+
+    Returns:
+        dict: Dictionary mapping action names to (axis, delta).
+    """
+    return {name: (axis, delta) for name, axis, delta in get_action_moves(n_dims)}
+
 class Agent:
     """
     A class to represent an agent that can move within a grid.
     """
 
-    def __init__(self, position: Tuple[int, int] = (0, 0)):
+    def __init__(self, position: Tuple[int, ...] = (0, 0)):
         """
         Initialize the agent with a starting position.
 
         Args:
-            position (Tuple[int, int], optional): The initial position of the agent as (x, y). Defaults to (0, 0).
+            position (Tuple[int, ...], optional): The initial position of the agent as (x, y, ...). Defaults to (0, 0).
         """
         self.position = position
 
-    def move(self, action: str = None, grid_dim: Tuple[int, int] = (5, 5)) -> bool:
+    def move(self, action: str = None, grid_dim: Tuple[int, ...] = (5, 5)) -> bool:
         """
         Move the agent in the specified direction within the grid dimensions.
 
         Args:
             action (str, optional): The direction in which to move the agent. 
-                        Can be 'up', 'down', 'left', or 'right'. Defaults to None.
-            grid_dim (Tuple[int, int], optional): The dimensions of the grid as (length, width). 
+                        Can be 'up', 'down', 'left', or 'right', plus the names from get_actions for higher dimensions. Defaults to None.
+            grid_dim (Tuple[int, ...], optional): The dimensions of the grid as (length, width, ...). 
                              Defaults to (5, 5).
 
         Returns:
             bool: True if the agent moved successfully, False otherwise.
         """
-        x, y = self.position
-        grid_length, grid_width = grid_dim
-
-        if action == 'up' and y > 0:
-            y -= 1
-        elif action == 'down' and y < grid_width - 1:
-            y += 1
-        elif action == 'left' and x > 0:
-            x -= 1
-        elif action == 'right' and x < grid_length - 1:
-            x += 1
-        else:
+        move = _get_moves_by_name(len(grid_dim)).get(action)
+        if move is None:
+            return False
+
+        axis, delta = move
+        coordinate = self.position[axis] + delta
+        if not (0 <= coordinate < grid_dim[axis]):
             return False
 
-        self.position = (x, y)
+        self.position = self.position[:axis] + (coordinate,) + self.position[axis + 1:]
         return True
@@ -0,0 +1,118 @@
+"""
+alias.py
+
+Description: This module defines alias tables for sampling from many fixed discrete distributions in O(1) time.
+            Every row of a probability matrix is turned into k columns holding a threshold and an alias outcome
+            (Vose's method), so a sample is one uniform draw, one column pick and one comparison, whatever the
+            distribution looks like. All rows are built at once, pairing one under-full and one over-full column
+            per row in each of k - 1 vectorized passes, and batches of rows are sampled in a single vectorized call.
+
+Modules:
+    numpy - For numerical operations on arrays.
+
+Classes:
+    AliasTable
+
+Functions:
+    None
+
+Usage:
+    table = AliasTable(np.array([[0.8, 0.1, 0.1], [0.0, 0.5, 0.5]]))
+    outcome = table.sample_one(0)
+    outcomes = table.sample(np.array([0, 1, 1, 0]))
+"""
+import numpy as np
+
+class AliasTable:
+    """
+    Alias tables of n discrete distributions over the same k outcomes, one per row of a probability matrix.
+    """
+
+    def __init__(self, probabilities: np.ndarray):
+        """
+        Build the alias tables of every row.
+
+        Args:
+            probabilities (np.ndarray): Non-negative weights shaped (n, k), each row is normalized to sum to 1.
+
+        Raises:
+            ValueError: If probabilities is not 2-D, has negative weights, or has a row without any weight.
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        if probabilities.ndim != 2:
+            raise ValueError("Probabilities must be shaped (n_rows, n_outcomes)!")
+        if np.any(probabilities < 0):
+            raise ValueError("Probabilities cannot be negative!")
+        totals = probabilities.sum(axis=1, keepdims=True)
+        if np.any(totals <= 0):
+            raise ValueError("Every row needs a positive total probability!")
+
+        n_rows, n_outcomes = probabilities.shape
+        rows = np.arange(n_rows)
+        scaled = probabilities / totals * n_outcomes # Average column holds exactly 1
+        thresholds = np.ones((n_rows, n_outcomes))
+        aliases = np.tile(np.arange(n_outcomes), (n_rows, 1))
+        finished = np.zeros((n_rows, n_outcomes), dtype=bool)
+
+        # Each pass finishes one under-full column per row by topping it up from an over-full one
+        for _ in range(n_outcomes - 1):
+            small = ~finished & (scaled < 1)
+            large = ~finished & (scaled >= 1)
+            pairing = rows[small.any(axis=1) & large.any(axis=1)]
+            if pairing.size == 0:
+                break
+            small_columns = np.argmax(small[pairing], axis=1)
+            large_columns = np.argmax(large[pairing], axis=1)
+
+            thresholds[pairing, small_columns] = scaled[pairing, small_columns]
+            aliases[pairing, small_columns] = large_columns
+            finished[pairing, small_columns] = True
+            scaled[pairing, large_columns] -= 1 - scaled[pairing, small_columns]
+        # Columns left unfinished hold exactly 1 up to rounding, so they always keep their own outcome
+
+        self._thresholds = thresholds
+        self._aliases = aliases
+        self._n_outcomes = n_outcomes
+
+    def sample_one(self, row: int) -> int:
+        """
+        Draw one outcome from the distribution of a row.
+
+        Args:
+            row (int): Index of the distribution.
+
+        Returns:
+            int: Index of the sampled outcome.
+        """
+        draw = np.random.rand() * self._n_outcomes
+        column = int(draw)
+        return column if draw - column < self._thresholds[row, column] else int(self._aliases[row, column])
+
+    def sample(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Draw one outcome for each of many rows in one vectorized call.
+
+        Args:
+            rows (np.ndarray): Integer array of distribution indices.
+
+        Returns:
+            np.ndarray: Index of the sampled outcome for each row, shaped like rows.
+        """
+        rows = np.asarray(rows)
+        draws = np.random.rand(*rows.shape) * self._n_outcomes
+        columns = draws.astype(np.intp)
+        keep = draws - columns < self._thresholds[rows, columns]
+        return np.where(keep, columns, self._aliases[rows, columns])
+
+    def get_probabilities(self) -> np.ndarray:
+        """
+        Reconstruct the probability matrix the tables sample from, e.g. to check them.
+
+        Returns:
+            np.ndarray: The normalized probabilities, shaped (n, k).
+        """
+        n_rows = len(self._thresholds)
+        probabilities = self._thresholds / self._n_outcomes
+        np.add.at(probabilities, (np.repeat(np.arange(n_rows), self._n_outcomes), self._aliases.ravel()),
+                  ((1 - self._thresholds) / self._n_outcomes).ravel())
+        return probabilities
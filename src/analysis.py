@@ -0,0 +1,313 @@
+"""
+analysis.py
+
+Description: This module compares many stored training runs at once.
+            Per-episode CSV logs (such as total_rewards_*.csv and steps_taken_*.csv) are loaded into stacked,
+            NaN-padded arrays grouped by file name, and rolling means, confidence bands across seeds, episodes-to-threshold,
+            and area under the curve are computed for every run in single vectorized passes.
+            Results are written as a summary CSV table and comparison plots.
+            Other logs written by main (action sequences, Q-tables) are skipped, so a whole run directory can be passed.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    matplotlib - For the comparison plots.
+    argparse - For the command line interface.
+    csv - For the summary table.
+    os - For file paths.
+
+Functions:
+    load_runs - Loads per-episode CSV logs into a NaN-padded (n_runs, n_episodes) array.
+    group_runs - Groups CSV logs by file name, so the same configuration across seeds is compared together.
+    metric_of - Gets the metric of a group label, e.g. total_rewards for total_rewards_Q-Learning.
+    parse_thresholds - Parses per-metric threshold arguments.
+    rolling_mean - Computes the trailing rolling mean of every run.
+    confidence_band - Computes the mean and confidence band across runs per episode.
+    episodes_to_threshold - Finds the first episode each run reaches a threshold.
+    area_under_curve - Sums each run over its episodes.
+    summarize_runs - Computes the summary statistics of one group of runs.
+    save_summary_to_csv - Writes the summary statistics of every group to a CSV file.
+    plot_run_comparison - Plots the mean and confidence band of every group.
+    run_analysis_cli - Command line entry point.
+
+Usage:
+    python src/analysis.py runs/*/total_rewards_*.csv --window 20 --threshold 0 --output analysis
+    python src/analysis.py runs/*/steps_taken_*.csv --window 20 --threshold 30 --below --output analysis
+    python src/analysis.py runs/*/*.csv --threshold total_rewards=0 --threshold steps_taken=30:below --output analysis
+"""
+import numpy as np
+import matplotlib.pyplot as plt
+import argparse
+import csv
+import os
+
+PER_EPISODE_METRICS = ('total_rewards', 'steps_taken') # Logs with one value per episode, others are skipped unless given a threshold
+
+def load_runs(filenames: list) -> np.ndarray:
+    """
+    Loads per-episode CSV logs with an 'Episode' column followed by a value column.
+
+    Args:
+        filenames (list): Paths of the CSV files, one run per file.
+
+    Returns:
+        np.ndarray: Array shaped (n_runs, n_episodes), runs shorter than the longest are padded with NaN.
+    """
+    runs = [np.atleast_1d(np.loadtxt(filename, delimiter=',', skiprows=1, usecols=1, dtype=float)) for filename in filenames]
+    data = np.full((len(runs), max((len(run) for run in runs), default=0)), np.nan)
+    for index, run in enumerate(runs):
+        data[index, :len(run)] = run
+    return data
+
+def group_runs(filenames: list) -> dict:
+    """
+    Groups CSV logs by file name, so e.g. every seed's total_rewards_Q-Learning.csv forms one group.
+
+    Args:
+        filenames (list): Paths of the CSV files.
+
+    Returns:
+        dict: Dictionary mapping each group label to its list of file paths, in sorted label order.
+    """
+    groups = {}
+    for filename in filenames:
+        label = os.path.splitext(os.path.basename(filename))[0]
+        groups.setdefault(label, []).append(filename)
+    return dict(sorted(groups.items()))
+
+def metric_of(label: str) -> str:
+    """
+    Gets the metric of a group label, the part before the last underscore.
+
+    Args:
+        label (str): The group label, e.g. 'total_rewards_Q-Learning'.
+
+    Returns:
+        str: The metric, e.g. 'total_rewards'.
+    """
+    return label.rsplit('_', 1)[0] if '_' in label else label
+
+def parse_thresholds(entries: list, below: bool = False) -> dict:
+    """
+    Parses threshold arguments of the form VALUE or METRIC=VALUE, each optionally followed by :above or :below.
+
+    Args:
+        entries (list): The threshold arguments, e.g. ['total_rewards=0', 'steps_taken=30:below'].
+        below (bool, optional): Direction of entries without :above or :below. Defaults to False.
+
+    Raises:
+        ValueError: If an entry has no valid value or direction.
+
+    Returns:
+        dict: Dictionary mapping each metric to its (threshold, below) pair, the key None holding the threshold of all other metrics.
+    """
+    thresholds = {}
+    for entry in entries:
+        metric, _, value = entry.rpartition('=')
+        value, _, direction = value.partition(':')
+        if direction not in ('', 'above', 'below'):
+            raise ValueError(f"Threshold direction must be 'above' or 'below', not '{direction}'!")
+        try:
+            threshold = float(value)
+        except ValueError:
+            raise ValueError(f"Threshold '{entry}' does not have a numeric value!")
+        thresholds[metric or None] = (threshold, direction == 'below' if direction else below)
+    return thresholds
+
+def rolling_mean(data: np.ndarray, window: int = 10) -> np.ndarray:
+    """
+    Computes the trailing rolling mean of every run with cumulative sums, ignoring NaN padding.
+    The first window - 1 episodes average over the episodes available so far.
+
+    Args:
+        data (np.ndarray): Array shaped (n_runs, n_episodes).
+        window (int, optional): Number of episodes averaged. Defaults to 10.
+
+    Returns:
+        np.ndarray: Array of the same shape with the rolling means, NaN where a run has ended.
+    """
+    valid = ~np.isnan(data)
+    sums = np.cumsum(np.where(valid, data, 0.0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    sums[:, window:] -= sums[:, :-window].copy()
+    counts[:, window:] -= counts[:, :-window].copy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    means[~valid] = np.nan
+    return means
+
+def confidence_band(data: np.ndarray, z: float = 1.96) -> tuple:
+    """
+    Computes the mean across runs per episode and a normal-approximation confidence band of the mean.
+
+    Args:
+        data (np.ndarray): Array shaped (n_runs, n_episodes).
+        z (float, optional): Number of standard errors in the band, 1.96 for 95%. Defaults to 1.96.
+
+    Returns:
+        tuple: The mean, lower bound and upper bound per episode, each shaped (n_episodes,).
+    """
+    counts = np.sum(~np.isnan(data), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(data, axis=0) / counts
+        deviations = np.where(np.isnan(data), 0.0, data - mean)
+        standard_deviation = np.sqrt(np.sum(deviations**2, axis=0) / np.maximum(counts - 1, 1))
+        half_width = z * standard_deviation / np.sqrt(counts)
+    return mean, mean - half_width, mean + half_width
+
+def episodes_to_threshold(data: np.ndarray, threshold: float, below: bool = False) -> np.ndarray:
+    """
+    Finds the first episode at which each run reaches a threshold.
+
+    Args:
+        data (np.ndarray): Array shaped (n_runs, n_episodes), usually rolling means.
+        threshold (float): The value to reach.
+        below (bool, optional): Reach means at or below the threshold (e.g. steps taken) instead of at or above. Defaults to False.
+
+    Returns:
+        np.ndarray: The 1-based episode per run, NaN for runs that never reach the threshold.
+    """
+    with np.errstate(invalid='ignore'):
+        reached = data <= threshold if below else data >= threshold
+    first = np.argmax(reached, axis=1).astype(float) + 1
+    first[~reached.any(axis=1)] = np.nan
+    return first
+
+def area_under_curve(data: np.ndarray) -> np.ndarray:
+    """
+    Sums each run over its episodes, the discrete area under its learning curve.
+
+    Args:
+        data (np.ndarray): Array shaped (n_runs, n_episodes).
+
+    Returns:
+        np.ndarray: The area per run.
+    """
+    return np.nansum(data, axis=1)
+
+def summarize_runs(data: np.ndarray, window: int = 10, threshold: float = None, below: bool = False) -> dict:
+    """
+    Computes the summary statistics of one group of runs.
+
+    Args:
+        data (np.ndarray): Array shaped (n_runs, n_episodes).
+        window (int, optional): Rolling mean window. Defaults to 10.
+        threshold (float, optional): Threshold for episodes-to-threshold, skipped if None. Defaults to None.
+        below (bool, optional): Whether reaching the threshold means going at or below it. Defaults to False.
+
+    Returns:
+        dict: Run count, episodes, final rolling mean, area under the curve and episodes to threshold (means and standard deviations across runs).
+    """
+    rolling = rolling_mean(data, window)
+    last_index = np.sum(~np.isnan(data), axis=1) - 1
+    final = rolling[np.arange(len(data)), np.maximum(last_index, 0)]
+    area = area_under_curve(data)
+
+    summary = {
+        'runs': len(data),
+        'episodes': data.shape[1],
+        'final_rolling_mean': np.nanmean(final),
+        'final_rolling_std': np.nanstd(final),
+        'auc_mean': np.mean(area),
+        'auc_std': np.std(area),
+    }
+    if threshold is not None:
+        to_threshold = episodes_to_threshold(rolling, threshold, below)
+        reached = ~np.isnan(to_threshold)
+        summary['reached_threshold'] = int(reached.sum())
+        summary['episodes_to_threshold_mean'] = np.mean(to_threshold[reached]) if reached.any() else np.nan
+        summary['episodes_to_threshold_std'] = np.std(to_threshold[reached]) if reached.any() else np.nan
+    return summary
+
+def save_summary_to_csv(filename: str, summaries: dict):
+    """
+    Writes the summary statistics of every group to a CSV file.
+
+    Args:
+        filename (str): The name of the file to save the table to.
+        summaries (dict): Dictionary mapping each group label to its summary from summarize_runs.
+    """
+    columns = list(dict.fromkeys(column for summary in summaries.values() for column in summary)) # Groups without a threshold have fewer columns
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Group'] + columns)
+        for label, summary in summaries.items():
+            writer.writerow([label] + [summary.get(column) for column in columns])
+
+def plot_run_comparison(groups: dict, window: int = 10, title: str = 'Run Comparison', ylabel: str = 'Value', filename: str = None, figsize=(12, 8)):
+    """
+    Plots the rolling mean across runs of every group with its confidence band.
+
+    Args:
+        groups (dict): Dictionary mapping each group label to its (n_runs, n_episodes) array.
+        window (int, optional): Rolling mean window. Defaults to 10.
+        title (str, optional): Title of the plot. Defaults to 'Run Comparison'.
+        ylabel (str, optional): Label for the y-axis. Defaults to 'Value'.
+        filename (str, optional): File to save the plot to, shown instead if None. Defaults to None.
+        figsize (tuple, optional): Size of the figure. Default is (12, 8).
+    """
+    fig, ax = plt.subplots(figsize=figsize)
+    for label, data in groups.items():
+        mean, lower, upper = confidence_band(rolling_mean(data, window))
+        episodes = np.arange(1, len(mean) + 1)
+        line, = ax.plot(episodes, mean, label=f"{label} (n={len(data)})")
+        ax.fill_between(episodes, lower, upper, color=line.get_color(), alpha=0.2)
+    ax.set_xlabel('Episode')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    fig.suptitle(f"Rolling mean over {window} episodes, 95% confidence band across runs", fontsize=8)
+    ax.legend()
+    if filename is not None:
+        fig.savefig(filename)
+        plt.close(fig)
+    else:
+        plt.show()
+
+def run_analysis_cli(argv: list = None):
+    """
+    Command line entry point, see the module usage.
+
+    Args:
+        argv (list, optional): Command line arguments, sys.argv[1:] if None. Defaults to None.
+    """
+    parser = argparse.ArgumentParser(description="Compare stored training runs across seeds and configurations.")
+    parser.add_argument('files', nargs='+', help="Per-episode CSV logs, grouped by file name.")
+    parser.add_argument('--window', type=int, default=10, help="Rolling mean window in episodes.")
+    parser.add_argument('--threshold', action='append', default=[], metavar='[METRIC=]VALUE[:above|below]',
+                        help="Value the rolling mean has to reach for episodes-to-threshold, for one metric or all. Can be repeated.")
+    parser.add_argument('--below', action='store_true', help="Thresholds without a direction are reached at or below them (e.g. steps taken).")
+    parser.add_argument('--output', default='analysis', help="Directory the summary table and plots are written to.")
+    args = parser.parse_args(argv)
+    try:
+        thresholds = parse_thresholds(args.threshold, args.below)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if not os.path.exists(args.output):
+        os.makedirs(args.output)
+
+    groups = {}
+    for label, filenames in group_runs(args.files).items():
+        if (metric_of(label) in PER_EPISODE_METRICS) or (metric_of(label) in thresholds):
+            groups[label] = load_runs(filenames)
+        else:
+            print(f"Skipping {label}: not a per-episode metric ({len(filenames)} file(s)).")
+    if not groups:
+        parser.error(f"None of the files hold a per-episode metric ({', '.join(PER_EPISODE_METRICS)})!")
+    summaries = {label: summarize_runs(data, args.window, *thresholds.get(metric_of(label), thresholds.get(None, (None, False))))
+                 for label, data in groups.items()}
+    save_summary_to_csv(os.path.join(args.output, "summary.csv"), summaries)
+
+    # One comparison plot per metric, e.g. total_rewards_* and steps_taken_*
+    metrics = {}
+    for label, data in groups.items():
+        metrics.setdefault(metric_of(label), {})[label] = data
+    for metric, metric_groups in metrics.items():
+        plot_run_comparison(metric_groups, args.window, f"{metric} Comparison", metric,
+                            os.path.join(args.output, f"comparison_{metric}.png"))
+
+    for label, summary in summaries.items():
+        print(f"{label}: " + ", ".join(f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}" for key, value in summary.items()))
+
+if __name__ == "__main__":
+    run_analysis_cli()
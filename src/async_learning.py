@@ -0,0 +1,197 @@
+"""
+async_learning.py
+
+Description: This module implements asynchronous Q-learning with several worker processes sharing one Q-table.
+            Each worker runs its own GridWorld and agent and writes straight into a Q-table placed in shared memory,
+            either lock-free (Hogwild-style) or guarded by a small set of striped locks for comparison.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    multiprocessing - For worker processes, locks, and shared memory.
+    utils - Utility functions used in the project.
+    learning - The Q-learning update and selection functions.
+    grid_world - The GridWorld environment class.
+    typing - For type hinting.
+
+Functions:
+    asynchronous_Q_learning - Trains a shared Q-table with several asynchronous worker processes.
+
+Usage:
+    q_table, total_rewards, steps_taken = asynchronous_Q_learning((10, 10), (9, 9), [100, -1, -5], actions, n_workers=4)
+"""
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from utils import *
+from learning import Q_learning_table_update, epsilon_greedy_selection
+from grid_world import GridWorld
+from typing import Tuple
+
+def asynchronous_Q_learning(grid_dim: Tuple[int, ...] = (5, 5),
+                            goal: Tuple[int, ...] = None,
+                            reward_vector: list = None,
+                            actions: dict = None,
+                            n_workers: int = 4,
+                            episodes: int = 100,
+                            alpha: float = 0.1,
+                            gamma: float = 0.9,
+                            epsilon: float = 0.1,
+                            agent_start: Tuple[int, ...] = None,
+                            lock_mode: str = 'none',
+                            n_locks: int = 16,
+                            seed: int = None,
+                            action_probabilities: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Trains a single Q-table with several worker processes running Q-learning episodes at the same time.
+
+    Args:
+        grid_dim (Tuple[int, ...], optional): Dimensions of each worker's grid. Defaults to (5, 5).
+        goal (Tuple[int, ...], optional): Goal position, bottom-right corner if None. Defaults to None.
+        reward_vector (list, optional): Rewards for reaching the goal, moving, and an invalid move. Defaults to None.
+        actions (dict, optional): Dictionary mapping action names to indices. Defaults to None.
+        n_workers (int, optional): Number of worker processes. Defaults to 4.
+        episodes (int, optional): Number of episodes run by each worker. Defaults to 100.
+        alpha (float, optional): Learning rate. Defaults to 0.1.
+        gamma (float, optional): Discount factor. Defaults to 0.9.
+        epsilon (float, optional): Exploration rate of the epsilon-greedy policy. Defaults to 0.1.
+        agent_start (Tuple[int, ...], optional): Starting position of the agents, random if None. Defaults to None.
+        lock_mode (str, optional): 'none' for lock-free writes, 'striped' to lock each state's row with one of n_locks locks. Defaults to 'none'.
+        n_locks (int, optional): Number of locks used in 'striped' mode. Defaults to 16.
+        seed (int, optional): Base seed, worker i is seeded with seed + i. Defaults to None.
+        action_probabilities (np.ndarray, optional): Stochastic dynamics of every worker's grid, see GridWorld.set_stochastic_dynamics. Defaults to None.
+
+    Raises:
+        ValueError: If actions is None.
+        ValueError: If n_workers is not positive.
+        ValueError: If lock_mode is not 'none' or 'striped'.
+        RuntimeError: If any worker process exits with an error.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: A tuple containing:
+            - q_table (np.ndarray): A copy of the trained shared Q-table, shaped (n_states, n_actions).
+            - total_rewards (np.ndarray): Total reward per episode, shaped (n_workers, episodes).
+            - steps_taken (np.ndarray): Steps taken per episode, shaped (n_workers, episodes).
+    """
+    if actions is None:
+        raise ValueError("Actions cannot be None!")
+    if n_workers <= 0:
+        raise ValueError("n_workers must be positive!")
+    if lock_mode not in ('none', 'striped'):
+        raise ValueError(f"Unknown lock mode '{lock_mode}'!")
+
+    q_table_shape = (int(np.prod(grid_dim)), len(actions))
+    metrics_shape = (2, n_workers, episodes) # Total rewards and steps taken
+
+    q_table_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(q_table_shape)) * np.dtype(float).itemsize)
+    metrics_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(metrics_shape)) * np.dtype(float).itemsize)
+    q_table = np.ndarray(q_table_shape, dtype=float, buffer=q_table_memory.buf)
+    metrics = np.ndarray(metrics_shape, dtype=float, buffer=metrics_memory.buf)
+    try:
+        q_table[:] = 0
+        metrics[:] = 0
+
+        locks = [mp.Lock() for _ in range(n_locks)] if lock_mode == 'striped' else None
+
+        workers = []
+        for worker_id in range(n_workers):
+            worker_seed = None if seed is None else seed + worker_id
+            worker = mp.Process(target=_asynchronous_worker,
+                                args=(worker_id, q_table_memory.name, q_table_shape, metrics_memory.name, metrics_shape,
+                                      grid_dim, goal, reward_vector, actions, episodes,
+                                      alpha, gamma, epsilon, agent_start, locks, worker_seed, action_probabilities))
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+
+        failed = [worker_id for worker_id, worker in enumerate(workers) if worker.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"Asynchronous workers {failed} exited with an error!")
+
+        return q_table.copy(), metrics[0].copy(), metrics[1].astype(int)
+    finally:
+        del q_table, metrics # Release the views before the shared memory is closed
+        q_table_memory.close()
+        q_table_memory.unlink()
+        metrics_memory.close()
+        metrics_memory.unlink()
+
+def _asynchronous_worker(worker_id: int,
+                         q_table_name: str,
+                         q_table_shape: Tuple[int, ...],
+                         metrics_name: str,
+                         metrics_shape: Tuple[int, ...],
+                         grid_dim: Tuple[int, ...],
+                         goal: Tuple[int, ...],
+                         reward_vector: list,
+                         actions: dict,
+                         episodes: int,
+                         alpha: float,
+                         gamma: float,
+                         epsilon: float,
+                         agent_start: Tuple[int, ...],
+                         locks: list,
+                         seed: int,
+                         action_probabilities: np.ndarray):
+    """
+    Runs Q-learning episodes in a worker process against the shared Q-table.
+
+    Args:
+        worker_id (int): Index of the worker, used as its row in the metrics array.
+        q_table_name (str): Name of the shared memory block holding the Q-table.
+        q_table_shape (Tuple[int, ...]): Shape of the Q-table.
+        metrics_name (str): Name of the shared memory block holding the metrics.
+        metrics_shape (Tuple[int, ...]): Shape of the metrics array.
+        grid_dim (Tuple[int, ...]): Dimensions of the grid.
+        goal (Tuple[int, ...]): Goal position.
+        reward_vector (list): Rewards for reaching the goal, moving, and an invalid move.
+        actions (dict): Dictionary mapping action names to indices.
+        episodes (int): Number of episodes to run.
+        alpha (float): Learning rate.
+        gamma (float): Discount factor.
+        epsilon (float): Exploration rate.
+        agent_start (Tuple[int, ...]): Starting position of the agent, random if None.
+        locks (list): Striped locks, or None for lock-free writes.
+        seed (int): Seed for this worker's random number generator, fresh OS entropy if None.
+        action_probabilities (np.ndarray): Stochastic dynamics of the worker's grid, deterministic if None.
+    """
+    np.random.seed(seed) # Forked workers would otherwise share the parent's random state
+
+    q_table_memory = shared_memory.SharedMemory(name=q_table_name)
+    metrics_memory = shared_memory.SharedMemory(name=metrics_name)
+    q_table = np.ndarray(q_table_shape, dtype=float, buffer=q_table_memory.buf)
+    metrics = np.ndarray(metrics_shape, dtype=float, buffer=metrics_memory.buf)
+
+    environment = GridWorld(grid_dim, None, goal, reward_vector)
+    environment.set_stochastic_dynamics(action_probabilities)
+
+    try:
+        for episode in range(episodes):
+            environment.reset(agent_start)
+            total_reward = 0
+            steps_taken = 0
+            goal_reached = False
+
+            while not goal_reached:
+                state = environment.get_state_index()
+                action = epsilon_greedy_selection(state, q_table, epsilon)
+
+                reward, goal_reached = environment.step_agent(get_key_by_value(actions, action))
+                next_state = environment.get_state_index()
+
+                if locks is None: # Hogwild-style, races between workers are tolerated
+                    Q_learning_table_update(state, next_state, action, reward, q_table, alpha, gamma)
+                else:
+                    with locks[state % len(locks)]:
+                        Q_learning_table_update(state, next_state, action, reward, q_table, alpha, gamma)
+
+                total_reward += reward
+                steps_taken += 1
+
+            metrics[0, worker_id, episode] = total_reward
+            metrics[1, worker_id, episode] = steps_taken
+    finally:
+        del q_table, metrics
+        q_table_memory.close()
+        metrics_memory.close()
@@ -0,0 +1,241 @@
+"""
+checkpoint.py
+
+Description: This module saves and restores training checkpoints so long runs can be resumed after an interruption.
+            A checkpoint holds the Q-table, optional eligibility traces, the NumPy random state, the episode counter,
+            the recorded training data, and the state of any persistent learner components (replay buffer, model, queue).
+            Files are written to a temporary name, flushed to disk and then renamed, so a crash mid-write never corrupts
+            the last checkpoint. The recorded training data can be appended as one segment file per checkpoint instead of
+            being rewritten every time, so checkpointing a long run costs O(episodes) I/O in total rather than O(episodes²).
+
+Modules:
+    numpy - For numerical operations on arrays and the binary file format.
+    os - For atomic file replacement and flushing files to disk.
+
+Functions:
+    save_checkpoint - Atomically writes a training checkpoint to a compressed .npz file.
+    load_checkpoint - Reads a training checkpoint and restores any learner components in place.
+    load_checkpoint_metadata - Reads only the run description of a training checkpoint.
+    training_segment_filename - Gets the file a segment of incrementally saved training data is stored in.
+    pack_training_data - Converts the per-episode training data list into flat arrays.
+    unpack_training_data - Converts flat arrays back into the per-episode training data list.
+
+Usage:
+    save_checkpoint("checkpoint.npz", episode + 1, q_table, training_data)
+    save_checkpoint("checkpoint.npz", episode + 1, q_table, training_data, saved_episodes=saved_episodes) # Appends only the new records
+    checkpoint = load_checkpoint("checkpoint.npz")
+    np.random.set_state(checkpoint['random_state'])
+"""
+import numpy as np
+import os
+
+def save_checkpoint(filename: str,
+                    episode: int,
+                    q_table: np.ndarray,
+                    training_data: list = None,
+                    e_table: np.ndarray = None,
+                    components: dict = None,
+                    metadata: str = "",
+                    saved_episodes: int = None):
+    """
+    Atomically writes a training checkpoint, including the current NumPy random state.
+    With saved_episodes, only the training data records after the first saved_episodes are written, to a new segment file
+    next to the checkpoint, and the checkpoint lists the segments that make up the full training data.
+
+    Args:
+        filename (str): Path of the checkpoint file, should end in .npz.
+        episode (int): Number of episodes completed, training resumes from this episode.
+        q_table (np.ndarray): The Q-table.
+        training_data (list, optional): Per-episode [action_sequence, total_reward, steps_taken, q_table] records. Defaults to None.
+        e_table (np.ndarray, optional): Eligibility traces, only needed when checkpointing mid-episode. Defaults to None.
+        components (dict, optional): Named objects with get_checkpoint_arrays(), such as a ReplayBuffer. Defaults to None.
+        metadata (str, optional): Free-form description of the run settings, checked on resume. Defaults to "".
+        saved_episodes (int, optional): Number of leading training_data records already saved by earlier checkpoints of this run
+            with saved_episodes set, 0 for the first one. None stores all of training_data in the checkpoint. Defaults to None.
+            If the checkpoint being replaced does not list those records, all of training_data is written as one segment.
+
+    Raises:
+        ValueError: If saved_episodes is set without training_data.
+    """
+    random_state = np.random.get_state()
+    arrays = {
+        'episode': np.array(episode),
+        'q_table': q_table,
+        'metadata': np.array(metadata),
+        'random_keys': random_state[1],
+        'random_position': np.array(random_state[2]),
+        'random_has_gauss': np.array(random_state[3]),
+        'random_cached_gaussian': np.array(random_state[4]),
+    }
+    if e_table is not None:
+        arrays['e_table'] = e_table
+    if saved_episodes is not None:
+        if training_data is None:
+            raise ValueError("saved_episodes needs the training data!")
+        segment_starts = []
+        if saved_episodes > 0: # The earlier segments are listed in the checkpoint being replaced
+            try:
+                with np.load(filename) as data:
+                    if int(data['segmented_episodes']) == saved_episodes:
+                        segment_starts = data['segment_starts'].tolist()
+            except (FileNotFoundError, KeyError):
+                pass
+            if not segment_starts: # E.g. resumed from a checkpoint holding all of its training data, start over
+                saved_episodes = 0
+        if len(training_data) > saved_episodes:
+            _atomic_savez(training_segment_filename(filename, saved_episodes, len(training_data)), pack_training_data(training_data[saved_episodes:]))
+            segment_starts.append(saved_episodes)
+        arrays['segment_starts'] = np.array(segment_starts, dtype=np.int64)
+        arrays['segmented_episodes'] = np.array(len(training_data))
+    elif training_data is not None:
+        arrays.update({f"training_{key}": value for key, value in pack_training_data(training_data).items()})
+    for name, component in (components or {}).items():
+        arrays.update({f"component_{name}_{key}": value for key, value in component.get_checkpoint_arrays().items()})
+
+    _atomic_savez(filename, arrays)
+
+def load_checkpoint(filename: str, components: dict = None) -> dict:
+    """
+    Reads a training checkpoint and restores the given learner components in place.
+    The random state is returned rather than applied, pass it to np.random.set_state to resume bit-exactly.
+
+    Args:
+        filename (str): Path of the checkpoint file.
+        components (dict, optional): Named objects with set_checkpoint_arrays(), matching those saved. Defaults to None.
+
+    Raises:
+        KeyError: If a component was not saved in the checkpoint.
+        FileNotFoundError: If a training data segment listed in the checkpoint is missing.
+        ValueError: If a training data segment does not hold the episodes its name says.
+
+    Returns:
+        dict: A dictionary containing:
+            - episode (int): Number of episodes completed.
+            - q_table (np.ndarray): The Q-table.
+            - e_table (np.ndarray): The eligibility traces, or None if not saved.
+            - training_data (list): The recorded training data, or None if not saved.
+            - random_state (tuple): The NumPy random state.
+            - metadata (str): The run description given when saving.
+    """
+    with np.load(filename) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    for name, component in (components or {}).items():
+        prefix = f"component_{name}_"
+        component_arrays = {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}
+        if not component_arrays:
+            raise KeyError(f"Component '{name}' was not saved in {filename}!")
+        component.set_checkpoint_arrays(component_arrays)
+
+    training_data = None
+    if 'segment_starts' in arrays: # Saved incrementally, one segment per checkpoint
+        training_data = []
+        segment_starts = arrays['segment_starts'].tolist()
+        for start, end in zip(segment_starts, segment_starts[1:] + [int(arrays['segmented_episodes'])]):
+            with np.load(training_segment_filename(filename, start, end)) as data:
+                training_data += unpack_training_data({key: data[key] for key in data.files})
+            if len(training_data) != end:
+                raise ValueError(f"Training data segment {start}-{end} of {filename} holds the wrong number of episodes!")
+    else:
+        training_arrays = {key[len("training_"):]: value for key, value in arrays.items() if key.startswith("training_")}
+        training_data = unpack_training_data(training_arrays) if training_arrays else None
+
+    return {
+        'episode': int(arrays['episode']),
+        'q_table': arrays['q_table'],
+        'e_table': arrays.get('e_table'),
+        'training_data': training_data,
+        'random_state': ('MT19937', arrays['random_keys'], int(arrays['random_position']),
+                         int(arrays['random_has_gauss']), float(arrays['random_cached_gaussian'])),
+        'metadata': str(arrays['metadata']),
+    }
+
+def load_checkpoint_metadata(filename: str) -> str:
+    """
+    Reads only the run description of a training checkpoint, without loading its arrays.
+
+    Args:
+        filename (str): Path of the checkpoint file.
+
+    Returns:
+        str: The run description given when saving.
+    """
+    with np.load(filename) as data:
+        return str(data['metadata'])
+
+def training_segment_filename(filename: str, start: int, end: int) -> str:
+    """
+    Gets the file a segment of incrementally saved training data is stored in, next to its checkpoint.
+    The name holds the whole episode range, so a segment listed in a checkpoint is never overwritten by a different one.
+
+    Args:
+        filename (str): Path of the checkpoint file.
+        start (int): Index of the first episode in the segment.
+        end (int): Index after the last episode in the segment.
+
+    Returns:
+        str: Path of the segment file.
+    """
+    return f"{os.path.splitext(filename)[0]}.training_{start}-{end}.npz"
+
+def _atomic_savez(filename: str, arrays: dict):
+    """
+    Writes arrays to a compressed .npz file under a temporary name, flushes it to disk, and renames it into place.
+
+    Args:
+        filename (str): Path of the file to write.
+        arrays (dict): Named arrays to store.
+    """
+    temporary_filename = filename + ".tmp.npz"
+    with open(temporary_filename, 'wb') as file:
+        np.savez_compressed(file, **arrays)
+        file.flush()
+        os.fsync(file.fileno()) # The data must be on disk before the rename can expose it
+    os.replace(temporary_filename, filename) # Atomic, readers see either the old or the new file
+
+def pack_training_data(training_data: list) -> dict:
+    """
+    Converts the per-episode training data list into flat arrays.
+    Action sequences are concatenated with an offset array, and the recorded Q-tables are stacked
+    with a mask marking which episodes recorded one.
+
+    Args:
+        training_data (list): Per-episode [action_sequence, total_reward, steps_taken, q_table] records.
+
+    Returns:
+        dict: Arrays 'actions', 'action_offsets', 'total_rewards', 'steps_taken', 'q_tables' and 'q_table_recorded'.
+    """
+    action_sequences = [data[0] if data[0] is not None else [] for data in training_data]
+    lengths = np.array([len(sequence) for sequence in action_sequences], dtype=np.int64)
+    q_tables = [data[3] for data in training_data if data[3] is not None]
+
+    return {
+        'actions': np.concatenate([np.asarray(sequence, dtype=np.int64) for sequence in action_sequences]) if action_sequences else np.zeros(0, dtype=np.int64),
+        'action_offsets': np.concatenate(([0], np.cumsum(lengths))),
+        'total_rewards': np.asarray([data[1] for data in training_data]),
+        'steps_taken': np.asarray([data[2] for data in training_data], dtype=np.int64),
+        'q_tables': np.stack(q_tables) if q_tables else np.zeros(0),
+        'q_table_recorded': np.array([data[3] is not None for data in training_data], dtype=bool),
+    }
+
+def unpack_training_data(arrays: dict) -> list:
+    """
+    Converts flat arrays produced by pack_training_data back into the per-episode training data list.
+
+    Args:
+        arrays (dict): Arrays as returned by pack_training_data.
+
+    Returns:
+        list: Per-episode [action_sequence, total_reward, steps_taken, q_table] records.
+    """
+    offsets = arrays['action_offsets']
+    total_rewards = arrays['total_rewards'].tolist()
+    steps_taken = arrays['steps_taken'].tolist()
+    q_table_iterator = iter(arrays['q_tables'])
+
+    training_data = []
+    for episode, recorded in enumerate(arrays['q_table_recorded']):
+        action_sequence = list(arrays['actions'][offsets[episode]:offsets[episode + 1]])
+        q_table = next(q_table_iterator).copy() if recorded else None
+        training_data.append([action_sequence, total_rewards[episode], steps_taken[episode], q_table])
+    return training_data
@@ -2,6 +2,11 @@
 grid_world.py
 
 Description: This module defines a GridWorld class that simulates a grid-based environment where an agent can move and receive rewards.
+            Grids can have any number of dimensions. Internally every position is a single flat integer state index
+            (row-major, converted with precomputed strides), and all moves are looked up in a precomputed transition table.
+            Tuple coordinates are only used at the API boundary.
+            Dynamics can optionally be stochastic (e.g. slip or wind): the action actually executed for every
+            state-action pair is drawn from a precomputed alias table, so a noisy step costs one O(1) sample.
 Author: Lucas Pinto
 Date: February 10, 2025
 
@@ -17,62 +22,140 @@ Usage:
     python main.py
 """
 import numpy as np
-from typing import Tuple
+from typing import Tuple, Union
 
-from agent import Agent
+from agent import Agent, get_actions, get_action_moves
+from alias import AliasTable
+
+def slip_action_probabilities(n_dims: int = 2, slip: float = 0.0, wind_action: int = None, wind: float = 0.0) -> np.ndarray:
+    """
+    Build the probabilities of the executed action for every intended action, for GridWorld.set_stochastic_dynamics.
+    With probability wind the wind action is executed. Otherwise the agent slips with probability slip into one of the
+    actions along the other axes (uniformly), and executes the intended action in the remaining cases.
+
+    Args:
+        n_dims (int, optional): Number of grid dimensions. Defaults to 2.
+        slip (float, optional): Probability of slipping perpendicular to the intended move. Defaults to 0.0.
+        wind_action (int, optional): Index of the action the wind pushes towards, no wind if None. Defaults to None.
+        wind (float, optional): Probability of the wind action being executed instead. Defaults to 0.0.
+
+    Raises:
+        ValueError: If slip or wind is not a probability, or their sum exceeds 1.
+
+    Returns:
+        np.ndarray: Probabilities shaped (n_actions, n_actions), [intended, executed].
+    """
+    if not (0 <= slip <= 1 and 0 <= wind <= 1 and slip + wind <= 1):
+        raise ValueError("Slip and wind must be probabilities with a sum of at most 1!")
+
+    axes = np.array([axis for _, axis, _ in get_action_moves(n_dims)])
+    perpendicular = axes[:, None] != axes[None, :]
+    n_perpendicular = perpendicular.sum(axis=1, keepdims=True)
+
+    slip = slip if n_dims > 1 else 0.0 # A 1-D grid has no other axis to slip along
+    probabilities = np.eye(len(axes)) * (1 - slip - wind)
+    probabilities += np.divide(perpendicular * slip, n_perpendicular, where=n_perpendicular > 0, out=np.zeros(perpendicular.shape))
+    if wind_action is not None:
+        probabilities[:, wind_action] += wind
+    else:
+        probabilities += np.eye(len(axes)) * wind # Without a wind direction the intended action keeps the wind share
+    return probabilities
 
 class GridWorld:
-    def __init__(self, grid_dim: Tuple[int,int] = (5, 5), agent: Agent = None, goal: Tuple[int,int] = None, reward_vector: list = None):
+    def __init__(self, grid_dim: Tuple[int, ...] = (5, 5), agent: Agent = None, goal: Tuple[int, ...] = None, reward_vector: list = None):
         """
         Initialize the GridWorld with dimensions, agent, and goal.
 
         Args:
-            grid_dim (tuple, optional): Dimensions of the grid as (rows, columns). Defaults to (5, 5).
+            grid_dim (tuple, optional): Dimensions of the grid as (rows, columns, ...). Defaults to (5, 5).
             agent (Agent, optional): An instance of the Agent class. Defaults to None.
-            goal (tuple, optional): Coordinates of the goal position as (x, y). Defaults to (4, 4).
+            goal (tuple, optional): Coordinates of the goal position as (x, y, ...). Defaults to the last cell of the grid.
             reward_vector (list, optional): List of rewards for different actions. Defaults to [10, -0.1, -1].
         """
-        self._grid_dim = grid_dim
-        self._agent = agent if agent is not None else Agent()
-        self._goal = goal if goal is not None else (self._grid_dim[0] - 1, self._grid_dim[1] - 1) # If no goal is provided, set it to the bottom-right corner
-        self._grid = np.zeros(grid_dim)
-        self._grid[self._agent.position[0], self._agent.position[1]] = 2 # Represents the agent as a 2 in the grid
+        self._grid_dim = tuple(grid_dim)
+        self._n_dims = len(self._grid_dim)
+        self._n_states = int(np.prod(self._grid_dim))
+        self._strides = tuple(int(np.prod(self._grid_dim[axis + 1:])) for axis in range(self._n_dims)) # Row-major strides of the flat state index
+        self._actions = get_actions(self._n_dims)
+        self._transitions, self._valid_moves = self._build_transition_table()
+        self._action_probabilities = None # Executed action probabilities shaped (n_actions, n_actions) or (n_states, n_actions, n_actions), None for deterministic dynamics
+        self._executed_actions = None # Alias table of the executed action per action or per (state, action), None for deterministic dynamics
+        self._executed_row_stride = 0 # Alias table rows per state, 0 when every state shares the same rows
+
+        self._agent = agent if agent is not None else Agent((0,) * self._n_dims)
+        self._goal = tuple(goal) if goal is not None else tuple(dim - 1 for dim in self._grid_dim) # If no goal is provided, set it to the bottom-right corner
+        self._goal_index = self.position_to_index(self._goal)
+        self._agent_index = self.position_to_index(self._agent.position)
+        self._grid = np.zeros(self._grid_dim)
+        self._grid.flat[self._agent_index] = 2 # Represents the agent as a 2 in the grid
         self._reward_vector = reward_vector if reward_vector is not None else [10, -0.1, -1] # If no reward vector is provided, set it to [10, -0.1, -1]
 
-    def _move_agent(self, action: str = None) -> bool:
+    def _build_transition_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Precompute the next state of every state-action pair.
+
+        Returns:
+            tuple: The next state index of each (state, action), shaped (n_states, n_actions),
+                   and whether each move stays inside the grid.
+        """
+        coordinates = np.indices(self._grid_dim).reshape(self._n_dims, -1)
+        states = np.arange(self._n_states)
+        moves = get_action_moves(self._n_dims)
+
+        transitions = np.empty((self._n_states, len(moves)), dtype=np.intp)
+        valid_moves = np.empty((self._n_states, len(moves)), dtype=bool)
+        for action, (_, axis, delta) in enumerate(moves):
+            coordinate = coordinates[axis] + delta
+            valid_moves[:, action] = (coordinate >= 0) & (coordinate < self._grid_dim[axis])
+            transitions[:, action] = np.where(valid_moves[:, action], states + delta * self._strides[axis], states)
+        return transitions, valid_moves
+
+    def _move_agent(self, action: Union[str, int] = None) -> bool:
         """
         Move the agent in the specified direction and update the grid.
 
         Args:
-            action (str, optional): The direction to move the agent. Can be 'up', 'down', 'left', or 'right'. Defaults to None.
+            action (str or int, optional): The direction to move the agent, by name ('up', 'down', 'left', 'right', ...) or action index. Defaults to None.
 
         Returns:
             bool: True if the action was successful, False otherwise.
         """
-        self._grid[self._agent.position[0], self._agent.position[1]] = 0
-        move_successful = self._agent.move(action, self._grid_dim)
-        self._grid[self._agent.position[0], self._agent.position[1]] = 2
-        return move_successful
- 
-    
-    def _reset_agent(self, agent_position: Tuple[int,int] = None):
+        if isinstance(action, str) or action is None:
+            action = self._actions.get(action)
+            if action is None: # Unknown actions are treated as invalid moves
+                return False
+
+        if self._executed_actions is not None:
+            action = self._executed_actions.sample_one(self._agent_index * self._executed_row_stride + action)
+
+        if not self._valid_moves[self._agent_index, action]:
+            return False
+
+        self._grid.flat[self._agent_index] = 0
+        self._agent_index = int(self._transitions[self._agent_index, action])
+        self._grid.flat[self._agent_index] = 2
+        self._agent.position = self.index_to_position(self._agent_index)
+        return True
+
+
+    def _reset_agent(self, agent_position: Tuple[int, ...] = None):
         """
         Reset the agent's position to a specified or random position within the grid excluding the goal.
 
         Args:
-            agent_position (tuple, optional): The (x, y) coordinates to reset the agent to. Defaults to None.
+            agent_position (tuple, optional): The (x, y, ...) coordinates to reset the agent to. Defaults to None.
         """
-        self._grid[self._agent.position[0], self._agent.position[1]] = 0
+        self._grid.flat[self._agent_index] = 0
         if agent_position is not None:
-            self._agent.position = agent_position
-            self._grid[self._agent.position[0], self._agent.position[1]] = 2
+            self._agent_index = self.position_to_index(agent_position)
         else: # If no agent position is provided, set it to a random position within the grid
             while True:
-                self._agent.position = (np.random.choice(self._grid_dim[0]), np.random.choice(self._grid_dim[1]))
-                if self._agent.position != self._goal:
+                self._agent_index = int(np.random.randint(self._n_states))
+                if self._agent_index != self._goal_index:
                     break
-            self._grid[self._agent.position[0], self._agent.position[1]] = 2
-    
+        self._agent.position = self.index_to_position(self._agent_index)
+        self._grid.flat[self._agent_index] = 2
+
     def _is_goal_reached(self) -> bool:
         """
         Check if the agent has reached the goal.
@@ -80,8 +163,8 @@ class GridWorld:
         Returns:
             bool: True if the agent has reached the goal, False otherwise.
         """
-        return self._agent.position == self._goal
-    
+        return self._agent_index == self._goal_index
+
     def _get_reward(self, move_successful: bool = None) -> float:
         """
         Get the reward based on the agent's action and position.
@@ -96,24 +179,24 @@ class GridWorld:
             return self._reward_vector[0] # If the agent has reached the goal, return a reward of 10
         elif move_successful:
             return self._reward_vector[1] # If the agent has moved successfully, return a reward of -0.1
-        else: 
+        else:
             return self._reward_vector[2] # If the agent has hit a wall/invalid move, return a reward of -1
 
-    def _get_agent_position(self) -> Tuple[int, int]:
+    def _get_agent_position(self) -> Tuple[int, ...]:
         """
         Get the current position of the agent.
 
         Returns:
-            tuple: The (x, y) coordinates of the agent's current position.
+            tuple: The (x, y, ...) coordinates of the agent's current position.
         """
         return self._agent.position
-    
-    def step_agent(self, action: str) -> Tuple[float, bool]:
+
+    def step_agent(self, action: Union[str, int]) -> Tuple[float, bool]:
         """
         Perform a step in the environment by moving the agent.
 
         Args:
-            action (str): The direction to move the agent. Can be 'up', 'down', 'left', or 'right'.
+            action (str or int): The direction to move the agent, by name ('up', 'down', 'left', 'right', ...) or action index.
 
         Returns:
             tuple: A tuple containing the reward for the action and a boolean indicating if the goal has been reached.
@@ -124,6 +207,48 @@ class GridWorld:
 
         return reward, done
 
+    def set_stochastic_dynamics(self, action_probabilities: np.ndarray = None):
+        """
+        Make the executed action random, e.g. with probabilities from slip_action_probabilities.
+        The outcome distributions are compiled into an alias table once, here. Probabilities shared by every state
+        keep a single row per action, so the table does not grow with the grid.
+
+        Args:
+            action_probabilities (np.ndarray, optional): Probability of executing action b when choosing action a, [a, b],
+                shaped (n_actions, n_actions) for every state alike or (n_states, n_actions, n_actions) per state.
+                None restores deterministic dynamics. Defaults to None.
+
+        Raises:
+            ValueError: If action_probabilities has neither shape.
+        """
+        if action_probabilities is None:
+            self._action_probabilities = None
+            self._executed_actions = None
+            self._executed_row_stride = 0
+            return
+        n_actions = len(self._actions)
+        action_probabilities = np.asarray(action_probabilities, dtype=float)
+        if action_probabilities.shape not in ((n_actions, n_actions), (self._n_states, n_actions, n_actions)):
+            raise ValueError(f"Action probabilities must be shaped ({n_actions}, {n_actions}) or ({self._n_states}, {n_actions}, {n_actions})!")
+        self._executed_actions = AliasTable(action_probabilities.reshape(-1, n_actions))
+        self._executed_row_stride = n_actions if action_probabilities.ndim == 3 else 0
+        self._action_probabilities = action_probabilities
+
+    def sample_executed_actions(self, states: np.ndarray, actions: np.ndarray) -> np.ndarray:
+        """
+        Sample the executed action of many state-action pairs at once, for vectorized environments.
+
+        Args:
+            states (np.ndarray): Flat state indices.
+            actions (np.ndarray): Chosen action indices, shaped like states.
+
+        Returns:
+            np.ndarray: The executed action indices, the chosen ones if the dynamics are deterministic.
+        """
+        if self._executed_actions is None:
+            return np.asarray(actions)
+        return self._executed_actions.sample(np.asarray(states) * self._executed_row_stride + np.asarray(actions))
+
     def set_agent(self, agent: Agent = None):
         """
         Set the agent for the environment.
@@ -131,7 +256,7 @@ class GridWorld:
         Args:
             agent (Agent, optional): An instance of the Agent class. Defaults to None.
         """
-        self._agent = agent if agent is not None else Agent()
+        self._agent = agent if agent is not None else Agent((0,) * self._n_dims)
         self._reset_agent()
 
     def get_agent(self) -> Agent:
@@ -142,8 +267,8 @@ class GridWorld:
             Agent: The agent in the environment.
         """
         return self._agent
-    
-    def get_state(self) -> Tuple[np.ndarray, Tuple[int,int]]:
+
+    def get_state(self) -> Tuple[np.ndarray, Tuple[int, ...]]:
         """
         Get the current state of the grid and the agent's position.
 
@@ -151,16 +276,119 @@ class GridWorld:
             tuple: A tuple containing the grid and the agent's current position.
         """
         return self._grid, self._get_agent_position()
-    
-    def reset(self, agent_position: Tuple[int,int] = None):
+
+    def get_state_index(self) -> int:
+        """
+        Get the flat state index of the agent's current position, used to index the rows of a Q-table.
+
+        Returns:
+            int: The flat index of the agent's current position.
+        """
+        return self._agent_index
+
+    def get_grid_dim(self) -> Tuple[int, ...]:
+        """
+        Get the dimensions of the grid.
+
+        Returns:
+            tuple: The grid dimensions.
+        """
+        return self._grid_dim
+
+    def get_goal(self) -> Tuple[int, ...]:
+        """
+        Get the goal position.
+
+        Returns:
+            tuple: The (x, y, ...) coordinates of the goal.
+        """
+        return self._goal
+
+    def get_reward_vector(self) -> list:
+        """
+        Get the rewards for reaching the goal, moving, and an invalid move.
+
+        Returns:
+            list: The reward vector.
+        """
+        return self._reward_vector
+
+    def get_num_states(self) -> int:
+        """
+        Get the number of states (grid cells), the number of rows of a Q-table for this grid.
+
+        Returns:
+            int: The number of states.
+        """
+        return self._n_states
+
+    def get_actions(self) -> dict:
+        """
+        Get the dictionary of action names to action indices for this grid.
+
+        Returns:
+            dict: Dictionary mapping action names to indices.
+        """
+        return dict(self._actions)
+
+    def get_action_probabilities(self) -> np.ndarray:
+        """
+        Get the probabilities of the executed actions set with set_stochastic_dynamics.
+
+        Returns:
+            np.ndarray: Probability of executing action b when choosing action a, [a, b] shaped (n_actions, n_actions)
+                        if every state shares them, else [state, a, b] shaped (n_states, n_actions, n_actions),
+                        or None if the dynamics are deterministic.
+        """
+        return self._action_probabilities
+
+    def get_transition_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the precomputed transition table of the grid.
+
+        Returns:
+            tuple: The next state index of each (state, action), shaped (n_states, n_actions),
+                   and whether each move stays inside the grid.
+        """
+        return self._transitions, self._valid_moves
+
+    def position_to_index(self, position: Tuple[int, ...]) -> int:
+        """
+        Convert (x, y, ...) coordinates into a flat state index.
+
+        Args:
+            position (tuple): The coordinates to convert.
+
+        Returns:
+            int: The flat state index.
+        """
+        return sum(coordinate * stride for coordinate, stride in zip(position, self._strides))
+
+    def index_to_position(self, index: int) -> Tuple[int, ...]:
+        """
+        Convert a flat state index into (x, y, ...) coordinates.
+
+        Args:
+            index (int): The flat state index to convert.
+
+        Returns:
+            tuple: The coordinates of the state.
+        """
+        position = []
+        for stride in self._strides:
+            coordinate, index = divmod(index, stride)
+            position.append(coordinate)
+        return tuple(position)
+
+    def reset(self, agent_position: Tuple[int, ...] = None):
         """
         Reset the environment to its initial state and randomizes agent position.
 
         Args:
-            agent_position (tuple, optional): The (x, y) coordinates to reset the agent to. Defaults to None.
+            agent_position (tuple, optional): The (x, y, ...) coordinates to reset the agent to. Defaults to None.
         """
         self._grid = np.zeros(self._grid_dim, dtype=int)
         if agent_position is not None:
             self._reset_agent(agent_position)
         else:
-            self._reset_agent()
\ No newline at end of file
+            self._reset_agent()
@@ -1,8 +1,9 @@
 """
 learning.py
 
-Description: This module implements the Q-learning and Q(lambda) algorithms for a GridWorld environment. 
+Description: This module implements the Q-learning, n-step Q-learning and Q(lambda) algorithms for a GridWorld environment. 
             It includes functions for running episodes, selecting actions using an epsilon-greedy policy, and updating the Q-table and eligibility traces.
+            States are flat integer indices (see GridWorld.get_state_index) and Q-tables are shaped (n_states, n_actions).
 Author: Lucas Pinto
 Date: February 12, 2025
 
@@ -11,6 +12,9 @@ Modules:
     utils - Utility functions used in the project.
     grid_world - The GridWorld environment class.
     agent - The Agent class that interacts with the environment.
+    replay - The ReplayBuffer used as the Dyna-Q model.
+    model - The TabularModel used by prioritized sweeping.
+    priority_queue - The IndexedMaxHeap used by prioritized sweeping.
     typing - For type hinting.
 
 Functions:
@@ -18,6 +22,12 @@ Functions:
     Q_learning_table_update - Updates the Q-table using the Q-learning algorithm.
     Q_lambda_episode - Runs a single episode of the Q(λ) algorithm.
     Q_lambda_table_update - Updates the Q-table and eligibility traces using the Q(λ) algorithm.
+    n_step_Q_learning_episode - Runs a single episode of n-step Q-learning with a ring buffer of the last n transitions.
+    n_step_Q_learning_table_update - Updates a Q-value towards an n-step return.
+    Dyna_Q_episode - Runs a single episode of the Dyna-Q algorithm with replayed planning backups.
+    Q_learning_batch_update - Applies vectorized Q-learning backups for a batch of transitions.
+    prioritized_sweeping_episode - Runs a single episode of Q-learning with prioritized sweeping.
+    prioritized_sweeping_update - Updates the model and performs prioritized planning backups.
     epsilon_greedy_selection - Selects an action using the epsilon-greedy policy.
 
 Usage:
@@ -30,6 +40,9 @@ import numpy as np
 from utils import *
 from grid_world import GridWorld
 from agent import Agent
+from replay import ReplayBuffer
+from model import TabularModel
+from priority_queue import IndexedMaxHeap
 from typing import Tuple
 
 def Q_learning_episode(grid_world: GridWorld = None, 
@@ -50,7 +63,7 @@ def Q_learning_episode(grid_world: GridWorld = None,
         grid_world (GridWorld, optional): The environment in which the agent operates. Defaults to None.
         agent (Agent, optional): The agent that interacts with the environment. Defaults to None.
         actions (list, optional): List of possible actions the agent can take. Defaults to None.
-        q_table (np.ndarray, optional): Q-table used to store and update Q-values. Defaults to None.
+        q_table (np.ndarray, optional): Q-table used to store and update Q-values, shaped (n_states, n_actions). Defaults to None.
         selection_function (callable, optional): Function used to select actions based on Q-values. Defaults to None.
         function_args (dict, optional): Arguments for the selection function. Defaults to None.
         alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
@@ -85,7 +98,7 @@ def Q_learning_episode(grid_world: GridWorld = None,
     if not callable(selection_function):
         raise ValueError("Selection function must be callable!")
     try: 
-        test_state = grid_world.get_state()[1]
+        test_state = grid_world.get_state_index()
         selection_function(test_state, **function_args)
     except TypeError as e:
         raise ValueError(f"Selection function arguments are invalid: {e}")
@@ -100,7 +113,7 @@ def Q_learning_episode(grid_world: GridWorld = None,
     goal_reached = False
 
     while not goal_reached:
-        state = grid_world.get_state()[1]  # Get the current state of the environment
+        state = grid_world.get_state_index()  # Get the current state of the environment
         action = selection_function(state, **function_args)
 
         reward, goal_reached = grid_world.step_agent(get_key_by_value(actions, action))
@@ -109,7 +122,7 @@ def Q_learning_episode(grid_world: GridWorld = None,
         steps_taken += 1 if enable_record[1] else None
         total_reward += reward if enable_record[2] else None
 
-        next_state = grid_world.get_state()[1]  # Get the next state of the environment
+        next_state = grid_world.get_state_index()  # Get the next state of the environment
 
         Q_learning_table_update(state, next_state, action, reward, q_table, alpha, gamma)
 
@@ -117,8 +130,8 @@ def Q_learning_episode(grid_world: GridWorld = None,
 
     return action_sequence, total_reward, steps_taken, final_q_table
 
-def Q_learning_table_update(state: Tuple[int, ...] = None,
-                           next_state: Tuple[int, ...] = None, 
+def Q_learning_table_update(state: int = None,
+                           next_state: int = None, 
                            action: int = None, 
                            reward: float = None, 
                            q_table: np.ndarray = None,
@@ -128,8 +141,8 @@ def Q_learning_table_update(state: Tuple[int, ...] = None,
     Updates the Q-table using the Q-learning algorithm.
 
     Args:
-        state (Tuple[int, ...], optional): The current state of the environment. Defaults to None.
-        next_state (Tuple[int, ...], optional): The next state of the environment. Defaults to None.
+        state (int, optional): Flat index of the current state of the environment. Defaults to None.
+        next_state (int, optional): Flat index of the next state of the environment. Defaults to None.
         action (int, optional): The action taken by the agent. Defaults to None.
         reward (float, optional): The reward received after taking the action. Defaults to None.
         q_table (np.ndarray, optional): Array of Q-values for each state-action pair. Defaults to None.
@@ -155,17 +168,17 @@ def Q_learning_table_update(state: Tuple[int, ...] = None,
         raise ValueError("reward cannot be None!")
     
     try:
-        q_table[(*state, action)]
+        q_table[state, action]
     except TypeError as e:
         raise ValueError("state and action must be usable to access the q_table!")
     
     # Compute the TD error
     td_error = (reward 
-                + gamma * np.max(q_table[(*next_state, )]) 
-                - q_table[(*state, action)])
+                + gamma * np.max(q_table[next_state]) 
+                - q_table[state, action])
 
     # Update the Q-value for the state-action pair
-    q_table[(*state, action)] = (q_table[(*state, action)] + alpha * (td_error))
+    q_table[state, action] = (q_table[state, action] + alpha * (td_error))
 
     pass
 
@@ -188,7 +201,7 @@ def Q_lambda_episode(grid_world: GridWorld = None,
         grid_world (GridWorld, optional): The environment in which the agent operates. Defaults to None.
         agent (Agent, optional): The agent that interacts with the environment. Defaults to None.
         actions (list, optional): List of possible actions the agent can take. Defaults to None.
-        q_table (np.ndarray, optional): Q-table used to store and update Q-values. Defaults to None.
+        q_table (np.ndarray, optional): Q-table used to store and update Q-values, shaped (n_states, n_actions). Defaults to None.
         selection_function (callable, optional): Function used to select actions based on Q-values. Defaults to None.
         function_args (dict, optional): Arguments for the selection function. Defaults to None.
         alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
@@ -224,7 +237,7 @@ def Q_lambda_episode(grid_world: GridWorld = None,
     if not callable(selection_function):
         raise ValueError("Selection function must be callable!")
     try: 
-        test_state = grid_world.get_state()[1]
+        test_state = grid_world.get_state_index()
         selection_function(test_state, **function_args)
     except TypeError as e:
         raise ValueError(f"Selection function arguments are invalid: {e}")
@@ -242,7 +255,7 @@ def Q_lambda_episode(grid_world: GridWorld = None,
     e_table = np.zeros_like(q_table)
 
     while not goal_reached:
-        state = grid_world.get_state()[1] # Get the current state of the environment
+        state = grid_world.get_state_index() # Get the current state of the environment
         action = selection_function(state, **function_args)
 
         reward, goal_reached = grid_world.step_agent(get_key_by_value(actions, action))
@@ -251,7 +264,7 @@ def Q_lambda_episode(grid_world: GridWorld = None,
         steps_taken += 1 if enable_record[1] else None
         total_reward += reward if enable_record[2] else None
 
-        next_state = grid_world.get_state()[1] # Get the next state of the environment
+        next_state = grid_world.get_state_index() # Get the next state of the environment
 
         Q_lambda_table_update(state, next_state, action, reward, q_table, e_table, alpha, gamma, lambda_)
 
@@ -259,8 +272,8 @@ def Q_lambda_episode(grid_world: GridWorld = None,
 
     return action_sequence, total_reward, steps_taken, final_q_table
 
-def Q_lambda_table_update(state: Tuple[int, ...] = None,
-                          next_state: Tuple[int, ...] = None, 
+def Q_lambda_table_update(state: int = None,
+                          next_state: int = None, 
                           action: int = None, 
                           reward: float = None, 
                           q_table: np.ndarray = None,
@@ -272,8 +285,8 @@ def Q_lambda_table_update(state: Tuple[int, ...] = None,
     Updates the Q-table and eligibility traces using the Q(λ) algorithm.
 
     Args:
-        state (Tuple[int, ...], optional): The current state of the environment. Defaults to None.
-        next_state (Tuple[int, ...], optional): The next state of the environment. Defaults to None.
+        state (int, optional): Flat index of the current state of the environment. Defaults to None.
+        next_state (int, optional): Flat index of the next state of the environment. Defaults to None.
         action (int, optional): The action taken by the agent. Defaults to None.
         reward (float, optional): The reward received after taking the action. Defaults to None.
         q_table (np.ndarray, optional): Array of Q-values for each state-action pair. Defaults to None.
@@ -305,18 +318,18 @@ def Q_lambda_table_update(state: Tuple[int, ...] = None,
         raise ValueError("reward cannot be None!")
 
     try:
-        q_table[(*state, action)]
-        e_table[(*state, action)]
+        q_table[state, action]
+        e_table[state, action]
     except TypeError as e:
         raise ValueError("state and action must be usable to access the q_table and e_table!")
 
     # Compute TD error 
     td_error = (reward 
-                + gamma * np.max(q_table[(*next_state,)]) 
-                - q_table[(*state, action)])
+                + gamma * np.max(q_table[next_state]) 
+                - q_table[state, action])
 
     # Update eligibility trace for the current state-action pair
-    e_table[(*state, action)] += 1  # Replaces "replacing traces" method
+    e_table[state, action] += 1  # Replaces "replacing traces" method
 
     # Update Q-values for all state-action pairs
     q_table += alpha * td_error * e_table
@@ -324,11 +337,501 @@ def Q_lambda_table_update(state: Tuple[int, ...] = None,
     # Decay eligibility traces
     e_table *= gamma * lambda_
 
-def decaying_epsilon_greedy_Q_selection(state: Tuple[int, ...], q_table: np.ndarray = None, epsilon: float = 0.1, decay: float = 0.99, episode: int = None) -> int:
+def n_step_Q_learning_episode(grid_world: GridWorld = None, 
+                              agent: Agent = None, 
+                              actions: list = None,
+                              q_table: np.ndarray = None,
+                              selection_function: callable = None,
+                              function_args: dict = None,
+                              alpha: float = 0.1, 
+                              gamma: float = 0.9, 
+                              n_step: int = 4, 
+                              agent_start: Tuple[int,int] = None,
+                              enable_record: Tuple[bool, bool, bool, bool] = (False, False, False, False)) -> Tuple[list, float, int, list]:
+    """
+    Runs a single episode of n-step Q-learning.
+    The last n transitions are kept in preallocated ring buffer arrays, and each step updates only the oldest of them
+    with its n-step return, so the cost per step is O(n) whatever the size of the grid. When the goal is reached
+    the transitions still in the buffer are flushed with their shorter, unbootstrapped returns.
+    Returns a tuple containing the action sequence, total reward, steps taken, and the final Q-table.
+
+    Args:
+        grid_world (GridWorld, optional): The environment in which the agent operates. Defaults to None.
+        agent (Agent, optional): The agent that interacts with the environment. Defaults to None.
+        actions (list, optional): List of possible actions the agent can take. Defaults to None.
+        q_table (np.ndarray, optional): Q-table used to store and update Q-values, shaped (n_states, n_actions). Defaults to None.
+        selection_function (callable, optional): Function used to select actions based on Q-values. Defaults to None.
+        function_args (dict, optional): Arguments for the selection function. Defaults to None.
+        alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
+        gamma (float, optional): Discount factor for future rewards. Defaults to 0.9.
+        n_step (int, optional): Number of rewards summed before bootstrapping, 1 is ordinary Q-learning. Defaults to 4.
+        agent_start (Tuple[int, int], optional): Starting position of the agent. Defaults to None.
+        enable_record (Tuple[bool, bool, bool, bool], optional): Flags to enable recording of action sequence, steps taken, total reward, and Q-table updates. Defaults to (False, False, False, False).
+
+    Raises:
+        ValueError: If any of the required parameters (grid_world, actions, q_table, selection_function) are None.
+        ValueError: If n_step is smaller than 1.
+        ValueError: If selection_function is not callable or its arguments are invalid.
+
+    Returns:
+        Tuple[list, float, int, list]: A tuple containing:
+            - action_sequence (list): Sequence of actions taken by the agent.
+            - total_reward (float): Total reward accumulated during the episode.
+            - steps_taken (int): Number of steps taken to reach the goal.
+            - final_q_table (list): The final Q-table after the episode.
+    """
+
+    # Parameter checks
+    if grid_world is None:
+        raise ValueError("GridWorld cannot be None!")
+    if actions is None:
+        raise ValueError("Actions cannot be None!")
+    if q_table is None:
+        raise ValueError("Q-table cannot be None!")
+    if selection_function is None:
+        raise ValueError("Selection function cannot be None!")
+    if n_step < 1:
+        raise ValueError("n_step must be at least 1!")
+    if agent is None:
+        grid_world.set_agent(Agent())
+
+    if not callable(selection_function):
+        raise ValueError("Selection function must be callable!")
+    try: 
+        test_state = grid_world.get_state_index()
+        selection_function(test_state, **function_args)
+    except TypeError as e:
+        raise ValueError(f"Selection function arguments are invalid: {e}")
+
+    grid_world.reset(agent_start)
+
+    action_sequence = []
+    final_q_table = None
+    steps_taken = 0
+    total_reward = 0
+
+    goal_reached = False
+
+    # Ring buffer of the last n transitions, transition t is kept in slot t % n
+    ring_states = np.zeros(n_step, dtype=int)
+    ring_actions = np.zeros(n_step, dtype=int)
+    ring_rewards = np.zeros(n_step)
+
+    # Row h holds gamma^i at slot (h + i) % n, so the return of the transition in slot h is one dot product
+    offsets = (np.arange(n_step)[None, :] - np.arange(n_step)[:, None]) % n_step
+    discounts = gamma ** offsets
+    bootstrap_discount = gamma ** n_step
+
+    transitions = 0
+    while not goal_reached:
+        state = grid_world.get_state_index() # Get the current state of the environment
+        action = selection_function(state, **function_args)
+
+        reward, goal_reached = grid_world.step_agent(get_key_by_value(actions, action))
+
+        action_sequence.append(action) if enable_record[0] else None
+        steps_taken += 1 if enable_record[1] else None
+        total_reward += reward if enable_record[2] else None
+
+        next_state = grid_world.get_state_index() # Get the next state of the environment
+
+        slot = transitions % n_step
+        ring_states[slot], ring_actions[slot], ring_rewards[slot] = state, action, reward
+        transitions += 1
+
+        # The buffer is full, so the oldest transition (in the next slot) has all n rewards
+        if (transitions >= n_step) and not goal_reached:
+            oldest = transitions % n_step
+            n_step_Q_learning_table_update(ring_states[oldest], ring_actions[oldest], ring_rewards @ discounts[oldest],
+                                           next_state, q_table, alpha, bootstrap_discount)
+
+    # Flush the transitions left in the buffer, their returns end at the goal so nothing is bootstrapped
+    for transition in range(max(transitions - n_step, 0), transitions):
+        oldest = transition % n_step
+        n_step_Q_learning_table_update(ring_states[oldest], ring_actions[oldest], ring_rewards @ discounts[oldest],
+                                       None, q_table, alpha)
+        ring_rewards[oldest] = 0 # Already flushed rewards are not part of the later returns
+
+    final_q_table = q_table.copy() if enable_record[3] else None
+
+    return action_sequence, total_reward, steps_taken, final_q_table
+
+def n_step_Q_learning_table_update(state: int = None,
+                                   action: int = None, 
+                                   discounted_return: float = None, 
+                                   bootstrap_state: int = None, 
+                                   q_table: np.ndarray = None,
+                                   alpha: float = 0.1, 
+                                   bootstrap_discount: float = 0.0):
+    """
+    Updates a single Q-value towards an n-step return.
+
+    Args:
+        state (int, optional): Flat index of the state the n steps started from. Defaults to None.
+        action (int, optional): The action taken in that state. Defaults to None.
+        discounted_return (float, optional): Discounted sum of the n rewards that followed. Defaults to None.
+        bootstrap_state (int, optional): Flat index of the state n steps later, None if the episode ended before it. Defaults to None.
+        q_table (np.ndarray, optional): Array of Q-values for each state-action pair. Defaults to None.
+        alpha (float, optional): Learning rate. Defaults to 0.1.
+        bootstrap_discount (float, optional): Discount of the bootstrapped value, gamma ** n. Defaults to 0.0.
+
+    Raises:
+        ValueError: If q_table is None.
+        ValueError: If state is None.
+        ValueError: If action is None.
+        ValueError: If discounted_return is None.
+        ValueError: If state and action cannot be used to access the q_table.
+    """
+    if q_table is None:
+        raise ValueError("q_table cannot be None!")
+    if state is None:
+        raise ValueError("state cannot be None!")
+    if action is None:
+        raise ValueError("action cannot be None!")
+    if discounted_return is None:
+        raise ValueError("discounted_return cannot be None!")
+
+    try:
+        q_table[state, action]
+    except TypeError as e:
+        raise ValueError("state and action must be usable to access the q_table!")
+
+    # Compute the n-step TD error, bootstrapping from the state n steps later unless the episode ended first
+    target = discounted_return
+    if bootstrap_state is not None:
+        target += bootstrap_discount * np.max(q_table[bootstrap_state])
+    td_error = target - q_table[state, action]
+
+    # Update the Q-value for the state-action pair
+    q_table[state, action] += alpha * td_error
+
+def Dyna_Q_episode(grid_world: GridWorld = None, 
+                   agent: Agent = None, 
+                   actions: list = None,
+                   q_table: np.ndarray = None,
+                   selection_function: callable = None,
+                   function_args: dict = None,
+                   alpha: float = 0.1, 
+                   gamma: float = 0.9, 
+                   replay_buffer: ReplayBuffer = None,
+                   planning_steps: int = 10,
+                   agent_start: Tuple[int,int] = None,
+                   enable_record: Tuple[bool, bool, bool, bool] = (False, False, False, False)) -> Tuple[list, float, int, list]:
+    """
+    Runs a single episode of the Dyna-Q algorithm.
+    Every real step is backed up as in Q-learning, stored in the replay buffer, and followed by
+    a batch of simulated backups sampled from the buffer. The stored transitions are real samples and act as
+    the learned model of the environment, so under slip or wind the replayed outcomes follow the observed
+    outcome distribution.
+    Returns a tuple containing the action sequence, total reward, steps taken, and the final Q-table.
+
+    Args:
+        grid_world (GridWorld, optional): The environment in which the agent operates. Defaults to None.
+        agent (Agent, optional): The agent that interacts with the environment. Defaults to None.
+        actions (list, optional): List of possible actions the agent can take. Defaults to None.
+        q_table (np.ndarray, optional): Q-table used to store and update Q-values, shaped (n_states, n_actions). Defaults to None.
+        selection_function (callable, optional): Function used to select actions based on Q-values. Defaults to None.
+        function_args (dict, optional): Arguments for the selection function. Defaults to None.
+        alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
+        gamma (float, optional): Discount factor for future rewards. Defaults to 0.9.
+        replay_buffer (ReplayBuffer, optional): Memory of past transitions, kept across episodes. Defaults to None.
+        planning_steps (int, optional): Number of simulated backups per real step. Defaults to 10.
+        agent_start (Tuple[int, int], optional): Starting position of the agent. Defaults to None.
+        enable_record (Tuple[bool, bool, bool, bool], optional): Flags to enable recording of action sequence, steps taken, total reward, and Q-table updates. Defaults to (False, False, False, False).
+
+    Raises:
+        ValueError: If any of the required parameters (grid_world, actions, q_table, selection_function, replay_buffer) are None.
+        ValueError: If selection_function is not callable or its arguments are invalid.
+
+    Returns:
+        Tuple[list, float, int, list]: A tuple containing:
+            - action_sequence (list): Sequence of actions taken by the agent.
+            - total_reward (float): Total reward accumulated during the episode.
+            - steps_taken (int): Number of steps taken to reach the goal.
+            - final_q_table (list): The final Q-table after the episode.
+    """
+
+    # Parameter checks
+    if grid_world is None:
+        raise ValueError("GridWorld cannot be None!")
+    if actions is None:
+        raise ValueError("Actions cannot be None!")
+    if q_table is None:
+        raise ValueError("Q-table cannot be None!")
+    if selection_function is None:
+        raise ValueError("Selection function cannot be None!")
+    if replay_buffer is None:
+        raise ValueError("Replay buffer cannot be None!")
+    if agent is None:
+        grid_world.set_agent(Agent())
+
+    if not callable(selection_function):
+        raise ValueError("Selection function must be callable!")
+    try: 
+        test_state = grid_world.get_state_index()
+        selection_function(test_state, **function_args)
+    except TypeError as e:
+        raise ValueError(f"Selection function arguments are invalid: {e}")
+
+    grid_world.reset(agent_start)
+
+    action_sequence = []
+    final_q_table = None
+    steps_taken = 0
+    total_reward = 0
+
+    goal_reached = False
+
+    while not goal_reached:
+        state = grid_world.get_state_index() # Get the current state of the environment
+        action = selection_function(state, **function_args)
+
+        reward, goal_reached = grid_world.step_agent(get_key_by_value(actions, action))
+
+        action_sequence.append(action) if enable_record[0] else None
+        steps_taken += 1 if enable_record[1] else None
+        total_reward += reward if enable_record[2] else None
+
+        next_state = grid_world.get_state_index() # Get the next state of the environment
+
+        Q_learning_table_update(state, next_state, action, reward, q_table, alpha, gamma)
+
+        replay_buffer.push(state, action, reward, next_state, goal_reached)
+
+        if planning_steps > 0: # Simulated experience from the model
+            Q_learning_batch_update(*replay_buffer.sample(planning_steps), q_table, alpha, gamma)
+
+    final_q_table = q_table.copy() if enable_record[3] else None
+
+    return action_sequence, total_reward, steps_taken, final_q_table
+
+def Q_learning_batch_update(states: np.ndarray = None,
+                            actions: np.ndarray = None,
+                            rewards: np.ndarray = None,
+                            next_states: np.ndarray = None,
+                            dones: np.ndarray = None,
+                            q_table: np.ndarray = None,
+                            alpha: float = 0.1, 
+                            gamma: float = 0.9):
+    """
+    Applies Q-learning backups for a batch of transitions in one vectorized operation.
+    All TD errors are computed against the Q-table before the batch, and a state-action pair that appears
+    several times is moved once by the mean of its TD errors, so duplicates never scale the step size beyond alpha.
+
+    Args:
+        states (np.ndarray, optional): Flat indices of the states the actions were taken in. Defaults to None.
+        actions (np.ndarray, optional): The actions taken. Defaults to None.
+        rewards (np.ndarray, optional): The rewards received. Defaults to None.
+        next_states (np.ndarray, optional): Flat indices of the resulting states. Defaults to None.
+        dones (np.ndarray, optional): Whether each resulting state is terminal. Defaults to None.
+        q_table (np.ndarray, optional): Array of Q-values for each state-action pair. Defaults to None.
+        alpha (float, optional): Learning rate. Defaults to 0.1.
+        gamma (float, optional): Discount factor. Defaults to 0.9.
+
+    Raises:
+        ValueError: If q_table is None.
+        ValueError: If any of the transition arrays are None.
+    """
+    if q_table is None:
+        raise ValueError("q_table cannot be None!")
+    if states is None or actions is None or rewards is None or next_states is None or dones is None:
+        raise ValueError("Transition arrays cannot be None!")
+
+    # Compute the TD errors, terminal transitions do not bootstrap
+    td_errors = (rewards 
+                 + gamma * np.max(q_table[next_states], axis=1) * ~dones 
+                 - q_table[states, actions])
+
+    # Average the TD errors of repeated state-action pairs, then update each pair once
+    n_actions = q_table.shape[1]
+    pairs, pair_ids, counts = np.unique(np.asarray(states) * n_actions + np.asarray(actions), return_inverse=True, return_counts=True)
+    mean_td_errors = np.bincount(pair_ids.reshape(-1), weights=td_errors.reshape(-1), minlength=len(pairs)) / counts
+    q_table[pairs // n_actions, pairs % n_actions] += alpha * mean_td_errors
+
+def prioritized_sweeping_episode(grid_world: GridWorld = None, 
+                                 agent: Agent = None, 
+                                 actions: list = None,
+                                 q_table: np.ndarray = None,
+                                 selection_function: callable = None,
+                                 function_args: dict = None,
+                                 alpha: float = 0.1, 
+                                 gamma: float = 0.9, 
+                                 model: TabularModel = None,
+                                 queue: IndexedMaxHeap = None,
+                                 planning_steps: int = 10,
+                                 theta: float = 1e-4,
+                                 agent_start: Tuple[int,int] = None,
+                                 enable_record: Tuple[bool, bool, bool, bool] = (False, False, False, False)) -> Tuple[list, float, int, list]:
+    """
+    Runs a single episode of Q-learning with prioritized sweeping.
+    Instead of a single backup per step, state-action pairs are queued by the size of their TD error
+    and the largest ones are backed up first, spreading value changes backwards through their predecessors.
+    Returns a tuple containing the action sequence, total reward, steps taken, and the final Q-table.
+
+    Args:
+        grid_world (GridWorld, optional): The environment in which the agent operates. Defaults to None.
+        agent (Agent, optional): The agent that interacts with the environment. Defaults to None.
+        actions (list, optional): List of possible actions the agent can take. Defaults to None.
+        q_table (np.ndarray, optional): Q-table used to store and update Q-values, shaped (n_states, n_actions). Defaults to None.
+        selection_function (callable, optional): Function used to select actions based on Q-values. Defaults to None.
+        function_args (dict, optional): Arguments for the selection function. Defaults to None.
+        alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
+        gamma (float, optional): Discount factor for future rewards. Defaults to 0.9.
+        model (TabularModel, optional): Learned model of the environment, kept across episodes. Defaults to None.
+        queue (IndexedMaxHeap, optional): Priority queue over flat state-action keys, kept across episodes. Defaults to None.
+        planning_steps (int, optional): Maximum number of queued backups per real step. Defaults to 10.
+        theta (float, optional): Minimum TD error magnitude for a pair to be queued. Defaults to 1e-4.
+        agent_start (Tuple[int, int], optional): Starting position of the agent. Defaults to None.
+        enable_record (Tuple[bool, bool, bool, bool], optional): Flags to enable recording of action sequence, steps taken, total reward, and Q-table updates. Defaults to (False, False, False, False).
+
+    Raises:
+        ValueError: If any of the required parameters (grid_world, actions, q_table, selection_function, model, queue) are None.
+        ValueError: If selection_function is not callable or its arguments are invalid.
+
+    Returns:
+        Tuple[list, float, int, list]: A tuple containing:
+            - action_sequence (list): Sequence of actions taken by the agent.
+            - total_reward (float): Total reward accumulated during the episode.
+            - steps_taken (int): Number of steps taken to reach the goal.
+            - final_q_table (list): The final Q-table after the episode.
+    """
+
+    # Parameter checks
+    if grid_world is None:
+        raise ValueError("GridWorld cannot be None!")
+    if actions is None:
+        raise ValueError("Actions cannot be None!")
+    if q_table is None:
+        raise ValueError("Q-table cannot be None!")
+    if selection_function is None:
+        raise ValueError("Selection function cannot be None!")
+    if model is None:
+        raise ValueError("Model cannot be None!")
+    if queue is None:
+        raise ValueError("Priority queue cannot be None!")
+    if agent is None:
+        grid_world.set_agent(Agent())
+
+    if not callable(selection_function):
+        raise ValueError("Selection function must be callable!")
+    try: 
+        test_state = grid_world.get_state_index()
+        selection_function(test_state, **function_args)
+    except TypeError as e:
+        raise ValueError(f"Selection function arguments are invalid: {e}")
+
+    grid_world.reset(agent_start)
+
+    action_sequence = []
+    final_q_table = None
+    steps_taken = 0
+    total_reward = 0
+
+    goal_reached = False
+
+    while not goal_reached:
+        state = grid_world.get_state_index() # Get the current state of the environment
+        action = selection_function(state, **function_args)
+
+        reward, goal_reached = grid_world.step_agent(get_key_by_value(actions, action))
+
+        action_sequence.append(action) if enable_record[0] else None
+        steps_taken += 1 if enable_record[1] else None
+        total_reward += reward if enable_record[2] else None
+
+        next_state = grid_world.get_state_index() # Get the next state of the environment
+
+        prioritized_sweeping_update(state, action, reward, next_state, goal_reached, q_table, model, queue, alpha, gamma, planning_steps, theta)
+
+    final_q_table = q_table.copy() if enable_record[3] else None
+
+    return action_sequence, total_reward, steps_taken, final_q_table
+
+def prioritized_sweeping_update(state: int = None,
+                                action: int = None,
+                                reward: float = None,
+                                next_state: int = None,
+                                done: bool = False,
+                                q_table: np.ndarray = None,
+                                model: TabularModel = None,
+                                queue: IndexedMaxHeap = None,
+                                alpha: float = 0.1, 
+                                gamma: float = 0.9,
+                                planning_steps: int = 10,
+                                theta: float = 1e-4):
+    """
+    Backs up a real transition directly as in Q-learning, records it in the model, queues it by its remaining TD error,
+    and performs up to planning_steps backups in order of priority, queueing the predecessors of every backed up state.
+    Pairs whose TD error settles below theta are removed from the queue.
+    Planning backups are expected backups over the model's estimated outcome distribution, so they stay
+    correct when slip or wind makes the dynamics stochastic.
+
+    Args:
+        state (int, optional): Flat index of the state the action was taken in. Defaults to None.
+        action (int, optional): The action taken by the agent. Defaults to None.
+        reward (float, optional): The reward received after taking the action. Defaults to None.
+        next_state (int, optional): Flat index of the resulting state. Defaults to None.
+        done (bool, optional): Whether the resulting state is terminal. Defaults to False.
+        q_table (np.ndarray, optional): Array of Q-values for each state-action pair. Defaults to None.
+        model (TabularModel, optional): Learned model of the environment. Defaults to None.
+        queue (IndexedMaxHeap, optional): Priority queue over flat state-action keys. Defaults to None.
+        alpha (float, optional): Learning rate. Defaults to 0.1.
+        gamma (float, optional): Discount factor. Defaults to 0.9.
+        planning_steps (int, optional): Maximum number of queued backups. Defaults to 10.
+        theta (float, optional): Minimum TD error magnitude for a pair to be queued. Defaults to 1e-4.
+
+    Raises:
+        ValueError: If q_table, model or queue is None.
+        ValueError: If state, action, reward or next_state is None.
+    """
+    if q_table is None:
+        raise ValueError("q_table cannot be None!")
+    if model is None:
+        raise ValueError("model cannot be None!")
+    if queue is None:
+        raise ValueError("queue cannot be None!")
+    if state is None or action is None or reward is None or next_state is None:
+        raise ValueError("state, action, reward and next_state cannot be None!")
+
+    n_actions = q_table.shape[-1]
+
+    def model_td_error(state, action):
+        # Expected TD error over the model's outcome distribution, terminal next states do not bootstrap
+        reward, next_states, probabilities, dones = model.predict(state, action)
+        return reward + gamma * np.dot(probabilities, np.max(q_table[next_states], axis=1) * ~dones) - q_table[state, action]
+
+    def queue_pair(state, action):
+        # Priority is the current TD error magnitude, pairs that have settled leave the queue
+        priority = abs(model_td_error(state, action))
+        key = state * n_actions + action
+        if priority > theta:
+            queue.update(key, priority)
+        elif key in queue:
+            queue.remove(key)
+
+    # Learn from the real transition first, so real experience counts even without planning
+    td_error = reward + gamma * np.max(q_table[next_state]) * (not done) - q_table[state, action]
+    q_table[state, action] += alpha * td_error
+
+    model.update(state, action, reward, next_state, done)
+    queue_pair(state, action)
+
+    for _ in range(planning_steps):
+        if len(queue) == 0:
+            break
+        key, _ = queue.pop() # Every queued pair has a priority above theta
+        state, action = divmod(key, n_actions)
+        q_table[state, action] += alpha * model_td_error(state, action)
+
+        # The value of state changed, so its predecessors may now have large TD errors
+        for predecessor_state, predecessor_action in model.predecessors(state):
+            queue_pair(predecessor_state, predecessor_action)
+
+def decaying_epsilon_greedy_Q_selection(state: int, q_table: np.ndarray = None, epsilon: float = 0.1, decay: float = 0.99, episode: int = None) -> int:
     """decaying_epsilon_greedy_Q_selection _summary_
 
     Args:
-        state (Tuple[int, ...]): _description_
+        state (int): _description_
         q_table (np.ndarray, optional): _description_. Defaults to None.
         epsilon (float, optional): _description_. Defaults to 0.1.
         decay (float, optional): _description_. Defaults to 0.99.
@@ -342,17 +845,17 @@ def decaying_epsilon_greedy_Q_selection(state: Tuple[int, ...], q_table: np.ndar
     if episode is None:
         raise ValueError("episode cannot be None!")
     if np.random.rand() < epsilon * decay**episode:
-        return np.random.choice(len(q_table[(*state,)]))
+        return np.random.choice(len(q_table[state]))
     else: # Return the action with the highest Q-value
-        return np.argmax(q_table[(*state,)])
+        return np.argmax(q_table[state])
     pass
 
-def softmax_Q_selection(state: Tuple[int, ...], q_table: np.ndarray = None, tau: float = 0.1) -> int:
+def softmax_Q_selection(state: int, q_table: np.ndarray = None, tau: float = 0.1) -> int:
     """
     Selects an action using the softmax policy.
 
     Args:
-        state (Tuple[int, ...]): The current state of the environment.
+        state (int): Flat index of the current state of the environment.
         q_table (np.ndarray, optional): Array of Q-values for each action. Defaults to None.
         tau (float, optional): Temperature parameter for the softmax function. Defaults to 0.1.
 
@@ -364,19 +867,19 @@ def softmax_Q_selection(state: Tuple[int, ...], q_table: np.ndarray = None, tau:
     if q_table is None:
         raise ValueError("q_table cannot be None!")
 
-    q_values = q_table[(*state, )] # Get the possible Q-values for the current state
+    q_values = q_table[state] # Get the possible Q-values for the current state
     probabilities = np.exp(q_values / tau) / np.sum(np.exp(q_values / tau)) # Softmax + normalization of possible Q-values
     print(probabilities)
     return np.random.choice(len(q_values), p=probabilities) # Return an action based on the probabilities
 
     pass
 
-def epsilon_greedy_selection(state: Tuple[int, ...], q_table: np.ndarray = None, epsilon: float = 0.1) -> int:
+def epsilon_greedy_selection(state: int, q_table: np.ndarray = None, epsilon: float = 0.1) -> int:
     """
     Selects an action using the epsilon-greedy policy.
 
     Args:
-        state (Tuple[int, ...]): The current state of the environment.
+        state (int): Flat index of the current state of the environment.
         q_table (np.ndarray, optional): Array of Q-values for each action. Defaults to None.
         epsilon (float, optional): Probability of choosing a random action. Defaults to 0.1.
 
@@ -389,8 +892,8 @@ def epsilon_greedy_selection(state: Tuple[int, ...], q_table: np.ndarray = None,
     if q_table is None:
         raise ValueError("q_table cannot be None!")
     if np.random.rand() < epsilon:
-        return np.random.choice(len(q_table[(*state,)]))  # Return a random action
+        return np.random.choice(len(q_table[state]))  # Return a random action
     else:  # Return the action with the highest Q-value
-        return np.argmax(q_table[(*state,)])
+        return np.argmax(q_table[state])
     
     pass
@@ -0,0 +1,148 @@
+"""
+model.py
+
+Description: This module defines a tabular model of the environment dynamics learned from observed transitions.
+            Every visited state-action pair keeps its mean reward and a count of each next state it led to, so the model
+            is exact for deterministic grids and converges to the outcome distribution under slip or wind.
+            Along with the outcomes it keeps a predecessor index, so planning methods can find which state-action
+            pairs lead into a given state.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    typing - For type hinting.
+
+Classes:
+    TabularModel
+
+Functions:
+    None
+
+Usage:
+    model = TabularModel(25, 4)
+    model.update(state, action, reward, next_state, done)
+    reward, next_states, probabilities, dones = model.predict(state, action)
+"""
+import numpy as np
+from typing import Tuple
+
+class TabularModel:
+    """
+    A model storing the outcome counts and mean reward of each state-action pair.
+    States are flat integer indices into the Q-table.
+    """
+
+    def __init__(self, n_states: int = 0, n_actions: int = 4):
+        """
+        Initialize an empty model.
+
+        Args:
+            n_states (int, optional): Number of states in the environment. Defaults to 0.
+            n_actions (int, optional): Number of actions available in each state. Defaults to 4.
+        """
+        self._n_actions = n_actions
+        self._counts = np.zeros((n_states, n_actions), dtype=np.int64) # Observations of each pair, 0 marks an unobserved pair
+        self._rewards = np.zeros((n_states, n_actions), dtype=float) # Running mean, exact while every reward is the same
+        self._terminal = np.zeros(n_states, dtype=bool) # States observed to end an episode
+        self._outcomes = {} # Flat state-action key -> {next_state: count}
+        self._predictions = {} # Flat state-action key -> cached predict result, dropped whenever the pair is updated
+        self._predecessors = [{} for _ in range(n_states)] # State -> flat state-action keys leading into it, a dict as an insertion-ordered set
+
+    def update(self, state: int, action: int, reward: float, next_state: int, done: bool):
+        """
+        Record the outcome of taking an action in a state.
+
+        Args:
+            state (int): Flat index of the state the action was taken in.
+            action (int): The action taken by the agent.
+            reward (float): The reward received after taking the action.
+            next_state (int): Flat index of the resulting state.
+            done (bool): Whether the resulting state is terminal.
+        """
+        key = state * self._n_actions + action
+        self._counts[state, action] += 1
+        self._rewards[state, action] += (reward - self._rewards[state, action]) / self._counts[state, action]
+        self._terminal[next_state] |= done
+
+        outcomes = self._outcomes.setdefault(key, {})
+        outcomes[next_state] = outcomes.get(next_state, 0) + 1
+        self._predecessors[next_state][key] = None
+        self._predictions.pop(key, None)
+        if done: # A newly terminal state changes the predictions of every pair leading into it
+            for predecessor_key in self._predecessors[next_state]:
+                self._predictions.pop(predecessor_key, None)
+
+    def predict(self, state: int, action: int) -> Tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the estimated outcome distribution of taking an action in a state.
+
+        Args:
+            state (int): Flat index of the state.
+            action (int): The action taken.
+
+        Raises:
+            KeyError: If the state-action pair has never been observed.
+
+        Returns:
+            Tuple[float, np.ndarray, np.ndarray, np.ndarray]: The mean reward, flat indices of the observed next states,
+                their estimated probabilities, and whether each of them is terminal.
+        """
+        key = state * self._n_actions + action
+        prediction = self._predictions.get(key)
+        if prediction is None:
+            count = self._counts[state, action]
+            if count == 0:
+                raise KeyError((state, action))
+            outcomes = self._outcomes[key]
+            next_states = np.fromiter(outcomes.keys(), dtype=np.int64, count=len(outcomes))
+            probabilities = np.fromiter(outcomes.values(), dtype=float, count=len(outcomes)) / count
+            prediction = (float(self._rewards[state, action]), next_states, probabilities, self._terminal[next_states])
+            self._predictions[key] = prediction
+        return prediction
+
+    def predecessors(self, state: int) -> list:
+        """
+        Get the observed state-action pairs that lead into a state.
+
+        Args:
+            state (int): Flat index of the state.
+
+        Returns:
+            list: List of (state, action) tuples that were observed to lead into the state.
+        """
+        return [divmod(key, self._n_actions) for key in self._predecessors[state]]
+
+    def get_checkpoint_arrays(self) -> dict:
+        """
+        Get the model contents as arrays for saving in a checkpoint.
+        The outcomes and the predecessor index are saved in their insertion order so planning resumes identically.
+
+        Returns:
+            dict: The model tables, the flattened outcomes and the flattened predecessor index.
+        """
+        outcome_keys = np.fromiter(self._outcomes.keys(), dtype=np.int64, count=len(self._outcomes))
+        outcome_lists = [list(outcomes.items()) for outcomes in self._outcomes.values()]
+        predecessor_lists = [list(keys) for keys in self._predecessors]
+        return {'counts': self._counts, 'rewards': self._rewards, 'terminal': self._terminal,
+                'outcome_keys': outcome_keys,
+                'outcomes': np.array([outcome for outcomes in outcome_lists for outcome in outcomes], dtype=np.int64).reshape(-1, 2),
+                'outcome_offsets': np.concatenate(([0], np.cumsum([len(outcomes) for outcomes in outcome_lists]))).astype(np.int64),
+                'predecessors': np.array([key for keys in predecessor_lists for key in keys], dtype=np.int64),
+                'predecessor_offsets': np.concatenate(([0], np.cumsum([len(keys) for keys in predecessor_lists]))).astype(np.int64)}
+
+    def set_checkpoint_arrays(self, arrays: dict):
+        """
+        Restore the model contents from arrays saved in a checkpoint.
+
+        Args:
+            arrays (dict): Arrays as returned by get_checkpoint_arrays.
+        """
+        self._counts = arrays['counts'].copy()
+        self._rewards = arrays['rewards'].copy()
+        self._terminal = arrays['terminal'].copy()
+        self._n_actions = self._counts.shape[1]
+        offsets = arrays['outcome_offsets']
+        outcomes = arrays['outcomes'].tolist()
+        self._outcomes = {key: dict(outcomes[offsets[i]:offsets[i + 1]]) for i, key in enumerate(arrays['outcome_keys'].tolist())}
+        offsets = arrays['predecessor_offsets']
+        self._predecessors = [dict.fromkeys(arrays['predecessors'][offsets[i]:offsets[i + 1]].tolist()) for i in range(len(offsets) - 1)]
+        self._predictions = {}
@@ -0,0 +1,349 @@
+"""
+multi_agent.py
+
+Description: This module defines a GridWorld shared by many agents that all move at the same time.
+            Agents are stored as one array of flat state indices next to an occupancy array of the grid,
+            and a step moves every agent with one lookup into GridWorld's transition table.
+            Conflicts are resolved on the occupancy array without looping over agents: agents claiming the same cell,
+            agents swapping cells, and agents moving into a cell whose occupant stays are blocked, repeated until
+            no conflicts remain (at most one pass per agent, usually one or two). Agents leave the grid when they
+            reach the goal, so the goal never blocks anyone. Agents can share one Q-table or keep one each.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    grid_world - For the transition table of the shared map.
+    learning - For the vectorized Q-learning backups.
+    typing - For type hinting.
+
+Classes:
+    MultiAgentGridWorld
+
+Functions:
+    multi_agent_epsilon_greedy_selection - Selects actions for many agents at once using the epsilon-greedy policy.
+    multi_agent_Q_learning_episode - Runs a single episode of Q-learning for every agent at once.
+
+Usage:
+    environment = MultiAgentGridWorld((10, 10), n_agents=8)
+    q_table = np.zeros((environment.get_num_states(), len(environment.get_actions()))) # Shared
+    q_table = np.zeros((8, environment.get_num_states(), len(environment.get_actions()))) # One per agent
+    total_rewards, steps_taken = multi_agent_Q_learning_episode(environment, q_table, 0.1, 0.1, 0.9)
+"""
+import numpy as np
+from typing import Tuple
+
+from grid_world import GridWorld
+from learning import Q_learning_batch_update
+
+class MultiAgentGridWorld:
+    """
+    A grid shared by many simultaneously moving agents, with collisions resolved on an occupancy array.
+    """
+
+    def __init__(self, grid_dim: Tuple[int, ...] = (5, 5), n_agents: int = 2, goal: Tuple[int, ...] = None,
+                 reward_vector: list = None, collision_reward: float = None):
+        """
+        Initialize the shared grid and place the agents at random.
+
+        Args:
+            grid_dim (tuple, optional): Dimensions of the grid as (rows, columns, ...). Defaults to (5, 5).
+            n_agents (int, optional): Number of agents. Defaults to 2.
+            goal (tuple, optional): Coordinates of the goal position. Defaults to the last cell of the grid.
+            reward_vector (list, optional): Rewards for reaching the goal, moving, and an invalid move. Defaults to [10, -0.1, -1].
+            collision_reward (float, optional): Reward for a move blocked by another agent. Defaults to the invalid move reward.
+
+        Raises:
+            ValueError: If there are not enough free cells for the agents.
+        """
+        self._world = GridWorld(grid_dim, goal=goal, reward_vector=reward_vector)
+        self._transitions, self._valid_moves = self._world.get_transition_table()
+        self._n_states = self._world.get_num_states()
+        self._goal_index = self._world.position_to_index(self._world.get_goal())
+        self._reward_vector = self._world.get_reward_vector()
+        self._collision_reward = collision_reward if collision_reward is not None else self._reward_vector[2]
+
+        if n_agents < 1 or n_agents > self._n_states - 1:
+            raise ValueError(f"Between 1 and {self._n_states - 1} agents fit on this grid!")
+        self._n_agents = n_agents
+        self._agent_ids = np.arange(n_agents)
+
+        self._positions = np.zeros(n_agents, dtype=np.intp) # Flat state index of every agent
+        self._active = np.zeros(n_agents, dtype=bool) # Agents still on the grid
+        self._occupancy = np.full(self._n_states, -1, dtype=np.intp) # Agent id in every cell, -1 if empty
+        self.reset()
+
+    def reset(self, agent_positions: list = None):
+        """
+        Put every agent back on the grid, at the given or random distinct positions excluding the goal.
+
+        Args:
+            agent_positions (list, optional): The (x, y, ...) coordinates of every agent. Defaults to None.
+
+        Raises:
+            ValueError: If the positions are not one distinct non-goal cell per agent.
+        """
+        if agent_positions is not None:
+            positions = np.array([self._world.position_to_index(position) for position in agent_positions], dtype=np.intp)
+            if len(positions) != self._n_agents or len(np.unique(positions)) != self._n_agents or np.any(positions == self._goal_index):
+                raise ValueError("Agent positions must be one distinct non-goal cell per agent!")
+        else: # Random distinct cells, drawn from every cell but the goal
+            free_states = np.delete(np.arange(self._n_states), self._goal_index)
+            positions = np.random.choice(free_states, self._n_agents, replace=False).astype(np.intp)
+
+        self._positions[:] = positions
+        self._active[:] = True
+        self._occupancy[:] = -1
+        self._occupancy[self._positions] = self._agent_ids
+
+    def step_agents(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Move every active agent at once. Agents that already reached the goal are ignored.
+
+        Args:
+            actions (np.ndarray): Action index of every agent, shaped (n_agents,).
+
+        Returns:
+            tuple: The reward of every agent and whether each agent reached the goal with this step, both shaped (n_agents,).
+                   Agents that were no longer active get a reward of 0.
+        """
+        active = self._active
+        positions = self._positions
+        actions = self._world.sample_executed_actions(positions, np.asarray(actions, dtype=np.intp))
+        valid = self._valid_moves[positions, actions] & active
+        targets = np.where(valid, self._transitions[positions, actions], positions)
+
+        moving = valid.copy()
+        while True:
+            claims = np.where(moving, targets, positions)
+            counts = np.bincount(claims[active], minlength=self._n_states)
+            # Several agents claiming one cell, including a staying occupant, all stay (the goal takes anyone)
+            crowded = moving & (counts[targets] > 1) & (targets != self._goal_index)
+            # Two agents moving into each other's cells both stay
+            occupant = self._occupancy[targets]
+            swapping = moving & (occupant >= 0)
+            swapping[swapping] = moving[occupant[swapping]] & (targets[occupant[swapping]] == positions[swapping])
+
+            blocked = crowded | swapping
+            if not blocked.any():
+                break
+            moving &= ~blocked # A blocked agent stays, which can block agents moving into its cell on the next pass
+
+        collided = valid & ~moving
+        self._occupancy[positions[active]] = -1
+        positions[moving] = targets[moving]
+        reached = active & (positions == self._goal_index)
+        active &= ~reached
+        self._occupancy[positions[active]] = self._agent_ids[active]
+
+        rewards = np.where(moving, self._reward_vector[1], self._reward_vector[2])
+        rewards[collided] = self._collision_reward
+        rewards[reached] = self._reward_vector[0]
+        rewards[~(active | reached)] = 0.0
+        return rewards, reached
+
+    def set_stochastic_dynamics(self, action_probabilities: np.ndarray = None):
+        """
+        Make the executed actions random, see GridWorld.set_stochastic_dynamics. Every agent samples independently.
+
+        Args:
+            action_probabilities (np.ndarray, optional): Probability of executing action b when choosing action a, [a, b],
+                per state or for every state alike. None restores deterministic dynamics. Defaults to None.
+        """
+        self._world.set_stochastic_dynamics(action_probabilities)
+
+    def is_done(self) -> bool:
+        """
+        Check if every agent has reached the goal.
+
+        Returns:
+            bool: True if no agent is left on the grid, False otherwise.
+        """
+        return not self._active.any()
+
+    def get_positions(self) -> np.ndarray:
+        """
+        Get the flat state index of every agent, used to index the rows of a Q-table.
+
+        Returns:
+            np.ndarray: The flat indices, shaped (n_agents,). Agents that reached the goal stay at the goal's index.
+        """
+        return self._positions.copy()
+
+    def get_agent_positions(self) -> np.ndarray:
+        """
+        Get the coordinates of every agent.
+
+        Returns:
+            np.ndarray: The (x, y, ...) coordinates, shaped (n_agents, n_dims).
+        """
+        return np.stack(np.unravel_index(self._positions, self._world.get_grid_dim()), axis=1)
+
+    def get_active(self) -> np.ndarray:
+        """
+        Get which agents are still on the grid.
+
+        Returns:
+            np.ndarray: Boolean mask shaped (n_agents,).
+        """
+        return self._active.copy()
+
+    def get_occupancy(self) -> np.ndarray:
+        """
+        Get the agent in every cell of the grid.
+
+        Returns:
+            np.ndarray: The id of the agent in each cell, -1 if empty, shaped like the grid.
+        """
+        return self._occupancy.reshape(self._world.get_grid_dim()).copy()
+
+    def get_num_agents(self) -> int:
+        """
+        Get the number of agents.
+
+        Returns:
+            int: The number of agents.
+        """
+        return self._n_agents
+
+    def get_num_states(self) -> int:
+        """
+        Get the number of states (grid cells), the number of rows of a Q-table for this grid.
+
+        Returns:
+            int: The number of states.
+        """
+        return self._n_states
+
+    def get_actions(self) -> dict:
+        """
+        Get the dictionary of action names to action indices for this grid.
+
+        Returns:
+            dict: Dictionary mapping action names to indices.
+        """
+        return self._world.get_actions()
+
+    def get_grid_dim(self) -> Tuple[int, ...]:
+        """
+        Get the dimensions of the grid.
+
+        Returns:
+            tuple: The grid dimensions.
+        """
+        return self._world.get_grid_dim()
+
+    def get_goal(self) -> Tuple[int, ...]:
+        """
+        Get the goal position.
+
+        Returns:
+            tuple: The (x, y, ...) coordinates of the goal.
+        """
+        return self._world.get_goal()
+
+def _agent_q_rows(q_table: np.ndarray, states: np.ndarray, agent_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    View a shared (n_states, n_actions) or per-agent (n_agents, n_states, n_actions) Q-table as rows indexed by one flat index.
+
+    Args:
+        q_table (np.ndarray): The shared or per-agent Q-table.
+        states (np.ndarray): Flat state index of each agent.
+        agent_ids (np.ndarray): Id of each agent.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The Q-table as a 2-D view and the row index of each agent.
+    """
+    if q_table.ndim == 2:
+        return q_table, states
+    n_states = q_table.shape[1]
+    return q_table.reshape(-1, q_table.shape[-1]), agent_ids * n_states + states
+
+def multi_agent_epsilon_greedy_selection(states: np.ndarray, q_table: np.ndarray = None, epsilon: float = 0.1, agent_ids: np.ndarray = None) -> np.ndarray:
+    """
+    Selects an action for every agent at once using the epsilon-greedy policy.
+
+    Args:
+        states (np.ndarray): Flat state index of each agent.
+        q_table (np.ndarray, optional): Shared (n_states, n_actions) or per-agent (n_agents, n_states, n_actions) Q-table. Defaults to None.
+        epsilon (float, optional): Probability of choosing a random action. Defaults to 0.1.
+        agent_ids (np.ndarray, optional): Id of each agent, needed for per-agent Q-tables. Defaults to 0..len(states)-1.
+
+    Raises:
+        ValueError: If q_table is None.
+
+    Returns:
+        np.ndarray: Index of the selected action of each agent.
+    """
+    if q_table is None:
+        raise ValueError("q_table cannot be None!")
+    states = np.asarray(states)
+    agent_ids = np.arange(len(states)) if agent_ids is None else np.asarray(agent_ids)
+
+    q_rows, rows = _agent_q_rows(q_table, states, agent_ids)
+    selected = np.argmax(q_rows[rows], axis=1)
+    explore = np.random.rand(len(states)) < epsilon
+    selected[explore] = np.random.randint(q_table.shape[-1], size=explore.sum())
+    return selected
+
+def multi_agent_Q_learning_episode(environment: MultiAgentGridWorld = None,
+                                   q_table: np.ndarray = None,
+                                   epsilon: float = 0.1,
+                                   alpha: float = 0.1,
+                                   gamma: float = 0.9,
+                                   agent_positions: list = None,
+                                   max_steps: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Runs a single episode of Q-learning for every agent at once, until every agent reached the goal.
+    Each step selects, moves and backs up all active agents in single vectorized operations.
+    With a shared Q-table, agents backing up the same state-action pair in one step move it once by the mean
+    of their TD errors, so the step size stays alpha however many agents share the pair.
+
+    Args:
+        environment (MultiAgentGridWorld, optional): The shared environment. Defaults to None.
+        q_table (np.ndarray, optional): Shared (n_states, n_actions) or per-agent (n_agents, n_states, n_actions) Q-table. Defaults to None.
+        epsilon (float, optional): Probability of choosing a random action. Defaults to 0.1.
+        alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
+        gamma (float, optional): Discount factor for future rewards. Defaults to 0.9.
+        agent_positions (list, optional): Starting coordinates of every agent, random if None. Defaults to None.
+        max_steps (int, optional): Stop after this many steps even if agents are left. Defaults to None.
+
+    Raises:
+        ValueError: If environment or q_table is None.
+        ValueError: If a per-agent Q-table does not have one table per agent.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: A tuple containing:
+            - total_rewards (np.ndarray): Total reward of every agent, shaped (n_agents,).
+            - steps_taken (np.ndarray): Number of steps every agent took, shaped (n_agents,).
+    """
+    if environment is None:
+        raise ValueError("Environment cannot be None!")
+    if q_table is None:
+        raise ValueError("Q-table cannot be None!")
+    if q_table.ndim == 3 and q_table.shape[0] != environment.get_num_agents():
+        raise ValueError("A per-agent Q-table needs one table per agent!")
+
+    environment.reset(agent_positions)
+
+    total_rewards = np.zeros(environment.get_num_agents())
+    steps_taken = np.zeros(environment.get_num_agents(), dtype=int)
+
+    step = 0
+    while not environment.is_done() and (max_steps is None or step < max_steps):
+        agent_ids = np.flatnonzero(environment.get_active())
+        states = environment.get_positions()[agent_ids]
+        actions = multi_agent_epsilon_greedy_selection(states, q_table, epsilon, agent_ids)
+
+        all_actions = np.zeros(environment.get_num_agents(), dtype=np.intp)
+        all_actions[agent_ids] = actions
+        rewards, reached = environment.step_agents(all_actions)
+        next_states = environment.get_positions()[agent_ids]
+
+        q_rows, rows = _agent_q_rows(q_table, states, agent_ids)
+        _, next_rows = _agent_q_rows(q_table, next_states, agent_ids)
+        Q_learning_batch_update(rows, actions, rewards[agent_ids], next_rows, reached[agent_ids], q_rows, alpha, gamma)
+
+        total_rewards[agent_ids] += rewards[agent_ids]
+        steps_taken[agent_ids] += 1
+        step += 1
+
+    return total_rewards, steps_taken
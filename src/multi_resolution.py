@@ -0,0 +1,190 @@
+"""
+multi_resolution.py
+
+Description: This module trains large grids coarse-to-fine.
+            A GridWorld is downsampled by merging factor x factor (x ...) blocks of cells into one cell, keeping the goal
+            and start in the blocks that contain them. Each level is trained briefly, and its Q-table is upsampled to
+            the next finer level by giving every fine cell the Q-values of the coarse cell it lies in. Actions mean the
+            same at every resolution, so the coarse greedy policy already points the fine agent towards the goal
+            and the long random walks of the first episodes on a zero Q-table are skipped.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    grid_world - The GridWorld environment class.
+    agent - The Agent class that interacts with the environment.
+    learning - For the episode and selection functions.
+    typing - For type hinting.
+
+Functions:
+    coarsen_position - Maps coordinates to the coordinates of the coarse cell containing them.
+    coarsen_grid_world - Builds the downsampled GridWorld of a grid.
+    upsample_q_table - Initializes a fine Q-table from the Q-table of a coarser grid.
+    multi_resolution_Q_learning - Trains a grid coarse-to-fine and returns a Q-table for the full grid.
+
+Usage:
+    q_table, total_rewards, steps_taken = multi_resolution_Q_learning(environment, (8, 4, 2, 1), 100, 0.1, 0.15, 0.95, (0, 0))
+"""
+import numpy as np
+from typing import Tuple, Union
+
+from grid_world import GridWorld
+from agent import Agent
+from learning import Q_learning_episode, epsilon_greedy_selection
+
+def coarsen_position(position: Tuple[int, ...], factor: int) -> Tuple[int, ...]:
+    """
+    Maps coordinates to the coordinates of the coarse cell containing them.
+
+    Args:
+        position (Tuple[int, ...]): The (x, y, ...) coordinates on the fine grid.
+        factor (int): Number of fine cells per coarse cell along each axis.
+
+    Returns:
+        Tuple[int, ...]: The coordinates on the coarse grid.
+    """
+    return tuple(coordinate // factor for coordinate in position)
+
+def coarsen_grid_world(grid_world: GridWorld, factor: int) -> GridWorld:
+    """
+    Builds the downsampled GridWorld of a grid, with the goal in the coarse cell containing it.
+    Dimensions that do not divide evenly are rounded up, so every fine cell lies in exactly one coarse cell.
+    The goal reward is scaled by the ratio of coarse to fine cells, like the area-proportional goal reward of main,
+    so it keeps the same weight against the move penalties of the shorter coarse paths. The move and invalid move rewards are kept.
+    Stochastic dynamics are carried over, shared ones as they are and per-state ones as the mean executed action
+    probabilities of the fine cells in each coarse cell.
+
+    Args:
+        grid_world (GridWorld): The fine grid.
+        factor (int): Number of fine cells per coarse cell along each axis.
+
+    Raises:
+        ValueError: If factor is smaller than 1.
+
+    Returns:
+        GridWorld: The coarse grid.
+    """
+    if factor < 1:
+        raise ValueError("Factor must be at least 1!")
+    coarse_dim = tuple(-(-dim // factor) for dim in grid_world.get_grid_dim()) # Ceiling division
+    reward_vector = list(grid_world.get_reward_vector())
+    reward_vector[0] *= float(np.prod(coarse_dim)) / grid_world.get_num_states()
+    coarse_world = GridWorld(coarse_dim, Agent((0,) * len(coarse_dim)), coarsen_position(grid_world.get_goal(), factor), reward_vector)
+
+    action_probabilities = grid_world.get_action_probabilities()
+    if action_probabilities is not None and action_probabilities.ndim == 2:
+        coarse_world.set_stochastic_dynamics(action_probabilities)
+    elif action_probabilities is not None:
+        coarse_states = _coarse_state_indices(grid_world.get_grid_dim(), coarse_dim, factor)
+        cell_counts = np.bincount(coarse_states, minlength=coarse_world.get_num_states())
+        coarse_probabilities = np.zeros((coarse_world.get_num_states(),) + action_probabilities.shape[1:])
+        np.add.at(coarse_probabilities, coarse_states, action_probabilities)
+        coarse_world.set_stochastic_dynamics(coarse_probabilities / cell_counts[:, None, None])
+    return coarse_world
+
+def _coarse_state_indices(fine_dim: Tuple[int, ...], coarse_dim: Tuple[int, ...], factor: int) -> np.ndarray:
+    """
+    Get the flat index of the coarse cell containing each fine cell.
+
+    Args:
+        fine_dim (Tuple[int, ...]): Dimensions of the fine grid.
+        coarse_dim (Tuple[int, ...]): Dimensions of the coarse grid.
+        factor (int): Number of fine cells per coarse cell along each axis.
+
+    Returns:
+        np.ndarray: Coarse flat state index of every fine flat state index.
+    """
+    coarse_coordinates = np.indices(fine_dim).reshape(len(fine_dim), -1) // factor
+    return np.ravel_multi_index(tuple(coarse_coordinates), coarse_dim)
+
+def upsample_q_table(q_table: np.ndarray, coarse_dim: Tuple[int, ...], fine_dim: Tuple[int, ...], factor: int) -> np.ndarray:
+    """
+    Initializes a fine Q-table by giving every fine cell the Q-values of the coarse cell it lies in.
+
+    Args:
+        q_table (np.ndarray): Q-table of the coarse grid, shaped (n_coarse_states, n_actions).
+        coarse_dim (Tuple[int, ...]): Dimensions of the coarse grid.
+        fine_dim (Tuple[int, ...]): Dimensions of the fine grid.
+        factor (int): Number of fine cells per coarse cell along each axis.
+
+    Returns:
+        np.ndarray: Q-table of the fine grid, shaped (n_fine_states, n_actions).
+    """
+    return q_table[_coarse_state_indices(fine_dim, coarse_dim, factor)]
+
+def multi_resolution_Q_learning(grid_world: GridWorld = None,
+                                factors: Tuple[int, ...] = (4, 2, 1),
+                                episodes: Union[int, Tuple[int, ...]] = 100,
+                                epsilon: float = 0.1,
+                                alpha: float = 0.1,
+                                gamma: float = 0.9,
+                                agent_start: Tuple[int, ...] = None,
+                                episode_function: callable = Q_learning_episode,
+                                episode_args: dict = None) -> Tuple[np.ndarray, list, list]:
+    """
+    Trains a grid coarse-to-fine, each level initialized from the upsampled Q-table of the level before.
+    The last level's Q-table is upsampled to the full grid, so factors without a final 1 only produce a warm start.
+
+    Args:
+        grid_world (GridWorld, optional): The full-resolution grid. Defaults to None.
+        factors (Tuple[int, ...], optional): Downsampling factor of every level, from coarsest to finest, each dividing the one before. Defaults to (4, 2, 1).
+        episodes (int or Tuple[int, ...], optional): Episodes per level, or one count per level. Defaults to 100.
+        epsilon (float, optional): Exploration rate of the epsilon-greedy selection. Defaults to 0.1.
+        alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
+        gamma (float, optional): Discount factor for future rewards. Defaults to 0.9.
+        agent_start (Tuple[int, ...], optional): Starting position on the full grid, random if None.
+            Levels where it lies in the goal's coarse cell start at random cells instead. Defaults to None.
+        episode_function (callable, optional): Episode function called with the keyword arguments of Q_learning_episode. Defaults to Q_learning_episode.
+        episode_args (dict, optional): Extra keyword arguments for the episode function, e.g. {'lambda_': 0.5}. Defaults to None.
+
+    Raises:
+        ValueError: If grid_world is None.
+        ValueError: If the factors are not decreasing multiples or episodes does not have one count per level.
+        ValueError: If a level is coarsened down to a single cell.
+
+    Returns:
+        Tuple[np.ndarray, list, list]: A tuple containing:
+            - q_table (np.ndarray): Q-table of the full grid, shaped (n_states, n_actions).
+            - total_rewards (list): Array of the total reward of every episode, per level.
+            - steps_taken (list): Array of the steps taken in every episode, per level.
+    """
+    if grid_world is None:
+        raise ValueError("GridWorld cannot be None!")
+    if min(factors) < 1 or any(coarse <= fine or coarse % fine != 0 for coarse, fine in zip(factors, factors[1:])):
+        raise ValueError("Factors must be at least 1, decreasing, and each must divide the one before!")
+    episodes = (episodes,) * len(factors) if isinstance(episodes, int) else tuple(episodes)
+    if len(episodes) != len(factors):
+        raise ValueError("Episodes must be one count or one count per level!")
+    episode_args = episode_args if episode_args is not None else {}
+
+    actions = grid_world.get_actions()
+    q_table, q_table_dim, q_table_factor = None, None, None
+    total_rewards, steps_taken = [], []
+
+    for factor, level_episodes in zip(factors, episodes):
+        level = coarsen_grid_world(grid_world, factor) if factor > 1 else grid_world
+        level_dim = level.get_grid_dim()
+        if level.get_num_states() < 2:
+            raise ValueError(f"Factor {factor} leaves a single cell, there is nothing to train!")
+        if q_table is None:
+            q_table = np.zeros((level.get_num_states(), len(actions)))
+        else: # Each cell of the previous level covers q_table_factor // factor cells of this level along each axis
+            q_table = upsample_q_table(q_table, q_table_dim, level_dim, q_table_factor // factor)
+        level_start = coarsen_position(agent_start, factor) if agent_start is not None else None
+        if level_start == level.get_goal(): # The start block holds the goal, so start elsewhere on this level
+            level_start = None
+
+        level_rewards = np.zeros(level_episodes)
+        level_steps = np.zeros(level_episodes, dtype=int)
+        for episode in range(level_episodes):
+            _, level_rewards[episode], level_steps[episode], _ = episode_function(
+                grid_world=level, agent=level.get_agent(), actions=actions, q_table=q_table,
+                selection_function=epsilon_greedy_selection, function_args={'q_table': q_table, 'epsilon': epsilon},
+                alpha=alpha, gamma=gamma, agent_start=level_start, enable_record=(False, True, True, False), **episode_args)
+        total_rewards.append(level_rewards)
+        steps_taken.append(level_steps)
+        q_table_dim, q_table_factor = level_dim, factor
+
+    if q_table_factor > 1: # Warm start only, bring the last level up to the full grid
+        q_table = upsample_q_table(q_table, q_table_dim, grid_world.get_grid_dim(), q_table_factor)
+
+    return q_table, total_rewards, steps_taken
@@ -0,0 +1,291 @@
+"""
+policy.py
+
+Description: This module defines a compiled greedy policy exported from a trained Q-table.
+            The greedy action of every state is precomputed once into a uint8 array (with an optional value array),
+            saved as .npy files that can be memory-mapped, and queried for whole arrays of positions in one vectorized call.
+            A policy can also be evaluated from every start state at once: following it on a grid is a successor pointer
+            per state, and pointer doubling walks all states 2^k steps at a time, finding path lengths, returns and loops
+            in O(n log n) array operations.
+
+Modules:
+    numpy - For numerical operations on arrays and the .npy file format.
+    typing - For type hinting.
+
+Classes:
+    GreedyPolicy
+
+Functions:
+    None
+
+Usage:
+    policy = GreedyPolicy.from_q_table(q_table, (10, 10))
+    policy.save("policy")
+    policy = GreedyPolicy.load("policy")
+    actions = policy.select_actions(np.array([[0, 0], [3, 4]]))
+    evaluation = policy.evaluate(environment)
+"""
+import numpy as np
+from typing import Tuple
+
+class GreedyPolicy:
+    """
+    A precomputed greedy policy, storing one action (and optionally one value) per grid position.
+    """
+
+    def __init__(self, actions: np.ndarray, values: np.ndarray = None):
+        """
+        Initialize the policy from precomputed arrays.
+
+        Args:
+            actions (np.ndarray): Greedy action of every position, shaped like the grid.
+            values (np.ndarray, optional): Greedy value of every position, shaped like the grid. Defaults to None.
+
+        Raises:
+            ValueError: If values does not have the same shape as actions.
+        """
+        if values is not None and values.shape != actions.shape:
+            raise ValueError("actions and values must have the same shape!")
+
+        self._actions = actions
+        self._values = values
+
+    @classmethod
+    def from_q_table(cls, q_table: np.ndarray, grid_dim: Tuple[int, ...] = None, include_values: bool = True) -> 'GreedyPolicy':
+        """
+        Compile a policy from a Q-table shaped (n_states, n_actions).
+
+        Args:
+            q_table (np.ndarray): The trained Q-table.
+            grid_dim (Tuple[int, ...], optional): Dimensions of the grid the flat states are laid out on. Defaults to (n_states,).
+            include_values (bool, optional): Whether to also store the greedy value of each position. Defaults to True.
+
+        Raises:
+            ValueError: If q_table is None or has more than 256 actions.
+
+        Returns:
+            GreedyPolicy: The compiled policy.
+        """
+        if q_table is None:
+            raise ValueError("q_table cannot be None!")
+        if q_table.shape[-1] > 256:
+            raise ValueError("At most 256 actions can be stored as uint8!")
+
+        grid_dim = tuple(grid_dim) if grid_dim is not None else q_table.shape[:-1]
+        actions = np.argmax(q_table, axis=-1).astype(np.uint8).reshape(grid_dim)
+        values = np.max(q_table, axis=-1).astype(np.float32).reshape(grid_dim) if include_values else None
+        return cls(actions, values)
+
+    @classmethod
+    def load(cls, filename: str, mmap: bool = True) -> 'GreedyPolicy':
+        """
+        Load a policy saved with save, memory-mapping the arrays by default so loading is nearly free.
+
+        Args:
+            filename (str): Path prefix the policy was saved under.
+            mmap (bool, optional): Whether to memory-map the files read-only instead of reading them. Defaults to True.
+
+        Returns:
+            GreedyPolicy: The loaded policy, without values if none were saved.
+        """
+        mmap_mode = 'r' if mmap else None
+        actions = np.load(f"{filename}.actions.npy", mmap_mode=mmap_mode)
+        try:
+            values = np.load(f"{filename}.values.npy", mmap_mode=mmap_mode)
+        except FileNotFoundError:
+            values = None
+        return cls(actions, values)
+
+    def save(self, filename: str):
+        """
+        Save the policy as <filename>.actions.npy and, if present, <filename>.values.npy.
+
+        Args:
+            filename (str): Path prefix to save the policy under.
+        """
+        np.save(f"{filename}.actions.npy", np.ascontiguousarray(self._actions))
+        if self._values is not None:
+            np.save(f"{filename}.values.npy", np.ascontiguousarray(self._values))
+
+    def get_grid_dim(self) -> Tuple[int, ...]:
+        """
+        Get the dimensions of the grid the policy covers.
+
+        Returns:
+            Tuple[int, ...]: The grid dimensions.
+        """
+        return self._actions.shape
+
+    def select_action(self, state: Tuple[int, ...]) -> int:
+        """
+        Get the greedy action for a single position.
+
+        Args:
+            state (Tuple[int, ...]): The position of the agent.
+
+        Raises:
+            ValueError: If the position lies outside the grid.
+
+        Returns:
+            int: Index of the greedy action.
+        """
+        return int(self._actions[self._position_indices(np.asarray(state)[None])][0])
+
+    def select_actions(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Get the greedy actions for many positions in one vectorized lookup.
+
+        Args:
+            positions (np.ndarray): Integer array of positions shaped (n, len(grid_dim)).
+
+        Raises:
+            ValueError: If a position lies outside the grid.
+
+        Returns:
+            np.ndarray: uint8 array of the n greedy actions.
+        """
+        return self._actions[self._position_indices(positions)]
+
+    def select_actions_by_index(self, states: np.ndarray) -> np.ndarray:
+        """
+        Get the greedy actions for many flat state indices in one vectorized lookup.
+
+        Args:
+            states (np.ndarray): Integer array of flat state indices.
+
+        Raises:
+            ValueError: If a state index lies outside the grid.
+
+        Returns:
+            np.ndarray: uint8 array of the greedy actions.
+        """
+        states = np.asarray(states)
+        if np.any((states < 0) | (states >= self._actions.size)):
+            raise ValueError(f"State indices must lie in [0, {self._actions.size})!")
+        return self._actions.reshape(-1)[states]
+
+    def get_values(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Get the greedy values for many positions in one vectorized lookup.
+
+        Args:
+            positions (np.ndarray): Integer array of positions shaped (n, len(grid_dim)).
+
+        Raises:
+            ValueError: If the policy was compiled without values, or a position lies outside the grid.
+
+        Returns:
+            np.ndarray: Array of the n greedy values.
+        """
+        if self._values is None:
+            raise ValueError("This policy was compiled without values!")
+        return self._values[self._position_indices(positions)]
+
+    def _position_indices(self, positions: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Check that positions lie inside the grid and split them into per-axis index arrays.
+        Negative coordinates would otherwise wrap around to the far side of the grid.
+
+        Args:
+            positions (np.ndarray): Integer array of positions shaped (n, len(grid_dim)).
+
+        Raises:
+            ValueError: If the positions are not shaped (n, len(grid_dim)) or a position lies outside the grid.
+
+        Returns:
+            Tuple[np.ndarray, ...]: One coordinate array per axis, to index the policy arrays with.
+        """
+        positions = np.asarray(positions)
+        grid_dim = self._actions.shape
+        if positions.ndim != 2 or positions.shape[1] != len(grid_dim):
+            raise ValueError(f"Positions must be shaped (n, {len(grid_dim)})!")
+        if np.any((positions < 0) | (positions >= np.array(grid_dim))):
+            raise ValueError(f"Positions must lie inside the {grid_dim} grid!")
+        return tuple(positions.T)
+
+    def evaluate(self, grid_world, gamma: float = 1.0) -> dict:
+        """
+        Follow the policy from every state of a grid at once, using the grid's deterministic transition table.
+        The goal is absorbing, so after at least n_states steps every state has either reached the goal or
+        is stuck in a loop, and the states left after that many steps (other than the goal) are exactly the loop states.
+
+        Args:
+            grid_world (GridWorld): The grid the policy was trained on.
+            gamma (float, optional): Discount factor of the returns, 1.0 sums the rewards like total_reward. Defaults to 1.0.
+
+        Raises:
+            ValueError: If the grid does not have the policy's dimensions.
+
+        Returns:
+            dict: A dictionary containing, each shaped like the grid where applicable:
+                - path_lengths (np.ndarray): Steps to reach the goal, -1 where the goal is never reached.
+                - returns (np.ndarray): Return of following the policy to the goal, NaN where the goal is never reached.
+                - success (np.ndarray): Whether the goal is reached from each state.
+                - loops (np.ndarray): Whether each state lies on a loop the policy never leaves.
+                - success_rate (float): Fraction of the non-goal states that reach the goal.
+                - mean_path_length (float): Mean steps to the goal over the successful non-goal states.
+        """
+        grid_dim = tuple(grid_world.get_grid_dim())
+        if grid_dim != self.get_grid_dim():
+            raise ValueError(f"The policy covers a {self.get_grid_dim()} grid, not {grid_dim}!")
+
+        transitions, _ = grid_world.get_transition_table()
+        goal = grid_world.position_to_index(grid_world.get_goal())
+        reward_vector = grid_world.get_reward_vector()
+        states = np.arange(len(transitions))
+        greedy = self._actions.reshape(-1).astype(np.intp)
+
+        # One step of the policy from every state, the goal loops onto itself
+        successors = transitions[states, greedy].astype(np.int32 if len(states) < 2**31 else np.int64) # Smaller pointers gather faster
+        successors[goal] = goal
+
+        # Doubling: after round k, successors is the 2^k-th successor and steps counts the first 2^k steps.
+        # Arrived states point at the goal, which has no steps, so whole-array rounds are fastest while most
+        # states are still on their way. After that only the pending states are updated, stopping once all have arrived.
+        steps = (states != goal).astype(successors.dtype)
+        walked = 1
+        while walked < len(states) and np.count_nonzero(successors != goal) > len(states) // 4:
+            steps += steps[successors]
+            successors = successors[successors]
+            walked *= 2
+        pending = np.flatnonzero(successors != goal)
+        while walked < len(states) and pending.size > 0:
+            targets = successors[pending]
+            steps[pending] += steps[targets]
+            successors[pending] = successors[targets]
+            pending = pending[successors[pending] != goal]
+            walked *= 2
+
+        success = successors == goal
+        loops = np.zeros(len(states), dtype=bool)
+        loops[successors[~success]] = True
+
+        # An invalid greedy move would loop in place, so a path to the goal is L - 1 ordinary moves and the goal reward
+        moves = np.maximum(steps - 1, 0).astype(float)
+        if gamma == 1.0:
+            returns = reward_vector[1] * moves + reward_vector[0]
+        else:
+            returns = reward_vector[1] * (1 - gamma**moves) / (1 - gamma) + gamma**moves * reward_vector[0]
+        returns[goal] = 0.0
+
+        non_goal_success = np.delete(success, goal)
+        return {
+            'path_lengths': np.where(success, steps, -1).reshape(grid_dim),
+            'returns': np.where(success, returns, np.nan).reshape(grid_dim),
+            'success': success.reshape(grid_dim),
+            'loops': loops.reshape(grid_dim),
+            'success_rate': float(non_goal_success.mean()) if non_goal_success.size else 1.0,
+            'mean_path_length': float(np.delete(steps, goal)[non_goal_success].mean()) if non_goal_success.any() else np.nan,
+        }
+
+    def __call__(self, state: int) -> int:
+        """
+        Select the greedy action, so the policy can be used as a selection function with empty arguments.
+
+        Args:
+            state (int): Flat index of the agent's state, as passed by the learning algorithms.
+
+        Returns:
+            int: Index of the greedy action.
+        """
+        return int(self._actions.reshape(-1)[state])
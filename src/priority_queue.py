@@ -0,0 +1,223 @@
+"""
+priority_queue.py
+
+Description: This module defines an indexed binary max-heap over a fixed range of integer items.
+            Each item can be in the heap at most once and its priority can be raised or lowered in place,
+            which is what prioritized sweeping needs to keep one entry per state-action pair.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    typing - For type hinting.
+
+Classes:
+    IndexedMaxHeap
+
+Functions:
+    None
+
+Usage:
+    heap = IndexedMaxHeap(100)
+    heap.update(7, 2.5)
+    heap.remove(7)
+    item, priority = heap.pop()
+"""
+import numpy as np
+from typing import Tuple
+
+class IndexedMaxHeap:
+    """
+    A binary max-heap of the integers [0, capacity) with O(log n) insert, pop, remove, and increase/decrease-key.
+    """
+
+    def __init__(self, capacity: int = 0):
+        """
+        Initialize an empty heap able to hold the items 0 to capacity - 1.
+
+        Args:
+            capacity (int, optional): Number of distinct items that can be stored. Defaults to 0.
+        """
+        self._heap = np.zeros(capacity, dtype=np.int64) # Items in heap order
+        self._positions = np.full(capacity, -1, dtype=np.int64) # Heap position of each item, -1 if absent
+        self._priorities = np.zeros(capacity, dtype=float)
+        self._size = 0
+
+    def __len__(self) -> int:
+        """
+        Get the number of items currently in the heap.
+
+        Returns:
+            int: The number of items in the heap.
+        """
+        return self._size
+
+    def __contains__(self, item: int) -> bool:
+        """
+        Check if an item is currently in the heap.
+
+        Args:
+            item (int): The item to look up.
+
+        Returns:
+            bool: True if the item is in the heap, False otherwise.
+        """
+        return self._positions[item] >= 0
+
+    def priority(self, item: int) -> float:
+        """
+        Get the priority of an item in the heap.
+
+        Args:
+            item (int): The item to look up.
+
+        Raises:
+            KeyError: If the item is not in the heap.
+
+        Returns:
+            float: The priority of the item.
+        """
+        if self._positions[item] < 0:
+            raise KeyError(item)
+        return self._priorities[item]
+
+    def update(self, item: int, priority: float):
+        """
+        Insert an item, or change its priority in place if it is already in the heap.
+
+        Args:
+            item (int): The item to insert or update.
+            priority (float): The new priority of the item.
+        """
+        position = self._positions[item]
+        if position < 0: # Insert at the bottom and let it rise
+            position = self._size
+            self._heap[position] = item
+            self._positions[item] = position
+            self._size += 1
+            self._priorities[item] = priority
+            self._sift_up(position)
+        else:
+            old_priority = self._priorities[item]
+            self._priorities[item] = priority
+            if priority > old_priority:
+                self._sift_up(position)
+            else: # Decrease-key
+                self._sift_down(position)
+
+    def pop(self) -> Tuple[int, float]:
+        """
+        Remove and return the item with the highest priority.
+
+        Raises:
+            IndexError: If the heap is empty.
+
+        Returns:
+            Tuple[int, float]: The item and its priority.
+        """
+        if self._size == 0:
+            raise IndexError("pop from an empty heap!")
+
+        item = int(self._heap[0])
+        priority = float(self._priorities[item])
+        self._size -= 1
+        self._positions[item] = -1
+        if self._size > 0: # Move the last item to the root and let it sink
+            last = self._heap[self._size]
+            self._heap[0] = last
+            self._positions[last] = 0
+            self._sift_down(0)
+        return item, priority
+
+    def remove(self, item: int):
+        """
+        Remove an item from the heap.
+
+        Args:
+            item (int): The item to remove.
+
+        Raises:
+            KeyError: If the item is not in the heap.
+        """
+        position = self._positions[item]
+        if position < 0:
+            raise KeyError(item)
+
+        self._size -= 1
+        self._positions[item] = -1
+        if position < self._size: # Fill the hole with the last item, which may need to rise or sink
+            last = self._heap[self._size]
+            self._heap[position] = last
+            self._positions[last] = position
+            self._sift_up(position)
+            self._sift_down(self._positions[last])
+
+    def clear(self):
+        """
+        Remove all items from the heap.
+        """
+        self._positions[self._heap[:self._size]] = -1
+        self._size = 0
+
+    def get_checkpoint_arrays(self) -> dict:
+        """
+        Get the heap contents as arrays for saving in a checkpoint.
+
+        Returns:
+            dict: The heap order, item positions, priorities and size.
+        """
+        return {'heap': self._heap, 'positions': self._positions, 'priorities': self._priorities, 'size': np.array(self._size)}
+
+    def set_checkpoint_arrays(self, arrays: dict):
+        """
+        Restore the heap contents from arrays saved in a checkpoint.
+
+        Args:
+            arrays (dict): Arrays as returned by get_checkpoint_arrays.
+        """
+        self._heap = arrays['heap'].copy()
+        self._positions = arrays['positions'].copy()
+        self._priorities = arrays['priorities'].copy()
+        self._size = int(arrays['size'])
+
+    def _swap(self, i: int, j: int):
+        """
+        Swap two heap positions and keep the position index in sync.
+
+        Args:
+            i (int): First heap position.
+            j (int): Second heap position.
+        """
+        item_i, item_j = self._heap[i], self._heap[j]
+        self._heap[i], self._heap[j] = item_j, item_i
+        self._positions[item_j] = i
+        self._positions[item_i] = j
+
+    def _sift_up(self, position: int):
+        """
+        Move the item at the given position up until its parent has a higher or equal priority.
+
+        Args:
+            position (int): Heap position to start from.
+        """
+        while position > 0:
+            parent = (position - 1) // 2
+            if self._priorities[self._heap[parent]] >= self._priorities[self._heap[position]]:
+                break
+            self._swap(parent, position)
+            position = parent
+
+    def _sift_down(self, position: int):
+        """
+        Move the item at the given position down until both children have lower or equal priorities.
+
+        Args:
+            position (int): Heap position to start from.
+        """
+        while True:
+            largest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < self._size and self._priorities[self._heap[child]] > self._priorities[self._heap[largest]]:
+                    largest = child
+            if largest == position:
+                break
+            self._swap(largest, position)
+            position = largest
@@ -0,0 +1,187 @@
+"""
+progress.py
+
+Description: This module reports training progress without flooding the console.
+            Reports are rate-limited to one per interval, rolling rewards/steps/episodes-per-second are kept
+            in small preallocated windows, and the latest snapshot can optionally be appended to a JSON-lines file
+            or served from a local HTTP endpoint for a dashboard on the same machine to poll.
+
+Modules:
+    numpy - For the rolling metric windows.
+    json - For encoding metric snapshots.
+    threading - For serving the HTTP endpoint in the background.
+    time - For rate limiting and throughput.
+    http.server - For the local HTTP endpoint.
+
+Classes:
+    ProgressReporter
+
+Functions:
+    None
+
+Usage:
+    progress = ProgressReporter('Q-Learning', episodes, jsonl_filename="metrics.jsonl", http_port=8765)
+    progress.update(episode, total_reward, steps_taken)
+    progress.close()
+"""
+import numpy as np
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class ProgressReporter:
+    """
+    Rate-limited progress reporting with rolling metrics and optional local metric feeds.
+    """
+
+    def __init__(self, name: str = "", total_episodes: int = None, report_interval: float = 1.0, window: int = 100,
+                 console: bool = True, jsonl_filename: str = None, http_port: int = None):
+        """
+        Initialize the reporter and start the optional metric feeds.
+
+        Args:
+            name (str, optional): Name of the run shown in the console and feeds. Defaults to "".
+            total_episodes (int, optional): Total number of episodes, used to show completion. Defaults to None.
+            report_interval (float, optional): Minimum seconds between reports, 0 reports every episode. Defaults to 1.0.
+            window (int, optional): Number of recent episodes the rolling metrics are computed over. Defaults to 100.
+            console (bool, optional): Whether reports are printed to the console. Defaults to True.
+            jsonl_filename (str, optional): File to append a JSON snapshot to at every report. Defaults to None.
+            http_port (int, optional): Port on 127.0.0.1 serving the latest JSON snapshot. Defaults to None.
+        """
+        self._name = name
+        self._total_episodes = total_episodes
+        self._report_interval = report_interval
+        self._console = console
+
+        self._rewards = np.zeros(window, dtype=float)
+        self._steps = np.zeros(window, dtype=float)
+        self._times = np.zeros(window + 1, dtype=float) # Episode boundaries, entry i % (window + 1) is the end of episode i - 1
+        self._count = 0 # Episodes recorded so far
+        self._reported_count = 0 # Episodes recorded as of the last report
+        self._episode = 0
+        self._total_steps = 0
+
+        self._start_time = time.perf_counter()
+        self._times[0] = self._start_time # The first episode starts when the reporter is created
+        self._last_report_time = -np.inf
+        self._snapshot = self._build_snapshot()
+
+        self._jsonl_file = open(jsonl_filename, mode='a') if jsonl_filename is not None else None
+        self._server = None
+        if http_port is not None:
+            self._server = ThreadingHTTPServer(('127.0.0.1', http_port), self._make_handler())
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def update(self, episode: int, total_reward: float, steps_taken: int):
+        """
+        Record a finished episode and report if the report interval has passed.
+
+        Args:
+            episode (int): Index of the finished episode, starting at 0.
+            total_reward (float): Total reward of the episode.
+            steps_taken (int): Number of steps taken in the episode.
+        """
+        now = time.perf_counter()
+        slot = self._count % len(self._rewards)
+        self._rewards[slot] = total_reward
+        self._steps[slot] = steps_taken
+        self._count += 1
+        self._times[self._count % len(self._times)] = now
+        self._episode = episode
+        self._total_steps += steps_taken
+
+        if now - self._last_report_time >= self._report_interval:
+            self._last_report_time = now
+            self._report()
+
+    def get_snapshot(self) -> dict:
+        """
+        Get the metrics as of the last report.
+
+        Returns:
+            dict: The latest metric snapshot.
+        """
+        return self._snapshot
+
+    def close(self):
+        """
+        Report the final metrics and stop the metric feeds.
+        """
+        if self._count > self._reported_count:
+            self._report()
+        if self._jsonl_file is not None:
+            self._jsonl_file.close()
+            self._jsonl_file = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _build_snapshot(self) -> dict:
+        """
+        Compute the rolling metrics over the filled part of the window.
+
+        Returns:
+            dict: The current metric snapshot.
+        """
+        filled = min(self._count, len(self._rewards))
+        elapsed = time.perf_counter() - self._start_time
+
+        # Throughput over the window, from the start of its oldest episode to the end of its newest
+        episodes_per_second = 0.0
+        if filled > 0:
+            window_span = self._times[self._count % len(self._times)] - self._times[(self._count - filled) % len(self._times)]
+            episodes_per_second = filled / window_span if window_span > 0 else 0.0
+
+        return {
+            'name': self._name,
+            'episode': self._episode + 1 if self._count > 0 else 0,
+            'total_episodes': self._total_episodes,
+            'elapsed_seconds': elapsed,
+            'total_steps': self._total_steps,
+            'rolling_reward': float(self._rewards[:filled].mean()) if filled else None,
+            'rolling_steps': float(self._steps[:filled].mean()) if filled else None,
+            'episodes_per_second': episodes_per_second,
+        }
+
+    def _report(self):
+        """
+        Refresh the snapshot, print it, and append it to the JSON-lines feed.
+        """
+        self._snapshot = self._build_snapshot()
+        self._reported_count = self._count
+        snapshot = self._snapshot
+
+        if self._console:
+            of_total = f" of {self._total_episodes}" if self._total_episodes is not None else ""
+            print(f"{self._name} Episode {snapshot['episode']}{of_total}: "
+                  f"Rolling Reward: {snapshot['rolling_reward']:.2f}, Rolling Steps: {snapshot['rolling_steps']:.1f}, "
+                  f"{snapshot['episodes_per_second']:.1f} episodes/s")
+
+        if self._jsonl_file is not None:
+            self._jsonl_file.write(json.dumps(snapshot) + "\n")
+            self._jsonl_file.flush()
+
+    def _make_handler(self) -> type:
+        """
+        Create a request handler class that serves this reporter's latest snapshot.
+
+        Returns:
+            type: The request handler class.
+        """
+        reporter = self
+
+        class SnapshotHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(reporter.get_snapshot()).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Polling dashboards should not write to the console
+
+        return SnapshotHandler
@@ -0,0 +1,135 @@
+"""
+replay.py
+
+Description: This module defines a fixed-capacity experience replay memory for the learning algorithms.
+            Transitions are stored in preallocated parallel arrays that are overwritten as a ring buffer,
+            so memory use stays constant no matter how many steps are pushed.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    typing - For type hinting.
+
+Classes:
+    ReplayBuffer
+
+Functions:
+    None
+
+Usage:
+    buffer = ReplayBuffer(10000)
+    buffer.push(state, action, reward, next_state, done)
+    states, actions, rewards, next_states, dones = buffer.sample(32)
+"""
+import numpy as np
+from typing import Tuple
+
+class ReplayBuffer:
+    """
+    A fixed-capacity ring buffer of (state, action, reward, next_state, done) transitions.
+    States are stored as flat integer indices into the Q-table.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize the replay buffer with preallocated storage.
+
+        Args:
+            capacity (int, optional): Maximum number of transitions kept in memory. Defaults to 10000.
+
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive!")
+
+        self._capacity = capacity
+        self._states = np.zeros(capacity, dtype=np.int64)
+        self._actions = np.zeros(capacity, dtype=np.int64)
+        self._rewards = np.zeros(capacity, dtype=float)
+        self._next_states = np.zeros(capacity, dtype=np.int64)
+        self._dones = np.zeros(capacity, dtype=bool)
+        self._index = 0 # Position the next transition will be written to
+        self._size = 0
+
+    def __len__(self) -> int:
+        """
+        Get the number of transitions currently stored.
+
+        Returns:
+            int: The number of stored transitions.
+        """
+        return self._size
+
+    def push(self, state: int, action: int, reward: float, next_state: int, done: bool):
+        """
+        Store a transition, overwriting the oldest one once the buffer is full.
+
+        Args:
+            state (int): Flat index of the state the action was taken in.
+            action (int): The action taken by the agent.
+            reward (float): The reward received after taking the action.
+            next_state (int): Flat index of the resulting state.
+            done (bool): Whether the resulting state is terminal.
+        """
+        self._states[self._index] = state
+        self._actions[self._index] = action
+        self._rewards[self._index] = reward
+        self._next_states[self._index] = next_state
+        self._dones[self._index] = done
+
+        self._index = (self._index + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def sample(self, batch_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample a batch of stored transitions uniformly with replacement.
+
+        Args:
+            batch_size (int): Number of transitions to sample.
+
+        Raises:
+            ValueError: If the buffer is empty.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Arrays of states, actions, rewards, next states and done flags.
+        """
+        if self._size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer!")
+
+        indices = np.random.randint(0, self._size, size=batch_size)
+        return (self._states[indices], self._actions[indices], self._rewards[indices],
+                self._next_states[indices], self._dones[indices])
+
+    def clear(self):
+        """
+        Remove all stored transitions without releasing the preallocated storage.
+        """
+        self._index = 0
+        self._size = 0
+
+    def get_checkpoint_arrays(self) -> dict:
+        """
+        Get the buffer contents as arrays for saving in a checkpoint.
+
+        Returns:
+            dict: The stored transitions and the ring buffer position.
+        """
+        return {'states': self._states, 'actions': self._actions, 'rewards': self._rewards,
+                'next_states': self._next_states, 'dones': self._dones,
+                'index': np.array(self._index), 'size': np.array(self._size)}
+
+    def set_checkpoint_arrays(self, arrays: dict):
+        """
+        Restore the buffer contents from arrays saved in a checkpoint.
+
+        Args:
+            arrays (dict): Arrays as returned by get_checkpoint_arrays.
+        """
+        self._states = arrays['states'].copy()
+        self._actions = arrays['actions'].copy()
+        self._rewards = arrays['rewards'].copy()
+        self._next_states = arrays['next_states'].copy()
+        self._dones = arrays['dones'].copy()
+        self._capacity = len(self._states)
+        self._index = int(arrays['index'])
+        self._size = int(arrays['size'])
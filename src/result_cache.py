@@ -0,0 +1,200 @@
+"""
+result_cache.py
+
+Description: This module stores finished training runs on disk so repeated experiment configurations are never recomputed.
+            Every run is keyed by a SHA-256 hash of its canonical JSON configuration together with a fingerprint of the
+            project's source code, so changing any setting or any line of code yields a new key. Results (Q-table and
+            recorded training data) are written atomically as compressed .npz files named by their key, and the store
+            can be capped in size, evicting the least recently used results first.
+
+Modules:
+    numpy - For numerical operations on arrays and the binary file format.
+    hashlib - For the content-addressed keys.
+    json - For canonical configurations.
+    os - For file handling and atomic file replacement.
+    glob - For listing the stored results.
+    checkpoint - For converting the training data to and from arrays.
+
+Classes:
+    ResultCache
+
+Functions:
+    source_fingerprint - Hashes the project's source files, used as the code version of every key.
+
+Usage:
+    cache = ResultCache("training_data/cache", max_bytes=500 * 1024**2)
+    key = cache.make_key({'grid_dim': (10, 10), 'algorithm': 'Q-Learning', 'alpha': 0.15, 'seed': 0})
+    result = cache.get(key)
+    if result is None:
+        cache.put(key, q_table, training_data)
+"""
+import numpy as np
+import hashlib
+import json
+import os
+import glob
+
+from checkpoint import pack_training_data, unpack_training_data
+
+_source_fingerprints = {} # Source directory to fingerprint, the code cannot change while it is running
+
+def source_fingerprint(directory: str = None) -> str:
+    """
+    Hashes the names and contents of every .py file in the source directory.
+
+    Args:
+        directory (str, optional): Directory of the source files. Defaults to the directory of this module.
+
+    Returns:
+        str: Hex digest of the source files.
+    """
+    directory = directory if directory is not None else os.path.dirname(os.path.abspath(__file__))
+    if directory not in _source_fingerprints:
+        digest = hashlib.sha256()
+        for filename in sorted(glob.glob(os.path.join(directory, "*.py"))):
+            digest.update(os.path.basename(filename).encode())
+            with open(filename, mode='rb') as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+        _source_fingerprints[directory] = digest.hexdigest()
+    return _source_fingerprints[directory]
+
+def _to_json(value):
+    """
+    Converts NumPy values in a configuration into plain JSON values.
+
+    Args:
+        value (any): The value json could not encode.
+
+    Raises:
+        TypeError: If the value cannot be represented in JSON.
+
+    Returns:
+        any: The plain value.
+    """
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} cannot be part of a result cache key!")
+
+class ResultCache:
+    """
+    An on-disk store of training results keyed by a hash of the configuration and code version.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = None, code_version: str = None):
+        """
+        Initialize the store, creating its directory if needed.
+
+        Args:
+            directory (str): Directory the results are stored in.
+            max_bytes (int, optional): Maximum total size of the stored results, unlimited if None. Defaults to None.
+            code_version (str, optional): Version mixed into every key. Defaults to the fingerprint of the source files.
+        """
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._code_version = code_version if code_version is not None else source_fingerprint()
+        os.makedirs(directory, exist_ok=True)
+
+    def make_key(self, config: dict) -> str:
+        """
+        Compute the key of a configuration. Key order does not matter and tuples hash like lists.
+
+        Args:
+            config (dict): The complete run configuration, JSON-serializable apart from NumPy values.
+
+        Returns:
+            str: Hex digest identifying the configuration and code version.
+        """
+        canonical = json.dumps({'config': config, 'code_version': self._code_version},
+                               sort_keys=True, separators=(',', ':'), default=_to_json)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> dict:
+        """
+        Load a stored result and mark it as recently used.
+
+        Args:
+            key (str): The key from make_key.
+
+        Returns:
+            dict: A dictionary containing 'q_table', 'training_data' and 'config', or None if the key is not stored.
+        """
+        filename = self._filename(key)
+        try:
+            with np.load(filename) as data:
+                arrays = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        os.utime(filename) # Last access time for eviction
+
+        training_arrays = {name[len("training_"):]: value for name, value in arrays.items() if name.startswith("training_")}
+        return {
+            'q_table': arrays['q_table'],
+            'training_data': unpack_training_data(training_arrays),
+            'config': json.loads(str(arrays['config'])),
+        }
+
+    def put(self, key: str, q_table: np.ndarray, training_data: list, config: dict = None):
+        """
+        Atomically store a result, then evict old results if the store is over its size limit.
+
+        Args:
+            key (str): The key from make_key.
+            q_table (np.ndarray): The trained Q-table.
+            training_data (list): Per-episode [action_sequence, total_reward, steps_taken, q_table] records.
+            config (dict, optional): The configuration, stored for inspection. Defaults to None.
+        """
+        arrays = {
+            'q_table': q_table,
+            'config': np.array(json.dumps(config, sort_keys=True, default=_to_json)),
+        }
+        arrays.update({f"training_{name}": value for name, value in pack_training_data(training_data).items()})
+
+        filename = self._filename(key)
+        temporary_filename = filename + ".tmp.npz"
+        np.savez_compressed(temporary_filename, **arrays)
+        os.replace(temporary_filename, filename) # Atomic, readers never see a partial result
+        self.evict()
+
+    def evict(self):
+        """
+        Delete the least recently used results until the store fits in max_bytes.
+        The most recently used result is always kept, even if it alone is larger than max_bytes.
+        """
+        if self._max_bytes is None:
+            return
+        entries = []
+        for filename in glob.glob(os.path.join(self._directory, "*.result.npz")):
+            status = os.stat(filename)
+            entries.append((status.st_mtime, status.st_size, filename))
+        entries.sort()
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, filename in entries[:-1]:
+            if total_bytes <= self._max_bytes:
+                break
+            os.remove(filename)
+            total_bytes -= size
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Check if a result is stored, without marking it as used.
+
+        Args:
+            key (str): The key from make_key.
+
+        Returns:
+            bool: True if the key is stored, False otherwise.
+        """
+        return os.path.exists(self._filename(key))
+
+    def _filename(self, key: str) -> str:
+        """
+        Get the file a result is stored in.
+
+        Args:
+            key (str): The key from make_key.
+
+        Returns:
+            str: Path of the result file.
+        """
+        return os.path.join(self._directory, f"{key}.result.npz")
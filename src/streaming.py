@@ -0,0 +1,227 @@
+"""
+streaming.py
+
+Description: This module runs episodes as lazy streams of transitions instead of monolithic loops.
+            stream_episode is a generator that yields one (state, action, reward, next_state, done) record per step
+            while the agent acts, and every stage is a generator that consumes a stream and passes it on, so learners,
+            replay memories, loggers and live plotters can be chained without buffering whole episodes.
+            Because each stage runs before the generator resumes, a learner stage updates the Q-table before
+            the next action is selected, exactly as in Q_learning_episode.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    collections - For the Transition record.
+    utils - Utility functions used in the project.
+    grid_world - The GridWorld environment class.
+    agent - The Agent class that interacts with the environment.
+    learning - For the Q-learning and Q(λ) table updates.
+    replay - The ReplayBuffer filled by replay_stage.
+    typing - For type hinting.
+
+Classes:
+    Transition
+
+Functions:
+    stream_episode - Yields the transitions of a single episode as the agent acts.
+    batch_transitions - Groups a stream of transitions into batches of arrays.
+    q_learning_stage - Applies a Q-learning update for every transition passing through.
+    q_lambda_stage - Applies a Q(λ) update for every transition passing through.
+    replay_stage - Pushes every transition passing through into a replay buffer.
+    callback_stage - Calls a function for every transition passing through, e.g. a logger or live plot.
+    consume_stream - Runs a stream to the end and returns the episode's action sequence, total reward and steps.
+
+Usage:
+    transitions = stream_episode(environment, actions, epsilon_greedy_selection, {'q_table': q_table, 'epsilon': 0.1})
+    transitions = replay_stage(q_learning_stage(transitions, q_table, alpha, gamma), replay_buffer)
+    action_sequence, total_reward, steps_taken = consume_stream(transitions)
+"""
+import numpy as np
+from collections import namedtuple
+from typing import Iterable, Iterator, Tuple
+
+from utils import get_key_by_value
+from grid_world import GridWorld
+from agent import Agent
+from learning import Q_learning_table_update, Q_lambda_table_update
+from replay import ReplayBuffer
+
+Transition = namedtuple('Transition', ['state', 'action', 'reward', 'next_state', 'done'])
+Transition.__doc__ = "A single step of an episode. In a batch every field is an array of the batch's steps."
+
+def stream_episode(grid_world: GridWorld = None,
+                   actions: dict = None,
+                   selection_function: callable = None,
+                   function_args: dict = None,
+                   agent: Agent = None,
+                   agent_start: Tuple[int, ...] = None,
+                   max_steps: int = None) -> Iterator[Transition]:
+    """
+    Runs a single episode lazily, yielding each transition as soon as the agent has acted.
+    The next action is only selected once the consumer asks for the next transition.
+
+    Args:
+        grid_world (GridWorld, optional): The environment in which the agent operates. Defaults to None.
+        actions (dict, optional): Dictionary of action names to action indices. Defaults to None.
+        selection_function (callable, optional): Function used to select actions from the flat state index. Defaults to None.
+        function_args (dict, optional): Arguments for the selection function. Defaults to None.
+        agent (Agent, optional): The agent that interacts with the environment, a new one is set if None. Defaults to None.
+        agent_start (Tuple[int, ...], optional): Starting position of the agent, random if None. Defaults to None.
+        max_steps (int, optional): Stop after this many steps even if the goal was not reached. Defaults to None.
+
+    Raises:
+        ValueError: If any of the required parameters (grid_world, actions, selection_function) are None.
+        ValueError: If selection_function is not callable or its arguments are invalid.
+
+    Yields:
+        Transition: The (state, action, reward, next_state, done) record of each step.
+    """
+    if grid_world is None:
+        raise ValueError("GridWorld cannot be None!")
+    if actions is None:
+        raise ValueError("Actions cannot be None!")
+    if selection_function is None:
+        raise ValueError("Selection function cannot be None!")
+    if not callable(selection_function):
+        raise ValueError("Selection function must be callable!")
+    function_args = function_args if function_args is not None else {}
+    if agent is None:
+        grid_world.set_agent(Agent())
+
+    try:
+        test_state = grid_world.get_state_index()
+        selection_function(test_state, **function_args)
+    except TypeError as e:
+        raise ValueError(f"Selection function arguments are invalid: {e}")
+
+    grid_world.reset(agent_start)
+
+    steps_taken = 0
+    goal_reached = False
+    while not goal_reached and (max_steps is None or steps_taken < max_steps):
+        state = grid_world.get_state_index()
+        action = selection_function(state, **function_args)
+
+        reward, goal_reached = grid_world.step_agent(get_key_by_value(actions, action))
+        steps_taken += 1
+
+        yield Transition(state, action, reward, grid_world.get_state_index(), goal_reached)
+
+def batch_transitions(transitions: Iterable[Transition], batch_size: int = 32) -> Iterator[Transition]:
+    """
+    Groups a stream of transitions into batches, the last batch holding whatever is left.
+    Each batch is a Transition of arrays, ready for vectorized updates such as Q_learning_batch_update.
+
+    Args:
+        transitions (Iterable[Transition]): The stream of single transitions.
+        batch_size (int, optional): Number of transitions per batch. Defaults to 32.
+
+    Raises:
+        ValueError: If batch_size is not positive.
+
+    Yields:
+        Transition: A batch of transitions with fields shaped (n,).
+    """
+    if batch_size <= 0:
+        raise ValueError("Batch size must be positive!")
+
+    states = np.empty(batch_size, dtype=np.int64)
+    actions = np.empty(batch_size, dtype=np.int64)
+    rewards = np.empty(batch_size, dtype=float)
+    next_states = np.empty(batch_size, dtype=np.int64)
+    dones = np.empty(batch_size, dtype=bool)
+
+    size = 0
+    for transition in transitions:
+        states[size], actions[size], rewards[size], next_states[size], dones[size] = transition
+        size += 1
+        if size == batch_size:
+            yield Transition(states.copy(), actions.copy(), rewards.copy(), next_states.copy(), dones.copy())
+            size = 0
+    if size > 0:
+        yield Transition(states[:size].copy(), actions[:size].copy(), rewards[:size].copy(), next_states[:size].copy(), dones[:size].copy())
+
+def q_learning_stage(transitions: Iterable[Transition], q_table: np.ndarray, alpha: float = 0.1, gamma: float = 0.9) -> Iterator[Transition]:
+    """
+    Applies a Q-learning update for every transition passing through.
+
+    Args:
+        transitions (Iterable[Transition]): The stream of single transitions.
+        q_table (np.ndarray): Q-table updated in place, shaped (n_states, n_actions).
+        alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
+        gamma (float, optional): Discount factor for future rewards. Defaults to 0.9.
+
+    Yields:
+        Transition: Each transition, after the Q-table has been updated with it.
+    """
+    for transition in transitions:
+        Q_learning_table_update(transition.state, transition.next_state, transition.action, transition.reward, q_table, alpha, gamma)
+        yield transition
+
+def q_lambda_stage(transitions: Iterable[Transition], q_table: np.ndarray, alpha: float = 0.1, gamma: float = 0.9, lambda_: float = 0.9) -> Iterator[Transition]:
+    """
+    Applies a Q(λ) update for every transition passing through, with eligibility traces kept for the stream.
+
+    Args:
+        transitions (Iterable[Transition]): The stream of single transitions of one episode.
+        q_table (np.ndarray): Q-table updated in place, shaped (n_states, n_actions).
+        alpha (float, optional): Learning rate for Q-learning updates. Defaults to 0.1.
+        gamma (float, optional): Discount factor for future rewards. Defaults to 0.9.
+        lambda_ (float, optional): Decay rate for eligibility traces. Defaults to 0.9.
+
+    Yields:
+        Transition: Each transition, after the Q-table has been updated with it.
+    """
+    e_table = np.zeros_like(q_table)
+    for transition in transitions:
+        Q_lambda_table_update(transition.state, transition.next_state, transition.action, transition.reward, q_table, e_table, alpha, gamma, lambda_)
+        yield transition
+
+def replay_stage(transitions: Iterable[Transition], replay_buffer: ReplayBuffer) -> Iterator[Transition]:
+    """
+    Pushes every transition passing through into a replay buffer.
+
+    Args:
+        transitions (Iterable[Transition]): The stream of single transitions.
+        replay_buffer (ReplayBuffer): The replay buffer to fill.
+
+    Yields:
+        Transition: Each transition, after it has been stored.
+    """
+    for transition in transitions:
+        replay_buffer.push(*transition)
+        yield transition
+
+def callback_stage(transitions: Iterable[Transition], callback: callable) -> Iterator[Transition]:
+    """
+    Calls a function for every transition (or batch) passing through, e.g. a logger or a live plot.
+
+    Args:
+        transitions (Iterable[Transition]): The stream of transitions or batches.
+        callback (callable): Function called with each transition.
+
+    Yields:
+        Transition: Each transition, after the callback has seen it.
+    """
+    for transition in transitions:
+        callback(transition)
+        yield transition
+
+def consume_stream(transitions: Iterable[Transition]) -> Tuple[list, float, int]:
+    """
+    Runs a stream of single transitions to the end.
+
+    Args:
+        transitions (Iterable[Transition]): The stream of single transitions.
+
+    Returns:
+        Tuple[list, float, int]: A tuple containing:
+            - action_sequence (list): Sequence of actions taken by the agent.
+            - total_reward (float): Total reward accumulated during the episode.
+            - steps_taken (int): Number of steps taken.
+    """
+    action_sequence = []
+    total_reward = 0
+    for transition in transitions:
+        action_sequence.append(transition.action)
+        total_reward += transition.reward
+    return action_sequence, total_reward, len(action_sequence)
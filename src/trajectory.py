@@ -0,0 +1,126 @@
+"""
+trajectory.py
+
+Description: This module rebuilds full trajectories from recorded action sequences without stepping an agent.
+            Each action moves along a single axis, so every axis is an independent walk of -1/0/+1 steps clipped to the grid.
+            A clipped walk is computed with cumulative sums and running minima/maxima (one vectorized pass per stretch
+            between opposite walls), which matches GridWorld's semantics of invalid moves leaving the agent in place.
+
+Modules:
+    numpy - For numerical operations on arrays.
+    agent - For the action to move mapping shared with GridWorld.
+    typing - For type hinting.
+
+Functions:
+    reconstruct_trajectory - Rebuilds positions, wall-bump flags and rewards for a whole action sequence.
+
+Usage:
+    positions, bumps, rewards = reconstruct_trajectory(action_sequence, (10, 10), (0, 0), (9, 9), [100, -1, -5])
+"""
+import numpy as np
+from typing import Tuple
+
+from agent import get_action_moves
+
+def reconstruct_trajectory(action_sequence: list,
+                           grid_dim: Tuple[int, ...] = (5, 5),
+                           start: Tuple[int, ...] = None,
+                           goal: Tuple[int, ...] = None,
+                           reward_vector: list = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rebuilds the positions, wall bumps and rewards of an action sequence as GridWorld would produce them.
+
+    Args:
+        action_sequence (list): Sequence of action indices taken by the agent.
+        grid_dim (Tuple[int, ...], optional): Dimensions of the grid. Defaults to (5, 5).
+        start (Tuple[int, ...], optional): Starting position of the agent. Defaults to the origin.
+        goal (Tuple[int, ...], optional): Goal position. Defaults to the last cell of the grid.
+        reward_vector (list, optional): Rewards for reaching the goal, moving, and an invalid move. Defaults to [10, -0.1, -1].
+
+    Raises:
+        ValueError: If the sequence contains an action index that does not exist for the grid's dimensions.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: A tuple containing:
+            - positions (np.ndarray): Positions shaped (n_steps + 1, n_dims), starting with the start position.
+            - bumps (np.ndarray): Whether each step was an invalid move into a wall, shaped (n_steps,).
+            - rewards (np.ndarray): Reward of each step, shaped (n_steps,).
+    """
+    n_dims = len(grid_dim)
+    start = tuple(start) if start is not None else (0,) * n_dims
+    goal = tuple(goal) if goal is not None else tuple(dim - 1 for dim in grid_dim)
+    reward_vector = reward_vector if reward_vector is not None else [10, -0.1, -1]
+
+    actions = np.asarray(action_sequence, dtype=np.int64).reshape(-1)
+    moves = get_action_moves(n_dims)
+    if actions.size and (actions.min() < 0 or actions.max() >= len(moves)):
+        raise ValueError(f"Action indices must be between 0 and {len(moves) - 1}!")
+
+    action_axes = np.array([axis for _, axis, _ in moves], dtype=np.int64)
+    action_deltas = np.array([delta for _, _, delta in moves], dtype=np.int64)
+    step_axes = action_axes[actions]
+    step_deltas = action_deltas[actions]
+
+    positions = np.empty((actions.size + 1, n_dims), dtype=np.int64)
+    positions[0] = start
+    bumps = np.zeros(actions.size, dtype=bool)
+    for axis in range(n_dims):
+        steps = np.where(step_axes == axis, step_deltas, 0)
+        positions[1:, axis], axis_bumps = _clipped_walk(steps, start[axis], grid_dim[axis] - 1)
+        bumps |= axis_bumps
+
+    at_goal = np.all(positions[1:] == np.asarray(goal), axis=1)
+    rewards = np.where(at_goal, reward_vector[0], np.where(bumps, reward_vector[2], reward_vector[1]))
+
+    return positions, bumps, rewards
+
+def _clipped_walk(steps: np.ndarray, start: int, upper: int, chunk_size: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes a walk of -1/0/+1 steps that stays in place instead of leaving [0, upper].
+    Between touches of opposite walls only one wall can block, and a walk blocked by a single wall is
+    the free walk shifted by its running extreme past that wall, so each stretch is one vectorized pass.
+    Stretches are processed at most chunk_size steps at a time, so long sequences that bounce between walls
+    do not rescan their whole remainder after every bounce.
+
+    Args:
+        steps (np.ndarray): The -1/0/+1 steps along this axis.
+        start (int): Starting coordinate.
+        upper (int): Highest valid coordinate.
+        chunk_size (int, optional): Maximum number of steps per vectorized pass. Defaults to 4096.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The coordinate after each step and whether each step was blocked.
+    """
+    positions = np.empty(steps.size, dtype=np.int64)
+    blocked = np.zeros(steps.size, dtype=bool)
+
+    index = 0
+    position = start
+    lower_wall = True # Which wall can block in the current stretch
+    while index < steps.size:
+        walk = position + np.cumsum(steps[index:index + chunk_size])
+        if lower_wall:
+            overshoot = np.minimum.accumulate(np.minimum(walk, 0)) # How far the free walk has gone below 0
+            clipped = walk - overshoot
+            crossed = clipped > upper # First step into the opposite wall ends the stretch
+        else:
+            overshoot = np.maximum.accumulate(np.maximum(walk - upper, 0)) # How far the free walk has gone above upper
+            clipped = walk - overshoot
+            crossed = clipped < 0
+
+        end = int(np.argmax(crossed)) if crossed.any() else walk.size
+        positions[index:index + end] = clipped[:end]
+        # A step is blocked by this stretch's wall whenever the overshoot grows
+        blocked[index:index + end] = np.diff(overshoot[:end], prepend=0) != 0
+
+        if end < walk.size: # Blocked by the opposite wall, which can block the next stretch
+            position = upper if lower_wall else 0
+            positions[index + end] = position
+            blocked[index + end] = True
+            index += end + 1
+            lower_wall = not lower_wall
+        else: # The clipped walk only depends on its current position, so the stretch continues from here
+            position = int(clipped[-1])
+            index += end
+
+    return positions, blocked
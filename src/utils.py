@@ -6,17 +6,22 @@ Author: Lucas Pinto
 Date: February 12, 2025
 
 Modules:
-    None
+    agent - For the action to move mapping shared with GridWorld.
+    trajectory - For rebuilding positions from action sequences.
+    PIL - For writing GIF files (installed with matplotlib).
+    subprocess - For piping frames to ffmpeg.
 
 Functions:
     get_key_by_value
     q_table_to_2d_array
     plot_action_sequence
+    export_action_sequence_animation
     plot_q_table
     plot_episode_data
     save_training_data_to_csv
     save_training_data_set_to_csv
     interpret_action_sequence
+    print_policy_evaluation
 
 Usage:
 """
@@ -24,6 +29,13 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import csv
+import subprocess
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+from agent import get_action_moves
+from trajectory import reconstruct_trajectory
 
 def get_key_by_value(dictionary, target_value):
     """
@@ -46,13 +58,14 @@ def q_table_to_2d_array(q_table, grid_length, grid_width):
     Converts a Q-table into a 2D array representation.
 
     Args:
-        q_table (np.ndarray): The Q-table to convert, assumed to be a 3D array with shape (grid_length, grid_width, num_actions).
+        q_table (np.ndarray): The Q-table to convert, either flat with shape (grid_length * grid_width, num_actions) or with shape (grid_length, grid_width, num_actions).
         grid_length (int): The length of the grid.
         grid_width (int): The width of the grid.
 
     Returns:
         np.ndarray: A 2D array where each row represents a state and its corresponding Q-values.
     """
+    q_table = q_table.reshape(grid_length, grid_width, -1) # Flat states are laid out row-major
     rows = []
     for x in range(grid_length):
         for y in range(grid_width):
@@ -60,7 +73,7 @@ def q_table_to_2d_array(q_table, grid_length, grid_width):
             rows.append(row)
     return np.array(rows)
 
-def plot_action_sequence(action_sequence, grid_length, grid_width, title, subtitle=None, fps=48):
+def plot_action_sequence(action_sequence, grid_length, grid_width, title, subtitle=None, fps=48, verbose=False):
     """
     Plots the action sequence on a grid with a gradient effect.
 
@@ -71,6 +84,7 @@ def plot_action_sequence(action_sequence, grid_length, grid_width, title, subtit
         title (str): Title of the plot.
         subtitle (str, optional): Subtitle of the plot.
         fps (int, optional): Frames per second for the animation. Default is 48.
+        verbose (bool, optional): Print a line per frame and per drawn action. Default is False.
     """
     fig, ax = plt.subplots(figsize=(12, 8))
     ax.set_xlim(0, grid_length)
@@ -79,9 +93,13 @@ def plot_action_sequence(action_sequence, grid_length, grid_width, title, subtit
     ax.set_yticks(np.arange(0, grid_width, 1))
     ax.grid(True)
 
+    # Positions and wall bumps of the whole sequence, shifted to cell centres
+    positions, bumps, _ = reconstruct_trajectory(action_sequence, (grid_length, grid_width))
+    centres = positions + 0.5
+    moves = get_action_moves(2)
+
     # Initial position
     x, y = 0.5, 0.5
-    dx, dy = 0, 0
     frame_total = 0
     cmap = plt.get_cmap('inferno')  # Colormap for gradient effect
     num_actions = len(action_sequence)
@@ -92,39 +110,31 @@ def plot_action_sequence(action_sequence, grid_length, grid_width, title, subtit
     ax.plot(x + grid_length - 1, y + grid_width - 1, 'ro', markersize=10, label='Goal')
 
     def update(frame):
-        nonlocal x, y, dx, dy, frame_total
+        nonlocal frame_total
         actions_per_frame = max(1, int(fps / base_fps))  # Adjust this value to control how many actions are processed per frame
         start_frame = frame * actions_per_frame
         end_frame = min(start_frame + actions_per_frame, num_actions)
 
         # There's something ridiculously dumb about FuncAnimation that causes frame 0 to occur twice so needs these checks to not duplicate frames
         if not ((start_frame > num_actions or start_frame > end_frame) or frame_total == 0):
-            print(f"Global Frame {frame} ; Local Frame {start_frame}/{end_frame}: Drawing action sequence...")
+            if verbose:
+                print(f"Global Frame {frame} ; Local Frame {start_frame}/{end_frame}: Drawing action sequence...")
             for i in range(start_frame, end_frame):
                 action = action_sequence[i]
-                if action == 0:  # Up
-                    dx, dy = 0, -1
-                elif action == 1:  # Down
-                    dx, dy = 0, 1
-                elif action == 2:  # Left
-                    dx, dy = -1, 0
-                elif action == 3:  # Right
-                    dx, dy = 1, 0
+                _, axis, delta = moves[action]
+                dx, dy = (delta, 0) if axis == 0 else (0, delta)
+                x, y = centres[i]
 
                 color = cmap(i / num_actions)  # Get color from colormap
                 ax.arrow(x, y, dx * 0.75, dy * 0.75, head_width=0.25, head_length=0.25, fc=color, ec=color)
 
-                # Update position with validation
-                new_x = x + dx
-                new_y = y + dy
-
-                # Ensure the new position is within grid boundaries
-                if (0.5 <= new_x < grid_length + 0.5) and (0.5 <= new_y < grid_width + 0.5):
-                    x, y = new_x, new_y
-                    print(f"Frame {start_frame}/{end_frame}:{i}: Successful draw '{action}' arrow draw from ({x - dx}, {y - dy}) to ({x}, {y}).")
+                if not bumps[i]:
+                    if verbose:
+                        print(f"Frame {start_frame}/{end_frame}:{i}: Successful draw '{action}' arrow draw from ({x}, {y}) to ({x + dx}, {y + dy}).")
                 else:
                     ax.arrow(x, y, dx * 0.25, dy * 0.25, head_width=0.25, head_length=0.25, fc='red', ec='red')
-                    print(f"Frame {start_frame}/{end_frame}:{i}: Invalid move '{action}' to ({new_x}, {new_y}) ignored.")
+                    if verbose:
+                        print(f"Frame {start_frame}/{end_frame}:{i}: Invalid move '{action}' to ({x + dx}, {y + dy}) ignored.")
         frame_total += 1
 
     print("Generating action sequence plot...")
@@ -146,6 +156,134 @@ def plot_action_sequence(action_sequence, grid_length, grid_width, title, subtit
     plt.legend()
     plt.show()
 
+def export_action_sequence_animation(action_sequence, grid_length, grid_width, filename, title=None, subtitle=None,
+                                     fps=30, max_frames=600, figsize=(12, 8), dpi=80):
+    """
+    Writes an animation of the action sequence straight to an MP4 or GIF file without opening a window.
+    The static parts of the plot are rendered once and every frame only draws a fixed set of artists
+    (agent, wall bumps, step counter) over a cached background. The trail is drawn into that background
+    one grid edge at a time, the first time the edge is walked, and long sequences are decimated to at most
+    max_frames frames, so export time and memory stay flat no matter how many steps the episode has.
+
+    Args:
+        action_sequence (list): List of actions taken by the agent.
+        grid_length (int): Length of the grid.
+        grid_width (int): Width of the grid.
+        filename (str): File to write, the format is chosen by its .mp4 or .gif extension.
+        title (str, optional): Title of the plot.
+        subtitle (str, optional): Subtitle of the plot.
+        fps (int, optional): Frames per second of the written file. Default is 30.
+        max_frames (int, optional): Maximum number of frames, evenly spaced over the sequence. Default is 600.
+        figsize (tuple, optional): Size of the figure. Default is (12, 8).
+        dpi (int, optional): Resolution of the frames. Default is 80.
+
+    Raises:
+        ValueError: If the file extension is not .mp4 or .gif.
+        RuntimeError: If an MP4 is requested but ffmpeg is not available, or ffmpeg fails.
+    """
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension not in ('mp4', 'gif'):
+        raise ValueError("Animations can only be exported as .mp4 or .gif!")
+    if extension == 'mp4' and not animation.writers.is_available('ffmpeg'):
+        raise RuntimeError("ffmpeg is required to export .mp4 animations!")
+
+    positions, bumps, _ = reconstruct_trajectory(action_sequence, (grid_length, grid_width))
+    centres = positions + 0.5
+    num_actions = len(action_sequence)
+
+    # Steps shown by each frame, evenly spaced over the sequence
+    frame_steps = np.unique(np.linspace(0, num_actions, min(num_actions + 1, max_frames)).round().astype(int))
+
+    # Grid edges ordered by the step they were first walked at, so each frame only adds a slice of new edges
+    states = positions[:, 0] * grid_width + positions[:, 1]
+    moved = np.flatnonzero(~bumps)
+    edge_keys = np.minimum(states[moved], states[moved + 1]) * (grid_length * grid_width) + np.maximum(states[moved], states[moved + 1])
+    _, first_walk = np.unique(edge_keys, return_index=True)
+    edge_steps = np.sort(moved[first_walk])
+    edge_first_steps = edge_steps + 1 # Drawn from the frame after the move
+    # Each edge is a start point, an end point and a NaN separator
+    edge_points = np.full((len(edge_steps), 3, 2), np.nan)
+    edge_points[:, 0] = centres[edge_steps]
+    edge_points[:, 1] = centres[edge_steps + 1]
+
+    # Wall bump cells ordered by the step they were first bumped at, so each frame shows a prefix
+    bump_steps = np.flatnonzero(bumps)
+    bump_cells, first_bump = np.unique(positions[bump_steps], axis=0, return_index=True)
+    order = np.argsort(first_bump)
+    bump_centres = bump_cells[order] + 0.5
+    bump_first_steps = bump_steps[first_bump[order]] + 1 # Shown from the frame after the bump
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_xlim(0, grid_length)
+    ax.set_ylim(0, grid_width)
+    ax.set_xticks(np.arange(0, grid_length, 1))
+    ax.set_yticks(np.arange(0, grid_width, 1))
+    ax.grid(True)
+    ax.invert_yaxis()
+    ax.plot(0.5, 0.5, 'go', markersize=10, label='Start')
+    ax.plot(grid_length - 0.5, grid_width - 0.5, 'ro', markersize=10, label='Goal')
+    ax.legend(loc='upper right')
+    if title:
+        ax.set_title(title)
+    if subtitle:
+        fig.suptitle(subtitle, fontsize=8)
+
+    # The only artists drawn per frame
+    trail, = ax.plot([], [], '-', color='tab:orange', linewidth=2, animated=True)
+    agent_marker, = ax.plot([], [], 'o', color='tab:blue', markersize=12, animated=True)
+    bump_markers, = ax.plot([], [], 'x', color='red', markersize=12, markeredgewidth=3, animated=True)
+    step_text = ax.text(0.01, 0.01, '', transform=ax.transAxes, animated=True)
+
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    def draw_frame(step, edges_drawn, new_edges):
+        trail.set_data(edge_points[edges_drawn:new_edges, :, 0].ravel(), edge_points[edges_drawn:new_edges, :, 1].ravel())
+        ax.draw_artist(trail)
+        trail_background = canvas.copy_from_bbox(fig.bbox)
+
+        agent_marker.set_data([centres[step, 0]], [centres[step, 1]])
+        bumped = np.searchsorted(bump_first_steps, step, side='right')
+        bump_markers.set_data(bump_centres[:bumped, 0], bump_centres[:bumped, 1])
+        step_text.set_text(f"Step {step}/{num_actions}")
+        for artist in (bump_markers, agent_marker, step_text):
+            ax.draw_artist(artist)
+        return trail_background
+
+    def render_frames():
+        canvas.restore_region(background)
+        edges_drawn = 0
+        for step in frame_steps:
+            new_edges = np.searchsorted(edge_first_steps, step, side='right')
+            trail_background = draw_frame(step, edges_drawn, new_edges)
+            edges_drawn = new_edges
+            yield np.asarray(canvas.buffer_rgba())
+            canvas.restore_region(trail_background)
+
+    print(f"Exporting action sequence animation with {num_actions} actions as {len(frame_steps)} frames to {filename}...")
+
+    if extension == 'gif':
+        # Every frame is quantized to the palette of the finished plot, which holds all of its few colours
+        draw_frame(num_actions, 0, len(edge_points))
+        palette = Image.fromarray(np.asarray(canvas.buffer_rgba())[..., :3].copy()).quantize(dither=Image.Dither.NONE)
+        frames = (Image.fromarray(frame[..., :3].copy()).quantize(palette=palette, dither=Image.Dither.NONE) for frame in render_frames())
+        next(frames).save(filename, save_all=True, append_images=frames, duration=1000 / fps, loop=0)
+    else:
+        command = [plt.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f"{width}x{height}", '-r', str(fps), '-i', '-',
+                   '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', filename]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as process:
+            for frame in render_frames():
+                process.stdin.write(frame.tobytes())
+            process.stdin.close()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to write {filename}!")
+
+    print("Action sequence animation export complete.")
+
 def plot_q_table(q_table, grid_length, grid_width, actions, title, subtitle=None, figsize=(12, 8), font_size=10, scale=(1.2, 1.2)):
     """
     Plots a Q-table as a 2D table.
@@ -248,4 +386,16 @@ def interpret_action_sequence(action_sequence, actions: dict = None) -> list:
     if actions is None:
         actions = {0: 'up', 1: 'down', 2: 'left', 3: 'right'}
     interpreted_sequence = [get_key_by_value(actions, action) for action in action_sequence]
-    return interpreted_sequence
\ No newline at end of file
+    return interpreted_sequence
+
+def print_policy_evaluation(name, evaluation):
+    """
+    Prints a one-line summary of a greedy policy evaluation.
+
+    Args:
+        name (str): Name of the policy, e.g. the algorithm that trained it.
+        evaluation (dict): The dictionary returned by GreedyPolicy.evaluate.
+    """
+    non_goal_states = evaluation['success'].size - 1
+    print(f"{name} Greedy Policy: {evaluation['success_rate']:.1%} of {non_goal_states} start states reach the goal, "
+          f"mean path length {evaluation['mean_path_length']:.2f}, {int(evaluation['loops'].sum())} states on loops")
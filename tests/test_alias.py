@@ -0,0 +1,47 @@
+"""
+Tests for the vectorized alias tables in alias.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from alias import AliasTable
+
+
+class AliasTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.weights = np.array([[0.8, 0.1, 0.1, 0.0], [0.0, 0.5, 0.5, 0.0], [1.0, 2.0, 3.0, 4.0], [0.0, 0.0, 0.0, 7.0]])
+        self.probabilities = self.weights / self.weights.sum(axis=1, keepdims=True)
+        self.table = AliasTable(self.weights)
+
+    def test_tables_reproduce_the_probabilities(self):
+        np.testing.assert_allclose(self.table.get_probabilities(), self.probabilities, atol=1e-12)
+
+    def test_sample_frequencies_within_tolerance(self):
+        np.random.seed(0)
+        draws = 200000
+        for row, probabilities in enumerate(self.probabilities):
+            outcomes = self.table.sample(np.full(draws, row))
+            frequencies = np.bincount(outcomes, minlength=len(probabilities)) / draws
+            tolerance = 4 * np.sqrt(probabilities * (1 - probabilities) / draws) + 1e-12 # Four standard errors
+            self.assertTrue(np.all(np.abs(frequencies - probabilities) <= tolerance), (row, frequencies))
+
+    def test_sample_one_never_draws_impossible_outcomes(self):
+        np.random.seed(1)
+        outcomes = {self.table.sample_one(1) for _ in range(2000)}
+        self.assertEqual(outcomes, {1, 2})
+        self.assertEqual({self.table.sample_one(3) for _ in range(100)}, {3})
+
+    def test_rejects_invalid_weights(self):
+        for weights in (np.ones(3), np.array([[0.5, -0.1]]), np.array([[0.0, 0.0]])):
+            with self.assertRaises(ValueError):
+                AliasTable(weights)
+
+
+if __name__ == "__main__":
+    unittest.main()
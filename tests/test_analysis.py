@@ -0,0 +1,85 @@
+"""
+Tests for the run analysis in analysis.py.
+"""
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from analysis import parse_thresholds, metric_of, summarize_runs, run_analysis_cli
+from utils import save_training_data_set_to_csv, save_training_data_to_csv
+
+
+class ThresholdTest(unittest.TestCase):
+
+    def test_parses_per_metric_thresholds_and_directions(self):
+        thresholds = parse_thresholds(['total_rewards=30:above', 'steps_taken=40:below', '5'])
+        self.assertEqual(thresholds, {'total_rewards': (30.0, False), 'steps_taken': (40.0, True), None: (5.0, False)})
+
+    def test_default_direction_applies_only_without_suffix(self):
+        thresholds = parse_thresholds(['steps_taken=40', 'total_rewards=-2.5:above'], below=True)
+        self.assertEqual(thresholds, {'steps_taken': (40.0, True), 'total_rewards': (-2.5, False)})
+
+    def test_rejects_bad_entries(self):
+        for entry in ('total_rewards=abc', 'total_rewards=30:sideways', ''):
+            with self.assertRaises(ValueError):
+                parse_thresholds([entry])
+
+    def test_metric_of_label(self):
+        self.assertEqual(metric_of('total_rewards_Q-Learning'), 'total_rewards')
+        self.assertEqual(metric_of('steps_taken_N-Step-Q-Learning'), 'steps_taken')
+
+    def test_summary_direction(self):
+        rewards = np.array([[0.0, 10.0, 20.0, 40.0]])
+        steps = np.array([[90.0, 60.0, 30.0, 10.0]])
+        self.assertEqual(summarize_runs(rewards, 1, 15.0)['episodes_to_threshold_mean'], 3)
+        self.assertEqual(summarize_runs(steps, 1, 35.0, below=True)['episodes_to_threshold_mean'], 3)
+
+    def test_cli_applies_each_metric_its_own_threshold(self):
+        with tempfile.TemporaryDirectory() as directory:
+            files = []
+            for metric, values in (('total_rewards', [0, 10, 20, 40]), ('steps_taken', [90, 60, 30, 10])):
+                filename = os.path.join(directory, f"{metric}_Q-Learning.csv")
+                with open(filename, 'w', newline='') as file:
+                    writer = csv.writer(file)
+                    writer.writerow(['Episode', 'Value'])
+                    writer.writerows(enumerate(values))
+                files.append(filename)
+
+            output = os.path.join(directory, "analysis")
+            run_analysis_cli(files + ['--window', '1', '--threshold', 'total_rewards=15:above',
+                                      '--threshold', 'steps_taken=35:below', '--output', output])
+            with open(os.path.join(output, "summary.csv"), newline='') as file:
+                rows = {row['Group']: row for row in csv.DictReader(file)}
+
+        self.assertEqual(float(rows['total_rewards_Q-Learning']['episodes_to_threshold_mean']), 3)
+        self.assertEqual(float(rows['steps_taken_Q-Learning']['episodes_to_threshold_mean']), 3)
+
+    def test_cli_skips_logs_that_are_not_per_episode_metrics(self):
+        # The files main writes for one algorithm, passed as a whole directory glob
+        with tempfile.TemporaryDirectory() as directory:
+            q_table = np.zeros((4, 4))
+            training_data = [[[3, 1], 9.9, 2, q_table], [[1, 3], 9.9, 2, q_table]]
+            save_training_data_to_csv(os.path.join(directory, "training_data_Q-Learning.csv"), training_data)
+            save_training_data_set_to_csv(os.path.join(directory, "total_rewards_Q-Learning.csv"), [9.9, 9.9], "Total Rewards")
+            save_training_data_set_to_csv(os.path.join(directory, "steps_taken_Q-Learning.csv"), [2, 2], "Steps Taken")
+            save_training_data_set_to_csv(os.path.join(directory, "q_table_history_Q-Learning.csv"), [q_table], "Q-table")
+            save_training_data_set_to_csv(os.path.join(directory, "interpreted_action_sequence_history_Q-Learning.csv"),
+                                          [['right', 'down'], ['down', 'right']], "Action Sequence")
+
+            output = os.path.join(directory, "analysis")
+            files = sorted(os.path.join(directory, name) for name in os.listdir(directory))
+            run_analysis_cli(files + ['--threshold', 'total_rewards=0', '--threshold', 'steps_taken=30:below', '--output', output])
+            with open(os.path.join(output, "summary.csv"), newline='') as file:
+                groups = [row['Group'] for row in csv.DictReader(file)]
+
+        self.assertEqual(groups, ['steps_taken_Q-Learning', 'total_rewards_Q-Learning'])
+
+
+if __name__ == "__main__":
+    unittest.main()
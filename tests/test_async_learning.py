@@ -0,0 +1,50 @@
+"""
+Tests for asynchronous multi-process Q-learning in async_learning.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from agent import get_actions
+from async_learning import asynchronous_Q_learning
+
+
+class AsynchronousQLearningTest(unittest.TestCase):
+
+    def test_every_worker_reaches_the_goal_in_each_lock_mode(self):
+        reward_vector = [10, -0.1, -1]
+        for lock_mode in ('none', 'striped'):
+            q_table, total_rewards, steps_taken = asynchronous_Q_learning(
+                (4, 4), (3, 3), reward_vector, get_actions(2), n_workers=3, episodes=6, alpha=0.3, gamma=0.9,
+                epsilon=0.2, agent_start=(0, 0), lock_mode=lock_mode, n_locks=4, seed=0)
+
+            self.assertEqual(q_table.shape, (16, 4))
+            self.assertEqual(total_rewards.shape, (3, 6))
+            self.assertEqual(steps_taken.shape, (3, 6))
+            # Every episode ends with the goal reward after steps - 1 moves or bumps
+            self.assertTrue(np.all(steps_taken >= 6)) # The shortest path from (0, 0) to (3, 3)
+            self.assertTrue(np.all(total_rewards <= reward_vector[0] + reward_vector[1] * (steps_taken - 1) + 1e-9))
+            self.assertTrue(np.all(total_rewards >= reward_vector[0] + reward_vector[2] * (steps_taken - 1) - 1e-9))
+            self.assertGreater(q_table.max(), 0.0) # The goal reward was backed up into the shared table
+
+    def test_seed_makes_a_single_worker_reproducible(self):
+        runs = [asynchronous_Q_learning((4, 4), (3, 3), [10, -0.1, -1], get_actions(2), n_workers=1, episodes=5,
+                                        agent_start=(0, 0), seed=3) for _ in range(2)]
+        for first, second in zip(*runs):
+            np.testing.assert_array_equal(first, second)
+
+    def test_rejects_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            asynchronous_Q_learning(actions=None)
+        with self.assertRaises(ValueError):
+            asynchronous_Q_learning(actions=get_actions(2), n_workers=0)
+        with self.assertRaises(ValueError):
+            asynchronous_Q_learning(actions=get_actions(2), lock_mode='global')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Tests for saving and resuming training checkpoints in checkpoint.py.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+import checkpoint as checkpoint_module
+from checkpoint import save_checkpoint, load_checkpoint, load_checkpoint_metadata, training_segment_filename
+from model import TabularModel
+from replay import ReplayBuffer
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def test_save_load_round_trip(self):
+        np.random.seed(7)
+        q_table = np.random.rand(9, 4)
+        training_data = [[[0, 3, 3], -0.2, 3, None], [None, 9.8, 1, q_table.copy()], [[1], 10.0, 1, None]]
+        replay_buffer = ReplayBuffer(5)
+        model = TabularModel(9, 4)
+        for step in range(7):
+            replay_buffer.push(step, step % 4, -0.1, step + 1, step == 6)
+            model.update(step, step % 4, -0.1, step + 1, step == 6)
+        model.update(0, 0, -1.0, 0, False)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "checkpoint.npz")
+            save_checkpoint(filename, 3, q_table, training_data, components={'replay_buffer': replay_buffer, 'model': model},
+                            metadata="9 states")
+            expected_draws = np.random.rand(5)
+
+            restored_buffer, restored_model = ReplayBuffer(1), TabularModel()
+            checkpoint = load_checkpoint(filename, {'replay_buffer': restored_buffer, 'model': restored_model})
+            self.assertEqual(load_checkpoint_metadata(filename), "9 states")
+            with self.assertRaises(KeyError):
+                load_checkpoint(filename, {'queue': ReplayBuffer(1)})
+
+        self.assertEqual(checkpoint['episode'], 3)
+        self.assertEqual(checkpoint['metadata'], "9 states")
+        self.assertIsNone(checkpoint['e_table'])
+        np.testing.assert_array_equal(checkpoint['q_table'], q_table)
+
+        for restored, original in zip(checkpoint['training_data'], training_data):
+            self.assertEqual(list(restored[0]), original[0] or [])
+            self.assertEqual((restored[1], restored[2]), (original[1], original[2]))
+            if original[3] is None:
+                self.assertIsNone(restored[3])
+            else:
+                np.testing.assert_array_equal(restored[3], original[3])
+
+        # Resuming the random state repeats the draws made right after saving
+        np.random.set_state(checkpoint['random_state'])
+        np.testing.assert_array_equal(np.random.rand(5), expected_draws)
+
+        np.random.seed(1)
+        expected_batch = replay_buffer.sample(20)
+        np.random.seed(1)
+        for restored_array, expected_array in zip(restored_buffer.sample(20), expected_batch):
+            np.testing.assert_array_equal(restored_array, expected_array)
+
+        for state in range(9):
+            self.assertEqual(restored_model.predecessors(state), model.predecessors(state))
+        for state, action in [(step, step % 4) for step in range(7)] + [(0, 0)]:
+            for restored_value, value in zip(restored_model.predict(state, action), model.predict(state, action)):
+                np.testing.assert_array_equal(restored_value, value)
+
+    def records(self, start, end):
+        return [[[episode % 4], -0.1 * episode, episode + 1, np.full((2, 4), float(episode)) if episode % 3 == 0 else None]
+                for episode in range(start, end)]
+
+    def assert_records_equal(self, restored_records, records):
+        self.assertEqual(len(restored_records), len(records))
+        for restored, original in zip(restored_records, records):
+            self.assertEqual(list(restored[0]), original[0])
+            self.assertEqual((restored[1], restored[2]), (original[1], original[2]))
+            if original[3] is None:
+                self.assertIsNone(restored[3])
+            else:
+                np.testing.assert_array_equal(restored[3], original[3])
+
+    def test_incremental_segments_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "checkpoint.npz")
+            training_data, saved_episodes = [], 0
+            for end in (4, 8, 11):
+                training_data += self.records(len(training_data), end)
+                save_checkpoint(filename, end, np.zeros((2, 4)), training_data, saved_episodes=saved_episodes)
+                saved_episodes = len(training_data)
+
+            # Each checkpoint wrote only its own episodes
+            for start, end in ((0, 4), (4, 8), (8, 11)):
+                self.assertTrue(os.path.exists(training_segment_filename(filename, start, end)))
+            with np.load(filename) as data:
+                self.assertFalse(any(key.startswith("training_") for key in data.files))
+
+            checkpoint = load_checkpoint(filename)
+            self.assertEqual(checkpoint['episode'], 11)
+            self.assert_records_equal(checkpoint['training_data'], self.records(0, 11))
+
+            # A segment written just before a crash is ignored, the checkpoint still lists the first 11 episodes
+            checkpoint_module._atomic_savez(training_segment_filename(filename, 11, 13), checkpoint_module.pack_training_data(self.records(11, 13)))
+            self.assert_records_equal(load_checkpoint(filename)['training_data'], self.records(0, 11))
+
+            # Resumed from a checkpoint that holds all of its training data, the next one starts over from episode 0
+            save_checkpoint(filename, 11, np.zeros((2, 4)), self.records(0, 11))
+            save_checkpoint(filename, 13, np.zeros((2, 4)), self.records(0, 13), saved_episodes=11)
+            self.assertTrue(os.path.exists(training_segment_filename(filename, 0, 13)))
+            self.assert_records_equal(load_checkpoint(filename)['training_data'], self.records(0, 13))
+
+            os.remove(training_segment_filename(filename, 0, 13))
+            with self.assertRaises(FileNotFoundError):
+                load_checkpoint(filename)
+
+    def test_files_reach_the_disk_before_they_replace_the_old_ones(self):
+        calls = []
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(checkpoint_module.os, 'fsync', side_effect=lambda fd: calls.append('fsync')), \
+                mock.patch.object(checkpoint_module.os, 'replace', side_effect=lambda *args: calls.append('replace')):
+            save_checkpoint(os.path.join(directory, "checkpoint.npz"), 2, np.zeros((2, 4)), self.records(0, 2), saved_episodes=0)
+        self.assertEqual(calls, ['fsync', 'replace', 'fsync', 'replace']) # The segment, then the checkpoint
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for the N-dimensional GridWorld in grid_world.py and the Agent in agent.py.
+"""
+import itertools
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from agent import Agent, get_action_moves, get_actions
+from grid_world import GridWorld, slip_action_probabilities
+
+
+class ActionTest(unittest.TestCase):
+
+    def test_action_names_per_dimension(self):
+        self.assertEqual(get_actions(2), {'up': 0, 'down': 1, 'left': 2, 'right': 3})
+        self.assertEqual(list(get_actions(3))[4:], ['backward', 'forward'])
+        self.assertEqual(list(get_actions(4))[6:], ['axis3-', 'axis3+'])
+        self.assertEqual(get_action_moves(3)[5], ('forward', 2, 1))
+
+
+class GridWorld3DTest(unittest.TestCase):
+
+    def setUp(self):
+        self.environment = GridWorld((3, 4, 2), goal=(2, 3, 1), reward_vector=[10, -0.1, -1])
+
+    def test_index_position_round_trip(self):
+        for index in range(self.environment.get_num_states()):
+            position = self.environment.index_to_position(index)
+            self.assertEqual(self.environment.position_to_index(position), index)
+            self.assertEqual(position, tuple(int(coordinate) for coordinate in np.unravel_index(index, (3, 4, 2))))
+        self.assertEqual(self.environment.get_num_states(), 24)
+
+    def test_moves_along_every_axis(self):
+        self.environment.reset((1, 1, 0))
+        for action, position in (('forward', (1, 1, 1)), ('right', (2, 1, 1)), ('down', (2, 2, 1)),
+                                 ('backward', (2, 2, 0)), ('left', (1, 2, 0)), ('up', (1, 1, 0))):
+            reward, done = self.environment.step_agent(action)
+            self.assertEqual((reward, done), (-0.1, False))
+            self.assertEqual(self.environment.index_to_position(self.environment.get_state_index()), position)
+
+        # Actions can also be given by index
+        self.environment.step_agent(get_actions(3)['forward'])
+        self.assertEqual(self.environment.index_to_position(self.environment.get_state_index()), (1, 1, 1))
+
+    def test_invalid_moves_at_the_boundary(self):
+        for position in itertools.product(range(3), range(4), range(2)):
+            for action, (name, axis, delta) in enumerate(get_action_moves(3)):
+                self.environment.reset(position)
+                reward, _ = self.environment.step_agent(name)
+                inside = 0 <= position[axis] + delta < (3, 4, 2)[axis]
+                expected = position[:axis] + (position[axis] + delta,) + position[axis + 1:] if inside else position
+                self.assertEqual(self.environment.index_to_position(self.environment.get_state_index()), expected)
+                if not inside and position != self.environment.get_goal(): # Staying on the goal still pays the goal reward
+                    self.assertEqual(reward, -1)
+
+                agent = Agent(position)
+                self.assertEqual(agent.move(name, (3, 4, 2)), inside)
+                self.assertEqual(agent.position, expected)
+
+    def test_unknown_actions_are_invalid_moves(self):
+        self.environment.reset((0, 0, 0))
+        self.assertEqual(self.environment.step_agent('axis3+'), (-1, False))
+        self.assertEqual(self.environment.get_state_index(), 0)
+        self.assertFalse(Agent((0, 0, 0)).move('sideways', (3, 4, 2)))
+
+    def test_reaching_the_goal(self):
+        self.environment.reset((2, 3, 0))
+        self.assertEqual(self.environment.step_agent('forward'), (10, True))
+
+
+class StochasticDynamicsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.environment = GridWorld((200, 300))
+        self.action_probabilities = slip_action_probabilities(2, 0.2, get_actions(2)['down'], 0.1)
+
+    def test_shared_probabilities_are_not_copied_per_state(self):
+        self.environment.set_stochastic_dynamics(self.action_probabilities)
+        self.assertEqual(self.environment.get_action_probabilities().shape, (4, 4))
+
+        states = np.random.default_rng(0).integers(0, self.environment.get_num_states(), 200000)
+        np.random.seed(0)
+        executed = self.environment.sample_executed_actions(states, np.full(len(states), get_actions(2)['right']))
+        frequencies = np.bincount(executed, minlength=4) / len(executed)
+        np.testing.assert_allclose(frequencies, self.action_probabilities[get_actions(2)['right']], atol=0.01)
+
+    def test_shared_and_per_state_probabilities_sample_alike(self):
+        states = np.random.default_rng(1).integers(0, self.environment.get_num_states(), 1000)
+        actions = np.random.default_rng(2).integers(0, 4, 1000)
+        samples = []
+        for action_probabilities in (self.action_probabilities,
+                                     np.broadcast_to(self.action_probabilities, (self.environment.get_num_states(), 4, 4))):
+            self.environment.set_stochastic_dynamics(action_probabilities)
+            np.random.seed(3)
+            samples.append(self.environment.sample_executed_actions(states, actions))
+        np.testing.assert_array_equal(samples[0], samples[1])
+
+    def test_rejects_mismatched_shapes(self):
+        for shape in ((4, 6), (10, 4, 4)):
+            with self.assertRaises(ValueError):
+                self.environment.set_stochastic_dynamics(np.full(shape, 0.25))
+
+    def test_deterministic_dynamics_can_be_restored(self):
+        self.environment.set_stochastic_dynamics(self.action_probabilities)
+        self.environment.set_stochastic_dynamics(None)
+        self.assertIsNone(self.environment.get_action_probabilities())
+        self.environment.reset((0, 0))
+        for _ in range(20):
+            self.environment.step_agent('right')
+        self.assertEqual(self.environment.index_to_position(self.environment.get_state_index()), (20, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for the learning algorithms in learning.py.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from grid_world import GridWorld
+from replay import ReplayBuffer
+from model import TabularModel
+from priority_queue import IndexedMaxHeap
+from learning import (Q_learning_batch_update, prioritized_sweeping_update, Q_learning_episode, n_step_Q_learning_episode,
+                      epsilon_greedy_selection)
+
+
+class QLearningBatchUpdateTest(unittest.TestCase):
+
+    def test_duplicates_are_averaged(self):
+        q_table = np.zeros((4, 4))
+        states, actions = np.array([1, 1, 1, 2]), np.array([3, 3, 3, 0])
+        rewards, next_states, dones = np.array([10.0, 10.0, 4.0, -1.0]), np.array([3, 3, 3, 3]), np.ones(4, dtype=bool)
+
+        Q_learning_batch_update(states, actions, rewards, next_states, dones, q_table, alpha=0.5, gamma=0.9)
+
+        self.assertAlmostEqual(q_table[1, 3], 0.5 * 8.0) # Mean of the three TD errors, applied once
+        self.assertAlmostEqual(q_table[2, 0], 0.5 * -1.0)
+        self.assertEqual(np.count_nonzero(q_table), 2)
+
+    def test_single_transition_replayed_many_times_converges(self):
+        # A buffer holding one terminal transition, sampled with replacement far more often than 1 / alpha
+        replay_buffer = ReplayBuffer(10)
+        replay_buffer.push(0, 1, 10.0, 1, True)
+        q_table = np.zeros((2, 4))
+
+        values = []
+        for _ in range(100):
+            Q_learning_batch_update(*replay_buffer.sample(50), q_table, alpha=0.15, gamma=0.95)
+            values.append(q_table[0, 1])
+
+        self.assertTrue(np.all(np.diff(values) > 0)) # Moves towards the target without overshooting
+        self.assertTrue(np.all(np.array(values) <= 10.0))
+        self.assertAlmostEqual(values[-1], 10.0, places=3)
+
+
+class PrioritizedSweepingUpdateTest(unittest.TestCase):
+
+    def test_real_transition_is_learned_without_planning(self):
+        q_table = np.zeros((9, 4))
+        prioritized_sweeping_update(7, 3, 10.0, 8, True, q_table, TabularModel(9, 4), IndexedMaxHeap(36), alpha=0.5, gamma=0.9, planning_steps=0)
+
+        self.assertAlmostEqual(q_table[7, 3], 5.0)
+
+    def test_settled_pairs_leave_the_queue(self):
+        q_table = np.zeros((9, 4))
+        model, queue = TabularModel(9, 4), IndexedMaxHeap(36)
+        for _ in range(200): # The same terminal transition until its TD error falls below theta
+            prioritized_sweeping_update(7, 3, 10.0, 8, True, q_table, model, queue, alpha=0.5, gamma=0.9, planning_steps=0, theta=1e-4)
+
+        self.assertAlmostEqual(q_table[7, 3], 10.0)
+        self.assertEqual(len(queue), 0)
+
+    def test_planning_uses_the_expected_outcome(self):
+        # Action 3 in state 4 reaches the terminal state 5 half of the time and stays put otherwise
+        q_table = np.zeros((9, 4))
+        model, queue = TabularModel(9, 4), IndexedMaxHeap(36)
+        model.update(4, 3, 10.0, 5, True)
+        model.update(4, 3, 0.0, 4, False)
+        prioritized_sweeping_update(4, 3, 0.0, 4, False, q_table, model, queue, alpha=1.0, gamma=0.5, planning_steps=1)
+
+        # Direct backup of the real step leaves 0, the planning backup moves to the mean reward of the three outcomes
+        self.assertAlmostEqual(q_table[4, 3], 10.0 / 3)
+
+
+class NStepQLearningEpisodeTest(unittest.TestCase):
+
+    def run_episodes(self, episode_function, *args):
+        np.random.seed(0)
+        environment = GridWorld((6, 6), goal=(5, 5), reward_vector=[10, -0.1, -1])
+        q_table = np.zeros((environment.get_num_states(), 4))
+        steps = []
+        for _ in range(20):
+            _, _, steps_taken, _ = episode_function(environment, None, environment.get_actions(), q_table, epsilon_greedy_selection,
+                                                    {'q_table': q_table, 'epsilon': 0.2}, 0.3, 0.9, *args, (0, 0), (False, True, True, False))
+            steps.append(steps_taken)
+        return q_table, steps
+
+    def test_one_step_equals_Q_learning(self):
+        q_table, steps = self.run_episodes(Q_learning_episode)
+        n_step_q_table, n_step_steps = self.run_episodes(n_step_Q_learning_episode, 1)
+
+        self.assertEqual(steps, n_step_steps)
+        np.testing.assert_allclose(n_step_q_table, q_table, rtol=1e-12)
+
+    def test_matches_reference_n_step_updates(self):
+        # Script a fixed action sequence and apply the textbook n-step updates to a copy of the Q-table
+        n_step, alpha, gamma = 3, 0.5, 0.9
+        script = [0, 3, 3, 1, 2, 1, 3] # A bump into the top wall, then a detour ending on the goal of a 3x3 grid
+        environment = GridWorld((3, 3), goal=(2, 2), reward_vector=[10, -0.1, -1])
+        q_table = np.random.default_rng(0).random((9, 4))
+        reference = q_table.copy()
+
+        scripted = iter(script)
+        selection = lambda state, q_table=None: next(scripted)
+        environment.reset((0, 0))
+        states, rewards, done = [environment.get_state_index()], [], False
+        for action in script:
+            reward, done = environment.step_agent(['up', 'down', 'left', 'right'][action])
+            states.append(environment.get_state_index())
+            rewards.append(reward)
+        self.assertTrue(done)
+
+        for t in range(len(script)):
+            end = min(t + n_step, len(script))
+            target = sum(gamma**i * rewards[t + i] for i in range(end - t))
+            if end < len(script):
+                target += gamma**n_step * np.max(reference[states[end]])
+            reference[states[t], script[t]] += alpha * (target - reference[states[t], script[t]])
+
+        scripted = iter([script[0]] + script) # The first action is drawn once to check the selection function
+        n_step_Q_learning_episode(environment, None, environment.get_actions(), q_table, selection, {'q_table': q_table},
+                                  alpha, gamma, n_step, (0, 0), (False, True, True, False))
+        np.testing.assert_allclose(q_table, reference, rtol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
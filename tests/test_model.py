@@ -0,0 +1,66 @@
+"""
+Tests for the tabular environment model in model.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from model import TabularModel
+
+
+class TabularModelTest(unittest.TestCase):
+
+    def test_checkpoint_round_trip_keeps_outcome_and_predecessor_order(self):
+        model = TabularModel(64, 4)
+        rng = np.random.default_rng(0)
+        states = np.concatenate((np.repeat(np.arange(64), 4), rng.integers(0, 64, 500))) # Every pair at least once
+        actions = np.concatenate((np.tile(np.arange(4), 64), rng.integers(0, 4, 500)))
+        for state, action, next_state in zip(states, actions, rng.integers(0, 64, len(states))):
+            model.update(int(state), int(action), -1.0, int(next_state), False)
+
+        restored = TabularModel(64, 4)
+        restored.set_checkpoint_arrays({name: np.array(value) for name, value in model.get_checkpoint_arrays().items()})
+
+        for state in range(64):
+            self.assertEqual(restored.predecessors(state), model.predecessors(state))
+            for action in range(4):
+                expected, actual = model.predict(state, action), restored.predict(state, action)
+                self.assertEqual(actual[0], expected[0])
+                for expected_array, actual_array in zip(expected[1:], actual[1:]):
+                    np.testing.assert_array_equal(actual_array, expected_array)
+
+    def test_stochastic_outcomes_are_counted(self):
+        model = TabularModel(9, 4)
+        for next_state, reward in [(4, -1.0), (4, -1.0), (3, -5.0), (4, -1.0)]:
+            model.update(1, 2, reward, next_state, False)
+
+        reward, next_states, probabilities, dones = model.predict(1, 2)
+        self.assertAlmostEqual(reward, -2.0)
+        self.assertEqual(next_states.tolist(), [4, 3])
+        np.testing.assert_allclose(probabilities, [0.75, 0.25])
+        self.assertFalse(dones.any())
+        self.assertEqual(sorted(model.predecessors(4) + model.predecessors(3)), [(1, 2), (1, 2)])
+
+    def test_predictions_follow_updates(self):
+        model = TabularModel(9, 4)
+        model.update(7, 3, -1.0, 8, False)
+        self.assertEqual(model.predict(7, 3)[1].tolist(), [8])
+
+        model.update(5, 1, 9.0, 8, True) # State 8 turns out to be terminal
+        model.update(7, 3, -1.0, 7, False)
+        _, next_states, probabilities, dones = model.predict(7, 3)
+        self.assertEqual(next_states.tolist(), [8, 7])
+        np.testing.assert_allclose(probabilities, [0.5, 0.5])
+        self.assertEqual(dones.tolist(), [True, False])
+
+    def test_unobserved_pair_raises(self):
+        with self.assertRaises(KeyError):
+            TabularModel(9, 4).predict(0, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
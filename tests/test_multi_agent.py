@@ -0,0 +1,95 @@
+"""
+Tests for the multi-agent GridWorld in multi_agent.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from learning import Q_learning_batch_update
+from multi_agent import MultiAgentGridWorld, _agent_q_rows
+
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+
+
+class MultiAgentQLearningTest(unittest.TestCase):
+
+    def test_shared_pair_moves_by_alpha_once(self):
+        # Four agents backing up the same terminal pair of a shared table in one step
+        q_table = np.zeros((9, 4))
+        agent_ids = np.arange(4)
+        q_rows, rows = _agent_q_rows(q_table, np.full(4, 7), agent_ids)
+        Q_learning_batch_update(rows, np.full(4, 3), np.full(4, 10.0), np.full(4, 8), np.ones(4, dtype=bool), q_rows, alpha=0.5, gamma=0.9)
+
+        self.assertAlmostEqual(q_table[7, 3], 5.0)
+
+    def test_per_agent_tables_stay_separate(self):
+        q_table = np.zeros((2, 9, 4))
+        q_rows, rows = _agent_q_rows(q_table, np.array([7, 7]), np.array([0, 1]))
+        Q_learning_batch_update(rows, np.array([3, 3]), np.array([10.0, 4.0]), np.array([8, 8]), np.ones(2, dtype=bool), q_rows, alpha=0.5, gamma=0.9)
+
+        self.assertAlmostEqual(q_table[0, 7, 3], 5.0)
+        self.assertAlmostEqual(q_table[1, 7, 3], 2.0)
+
+
+class MultiAgentStepTest(unittest.TestCase):
+
+    def step(self, positions, actions):
+        environment = MultiAgentGridWorld((5, 5), len(positions), goal=(4, 4), reward_vector=[10, -0.1, -1], collision_reward=-5)
+        environment.reset(agent_positions=positions)
+        rewards, reached = environment.step_agents(np.array(actions))
+        return environment, rewards, reached
+
+    def assert_positions(self, environment, positions):
+        np.testing.assert_array_equal(environment.get_agent_positions(), np.array(positions))
+
+    def test_swapping_agents_both_stay(self):
+        environment, rewards, _ = self.step([(1, 1), (2, 1)], [RIGHT, LEFT])
+        self.assert_positions(environment, [(1, 1), (2, 1)])
+        np.testing.assert_array_equal(rewards, [-5, -5])
+
+    def test_chain_into_a_staying_agent_stays(self):
+        # The front agent bumps into the top wall, so the two agents behind it are blocked one after the other
+        environment, rewards, _ = self.step([(0, 0), (1, 0), (2, 0)], [RIGHT, RIGHT, UP])
+        self.assert_positions(environment, [(0, 0), (1, 0), (2, 0)])
+        np.testing.assert_array_equal(rewards, [-5, -5, -1])
+        self.assertEqual(environment.get_occupancy()[2, 0], 2)
+
+    def test_chain_behind_a_moving_agent_moves(self):
+        environment, rewards, _ = self.step([(0, 3), (1, 3)], [RIGHT, RIGHT])
+        self.assert_positions(environment, [(1, 3), (2, 3)])
+        np.testing.assert_allclose(rewards, [-0.1, -0.1])
+        occupancy = environment.get_occupancy()
+        self.assertEqual((occupancy[0, 3], occupancy[1, 3], occupancy[2, 3]), (-1, 0, 1))
+
+    def test_shared_target_cell_blocks_everyone(self):
+        environment, rewards, _ = self.step([(1, 2), (3, 2), (2, 0)], [RIGHT, LEFT, RIGHT])
+        self.assert_positions(environment, [(1, 2), (3, 2), (3, 0)])
+        np.testing.assert_allclose(rewards, [-5, -5, -0.1])
+
+    def test_agents_leave_at_the_goal(self):
+        # Two agents enter the goal together and a third follows into a cell vacated in the same step
+        environment, rewards, reached = self.step([(3, 4), (4, 3), (2, 4)], [RIGHT, DOWN, RIGHT])
+        self.assert_positions(environment, [(4, 4), (4, 4), (3, 4)])
+        np.testing.assert_allclose(rewards, [10, 10, -0.1])
+        np.testing.assert_array_equal(reached, [True, True, False])
+        np.testing.assert_array_equal(environment.get_active(), [False, False, True])
+        self.assertEqual(environment.get_occupancy()[4, 4], -1) # Agents at the goal no longer occupy it
+
+        rewards, reached = environment.step_agents(np.array([LEFT, LEFT, RIGHT]))
+        np.testing.assert_allclose(rewards, [0, 0, 10]) # Finished agents are ignored
+        np.testing.assert_array_equal(reached, [False, False, True])
+        self.assertTrue(environment.is_done())
+
+    def test_reset_rejects_invalid_positions(self):
+        environment = MultiAgentGridWorld((3, 3), 2, goal=(2, 2))
+        for positions in ([(0, 0), (0, 0)], [(0, 0), (2, 2)], [(0, 0)]):
+            with self.assertRaises(ValueError):
+                environment.reset(agent_positions=positions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the coarse-to-fine training helpers in multi_resolution.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from grid_world import GridWorld, slip_action_probabilities
+from multi_resolution import coarsen_grid_world, upsample_q_table, multi_resolution_Q_learning
+
+
+class CoarsenGridWorldTest(unittest.TestCase):
+
+    def test_deterministic_grid_stays_deterministic(self):
+        self.assertIsNone(coarsen_grid_world(GridWorld((9, 10)), 4).get_action_probabilities())
+
+    def test_shared_dynamics_are_carried_over(self):
+        grid_world = GridWorld((9, 10))
+        action_probabilities = slip_action_probabilities(2, 0.2, grid_world.get_actions()['down'], 0.1)
+        grid_world.set_stochastic_dynamics(action_probabilities)
+
+        coarse_world = coarsen_grid_world(grid_world, 4)
+
+        self.assertEqual(coarse_world.get_grid_dim(), (3, 3))
+        np.testing.assert_allclose(coarse_world.get_action_probabilities(), action_probabilities)
+
+    def test_per_state_dynamics_are_averaged_per_block(self):
+        grid_world = GridWorld((6, 6))
+        action_probabilities = np.random.default_rng(0).dirichlet(np.ones(4), size=(36, 4))
+        grid_world.set_stochastic_dynamics(action_probabilities)
+
+        coarse_world = coarsen_grid_world(grid_world, 3)
+
+        block = action_probabilities.reshape(6, 6, 4, 4)[3:, :3].mean(axis=(0, 1)) # Coarse cell (1, 0)
+        np.testing.assert_allclose(coarse_world.get_action_probabilities()[2], block)
+
+    def test_goal_reward_scales_with_the_number_of_cells(self):
+        coarse_world = coarsen_grid_world(GridWorld((8, 8), reward_vector=[64, -1, -5]), 2)
+
+        self.assertEqual(list(coarse_world.get_reward_vector()), [16, -1, -5])
+
+
+class MultiResolutionQLearningTest(unittest.TestCase):
+
+    def test_start_in_the_goal_block_still_trains(self):
+        np.random.seed(0)
+        grid_world = GridWorld((8, 8), reward_vector=[64, -1, -5])
+        _, _, steps_taken = multi_resolution_Q_learning(grid_world, (4, 1), 5, 0.1, 0.1, 0.9, agent_start=(6, 6))
+
+        self.assertTrue(np.all(steps_taken[0] > 0))
+
+    def test_single_cell_level_is_rejected(self):
+        with self.assertRaises(ValueError):
+            multi_resolution_Q_learning(GridWorld((4, 4)), (4, 1), 5, agent_start=(0, 0))
+
+
+class UpsampleQTableTest(unittest.TestCase):
+
+    def test_fine_cells_copy_their_coarse_cell(self):
+        coarse_q_table = np.arange(4 * 4, dtype=float).reshape(4, 4) # 2x2 coarse grid
+        fine_q_table = upsample_q_table(coarse_q_table, (2, 2), (3, 4), 2)
+
+        self.assertEqual(fine_q_table.shape, (12, 4))
+        np.testing.assert_array_equal(fine_q_table[2 * 4 + 3], coarse_q_table[1 * 2 + 1]) # Fine (2, 3) lies in coarse (1, 1)
+        fine_q_table[0] = -1
+        self.assertEqual(coarse_q_table[0, 0], 0) # A copy, not a view
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for the compiled greedy policy in policy.py.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from grid_world import GridWorld
+from policy import GreedyPolicy
+
+
+class GreedyPolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        # Move right until the last column, then down to the goal, except for (0, 0) which bumps into the top wall
+        self.environment = GridWorld((4, 4), goal=(3, 3), reward_vector=[10, -0.1, -1])
+        q_table = np.zeros((16, 4))
+        for state in range(16):
+            x, _ = self.environment.index_to_position(state)
+            q_table[state, 1 if x == 3 else 3] = 1.0
+        q_table[0, 0] = 2.0
+        self.q_table = q_table
+        self.policy = GreedyPolicy.from_q_table(q_table, (4, 4))
+
+    def test_evaluate_matches_path_lengths_and_loops(self):
+        evaluation = self.policy.evaluate(self.environment)
+        x, y = np.indices((4, 4))
+        expected = (3 - x) + (3 - y)
+        expected[0, 0] = -1
+
+        np.testing.assert_array_equal(evaluation['path_lengths'], expected)
+        self.assertTrue(evaluation['loops'][0, 0])
+        self.assertEqual(int(evaluation['loops'].sum()), 1)
+        self.assertAlmostEqual(evaluation['success_rate'], 14 / 15)
+        self.assertAlmostEqual(evaluation['returns'][2, 3], 10.0) # One step onto the goal
+        self.assertAlmostEqual(evaluation['returns'][0, 3], -0.1 * 2 + 10.0)
+
+    def test_save_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "policy")
+            self.policy.save(filename)
+            loaded = GreedyPolicy.load(filename, mmap=False)
+
+        positions = np.array([[0, 0], [3, 1], [1, 2]])
+        np.testing.assert_array_equal(loaded.select_actions(positions), [0, 1, 3])
+        np.testing.assert_array_equal(loaded.get_values(positions), [2.0, 1.0, 1.0])
+        self.assertEqual(loaded(self.environment.position_to_index((3, 1))), 1)
+        np.testing.assert_array_equal(loaded.select_actions_by_index(np.arange(16)), np.argmax(self.q_table, axis=1))
+
+    def test_positions_outside_the_grid_raise(self):
+        self.assertEqual(self.policy.select_action((3, 1)), 1)
+        for position in ((-1, 0), (0, -1), (4, 0), (0, 4)):
+            with self.assertRaises(ValueError):
+                self.policy.select_action(position)
+            with self.assertRaises(ValueError):
+                self.policy.select_actions(np.array([[0, 0], position]))
+            with self.assertRaises(ValueError):
+                self.policy.get_values(np.array([position]))
+        for states in ([-1], [16]):
+            with self.assertRaises(ValueError):
+                self.policy.select_actions_by_index(np.array(states))
+
+    def test_positions_must_match_the_grid_dimensions(self):
+        for positions in (np.array([0, 0]), np.array([[0, 0, 0]])):
+            with self.assertRaises(ValueError):
+                self.policy.select_actions(positions)
+        self.assertEqual(self.policy.select_actions(np.empty((0, 2), dtype=int)).shape, (0,))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for the indexed max-heap in priority_queue.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from priority_queue import IndexedMaxHeap
+
+
+class IndexedMaxHeapTest(unittest.TestCase):
+
+    def test_pops_in_priority_order_after_updates(self):
+        rng = np.random.default_rng(0)
+        heap = IndexedMaxHeap(100)
+        priorities = {}
+        for item, priority in zip(rng.integers(0, 100, 400), rng.random(400)):
+            heap.update(int(item), float(priority)) # Inserts, increase-key and decrease-key
+            priorities[int(item)] = float(priority)
+
+        popped = [heap.pop() for _ in range(len(heap))]
+
+        self.assertEqual(popped, sorted(priorities.items(), key=lambda pair: -pair[1]))
+        self.assertEqual(len(heap), 0)
+
+    def test_remove_keeps_heap_order(self):
+        rng = np.random.default_rng(1)
+        heap = IndexedMaxHeap(50)
+        priorities = dict(enumerate(rng.random(50).tolist()))
+        for item, priority in priorities.items():
+            heap.update(item, priority)
+
+        for item in rng.permutation(50)[:20].tolist():
+            heap.remove(item)
+            del priorities[item]
+            self.assertNotIn(item, heap)
+
+        popped = [heap.pop() for _ in range(len(heap))]
+        self.assertEqual(popped, sorted(priorities.items(), key=lambda pair: -pair[1]))
+
+    def test_missing_items_raise(self):
+        heap = IndexedMaxHeap(4)
+        with self.assertRaises(KeyError):
+            heap.remove(2)
+        with self.assertRaises(IndexError):
+            heap.pop()
+
+    def test_checkpoint_round_trip(self):
+        heap = IndexedMaxHeap(10)
+        for item, priority in [(3, 0.5), (7, 2.0), (1, 1.0)]:
+            heap.update(item, priority)
+
+        restored = IndexedMaxHeap(10)
+        restored.set_checkpoint_arrays({name: np.array(value) for name, value in heap.get_checkpoint_arrays().items()})
+
+        self.assertEqual([restored.pop() for _ in range(3)], [(7, 2.0), (1, 1.0), (3, 0.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for the rate-limited progress reporting in progress.py.
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+import unittest
+import urllib.request
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+import progress
+from progress import ProgressReporter
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+class ProgressReporterTest(unittest.TestCase):
+
+    def test_reports_are_throttled_and_written_as_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "metrics.jsonl")
+            reporter = ProgressReporter("Run", 1000, report_interval=3600, console=False, jsonl_filename=filename)
+            for episode in range(1000):
+                reporter.update(episode, -1.0, 10)
+            reporter.close()
+
+            with open(filename) as file:
+                lines = [json.loads(line) for line in file]
+
+        # The first episode reports at once, the rest are held back until close
+        self.assertEqual([line['episode'] for line in lines], [1, 1000])
+        self.assertEqual(lines[-1]['total_steps'], 10000)
+        self.assertEqual(lines[-1]['rolling_reward'], -1.0)
+
+    def test_every_episode_reports_without_interval(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "metrics.jsonl")
+            reporter = ProgressReporter("Run", 5, report_interval=0, window=2, console=False, jsonl_filename=filename)
+            for episode, reward in enumerate([1.0, 2.0, 3.0, 4.0, 5.0]):
+                reporter.update(episode, reward, 1)
+            reporter.close() # Nothing new to report
+
+            with open(filename) as file:
+                lines = [json.loads(line) for line in file]
+
+        self.assertEqual([line['episode'] for line in lines], [1, 2, 3, 4, 5])
+        self.assertEqual([line['rolling_reward'] for line in lines], [1.0, 1.5, 2.5, 3.5, 4.5])
+
+    def test_episodes_per_second_uses_the_rolling_window(self):
+        clock = FakeClock()
+        with mock.patch.object(progress.time, 'perf_counter', clock):
+            reporter = ProgressReporter("Run", report_interval=10, window=4, console=False)
+            for episode in range(10): # Two seconds per episode, reporting every fifth episode
+                clock.now += 2.0
+                reporter.update(episode, 0.0, 1)
+            self.assertAlmostEqual(reporter.get_snapshot()['episodes_per_second'], 0.5)
+
+            clock.now += 1e-6 # Closing right after a report must not divide by the short gap
+            reporter.close()
+            self.assertAlmostEqual(reporter.get_snapshot()['episodes_per_second'], 0.5)
+
+            for episode in range(10, 14): # The window forgets the slow episodes
+                clock.now += 0.25
+                reporter.update(episode, 0.0, 1)
+            reporter.close()
+            self.assertAlmostEqual(reporter.get_snapshot()['episodes_per_second'], 4.0, places=4)
+
+    def test_episodes_per_second_includes_the_oldest_episode(self):
+        clock = FakeClock()
+        with mock.patch.object(progress.time, 'perf_counter', clock):
+            reporter = ProgressReporter("Run", report_interval=10, window=4, console=False)
+            clock.now += 5.0
+            reporter.update(0, 0.0, 1)
+            clock.now += 1e-6 # A near-instant second episode, e.g. a start next to the goal
+            reporter.update(1, 0.0, 1)
+            reporter.close()
+            self.assertAlmostEqual(reporter.get_snapshot()['episodes_per_second'], 0.4, places=5)
+
+    def test_http_endpoint_serves_the_latest_snapshot(self):
+        port = free_port()
+        reporter = ProgressReporter("Run", 3, report_interval=0, console=False, http_port=port)
+        try:
+            for episode in range(3):
+                reporter.update(episode, 2.0 * episode, 5)
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as response:
+                self.assertEqual(response.headers['Content-Type'], 'application/json')
+                snapshot = json.loads(response.read())
+        finally:
+            reporter.close()
+
+        self.assertEqual(snapshot, json.loads(json.dumps(reporter.get_snapshot())))
+        self.assertEqual(snapshot['episode'], 3)
+        self.assertEqual(snapshot['rolling_reward'], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Tests for the ring replay buffer in replay.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from replay import ReplayBuffer
+
+
+class ReplayBufferTest(unittest.TestCase):
+
+    def test_overwrites_the_oldest_transitions(self):
+        buffer = ReplayBuffer(3)
+        for step in range(5):
+            buffer.push(step, step % 4, -1.0 * step, step + 1, step == 4)
+        self.assertEqual(len(buffer), 3)
+
+        np.random.seed(0)
+        states, actions, rewards, next_states, dones = buffer.sample(500)
+        self.assertEqual(set(states.tolist()), {2, 3, 4}) # Steps 0 and 1 were overwritten
+        np.testing.assert_array_equal(actions, states % 4)
+        np.testing.assert_array_equal(rewards, -1.0 * states)
+        np.testing.assert_array_equal(next_states, states + 1)
+        np.testing.assert_array_equal(dones, states == 4)
+
+    def test_empty_buffer(self):
+        buffer = ReplayBuffer(2)
+        buffer.push(0, 1, 0.0, 1, False)
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        with self.assertRaises(ValueError):
+            buffer.sample(1)
+        with self.assertRaises(ValueError):
+            ReplayBuffer(0)
+
+    def test_checkpoint_arrays_round_trip(self):
+        buffer = ReplayBuffer(4)
+        for step in range(6):
+            buffer.push(step, 1, 0.5, step + 1, False)
+        restored = ReplayBuffer(1)
+        restored.set_checkpoint_arrays(buffer.get_checkpoint_arrays())
+
+        buffer.push(9, 2, 1.0, 10, True)
+        restored.push(9, 2, 1.0, 10, True) # Continues writing at the same ring position
+        np.random.seed(3)
+        expected = buffer.sample(50)
+        np.random.seed(3)
+        for restored_array, expected_array in zip(restored.sample(50), expected):
+            np.testing.assert_array_equal(restored_array, expected_array)
+
+
+if __name__ == "__main__":
+    unittest.main()
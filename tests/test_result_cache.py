@@ -0,0 +1,63 @@
+"""
+Tests for the on-disk result cache in result_cache.py.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from result_cache import ResultCache
+
+
+def training_data(episodes: int) -> list:
+    return [[[episode % 4, 3], -1.0 * episode, episode + 2, None] for episode in range(episodes)]
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_key_ignores_order_and_includes_selection(self):
+        cache = ResultCache(tempfile.gettempdir(), code_version="test")
+        config = {'alpha': 0.15, 'grid_dim': (5, 5), 'selection': {'function': 'decaying_epsilon_greedy_Q_selection', 'epsilon': 0.1}}
+        reordered = {'selection': {'epsilon': 0.1, 'function': 'decaying_epsilon_greedy_Q_selection'}, 'grid_dim': [5, 5], 'alpha': 0.15}
+        changed = {'alpha': 0.15, 'grid_dim': (5, 5), 'selection': {'function': 'decaying_epsilon_greedy_Q_selection', 'epsilon': 0.2}}
+        self.assertEqual(cache.make_key(config), cache.make_key(reordered))
+        self.assertNotEqual(cache.make_key(config), cache.make_key(changed))
+        self.assertNotEqual(cache.make_key(config), ResultCache(tempfile.gettempdir(), code_version="other").make_key(config))
+
+    def test_put_get_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, code_version="test")
+            q_table = np.arange(12, dtype=float).reshape(6, 2)
+            key = cache.make_key({'seed': 0})
+            self.assertIsNone(cache.get(key))
+            cache.put(key, q_table, training_data(5), {'seed': 0})
+
+            result = cache.get(key)
+            self.assertIn(key, cache)
+            np.testing.assert_array_equal(result['q_table'], q_table)
+            self.assertEqual(result['config'], {'seed': 0})
+            for stored, original in zip(result['training_data'], training_data(5)):
+                self.assertEqual(list(stored[0]), original[0])
+                self.assertEqual((stored[1], stored[2], stored[3]), (original[1], original[2], None))
+
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, code_version="test")
+            keys = [cache.make_key({'seed': seed}) for seed in range(3)]
+            for age, key in zip((300, 200, 100), keys):
+                cache.put(key, np.zeros((50, 4)), training_data(10))
+                filename = os.path.join(directory, f"{key}.result.npz")
+                os.utime(filename, (os.path.getmtime(filename) - age,) * 2)
+            size = os.path.getsize(os.path.join(directory, f"{keys[0]}.result.npz"))
+
+            cache.get(keys[0]) # The oldest result becomes the most recently used
+            ResultCache(directory, 2 * size + size // 2, code_version="test").evict()
+            self.assertEqual([key in cache for key in keys], [True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for the streaming episode API in streaming.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from grid_world import GridWorld
+from learning import Q_learning_episode, Q_lambda_episode, epsilon_greedy_selection
+from replay import ReplayBuffer
+from streaming import (Transition, stream_episode, batch_transitions, q_learning_stage, q_lambda_stage, replay_stage,
+                       callback_stage, consume_stream)
+
+
+class StreamingEquivalenceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.environment = GridWorld((5, 5), goal=(4, 4), reward_vector=[10, -0.1, -1])
+        self.actions = self.environment.get_actions()
+
+    def run_episodes(self, run_episode):
+        np.random.seed(0)
+        q_table = np.zeros((self.environment.get_num_states(), len(self.actions)))
+        results = [run_episode(q_table, {'q_table': q_table, 'epsilon': 0.2}) for _ in range(15)]
+        return q_table, results
+
+    def test_q_learning_stage_matches_Q_learning_episode(self):
+        q_table, results = self.run_episodes(lambda q_table, args: Q_learning_episode(
+            self.environment, None, self.actions, q_table, epsilon_greedy_selection, args, 0.3, 0.9, (0, 0), (True, True, True, False))[:3])
+        stream_q_table, stream_results = self.run_episodes(lambda q_table, args: consume_stream(q_learning_stage(
+            stream_episode(self.environment, self.actions, epsilon_greedy_selection, args, agent_start=(0, 0)), q_table, 0.3, 0.9)))
+
+        self.assertEqual(stream_results, results)
+        self.assertEqual(np.max(np.abs(stream_q_table - q_table)), 0.0)
+
+    def test_q_lambda_stage_matches_Q_lambda_episode(self):
+        q_table, results = self.run_episodes(lambda q_table, args: Q_lambda_episode(
+            self.environment, None, self.actions, q_table, epsilon_greedy_selection, args, 0.3, 0.9, 0.5, (0, 0), (True, True, True, False))[:3])
+        stream_q_table, stream_results = self.run_episodes(lambda q_table, args: consume_stream(q_lambda_stage(
+            stream_episode(self.environment, self.actions, epsilon_greedy_selection, args, agent_start=(0, 0)), q_table, 0.3, 0.9, 0.5)))
+
+        self.assertEqual(stream_results, results)
+        self.assertEqual(np.max(np.abs(stream_q_table - q_table)), 0.0)
+
+    def test_stages_see_every_transition_in_order(self):
+        np.random.seed(1)
+        q_table = np.zeros((self.environment.get_num_states(), len(self.actions)))
+        replay_buffer, seen = ReplayBuffer(1000), []
+        transitions = stream_episode(self.environment, self.actions, epsilon_greedy_selection, {'q_table': q_table, 'epsilon': 1.0},
+                                     agent_start=(0, 0), max_steps=40)
+        action_sequence, _, steps_taken = consume_stream(callback_stage(replay_stage(transitions, replay_buffer), seen.append))
+
+        self.assertLessEqual(steps_taken, 40)
+        self.assertEqual(len(replay_buffer), steps_taken)
+        self.assertEqual([transition.action for transition in seen], action_sequence)
+        for transition, next_transition in zip(seen, seen[1:]):
+            self.assertEqual(transition.next_state, next_transition.state)
+
+
+class BatchTransitionsTest(unittest.TestCase):
+
+    def test_batches_with_partial_final_batch(self):
+        transitions = [Transition(step, step % 4, -0.1 * step, step + 1, step == 6) for step in range(7)]
+        batches = list(batch_transitions(iter(transitions), 3))
+
+        self.assertEqual([len(batch.state) for batch in batches], [3, 3, 1])
+        np.testing.assert_array_equal(np.concatenate([batch.state for batch in batches]), np.arange(7))
+        np.testing.assert_array_equal(np.concatenate([batch.action for batch in batches]), np.arange(7) % 4)
+        np.testing.assert_allclose(np.concatenate([batch.reward for batch in batches]), -0.1 * np.arange(7))
+        np.testing.assert_array_equal(np.concatenate([batch.done for batch in batches]), np.arange(7) == 6)
+        self.assertEqual(batches[0].state.dtype, np.int64)
+
+    def test_exact_multiple_and_empty_streams(self):
+        transitions = [Transition(step, 0, 0.0, step + 1, False) for step in range(4)]
+        self.assertEqual([len(batch.state) for batch in batch_transitions(transitions, 2)], [2, 2])
+        self.assertEqual(list(batch_transitions([], 2)), [])
+
+    def test_batches_do_not_share_storage(self):
+        transitions = [Transition(step, 0, 0.0, step + 1, False) for step in range(4)]
+        first, second = batch_transitions(transitions, 2)
+        np.testing.assert_array_equal(first.state, [0, 1])
+        np.testing.assert_array_equal(second.state, [2, 3])
+
+    def test_rejects_non_positive_batch_size(self):
+        for batch_size in (0, -1):
+            with self.assertRaises(ValueError):
+                next(batch_transitions([], batch_size))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Tests for the vectorized trajectory reconstruction in trajectory.py.
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+from agent import get_action_moves
+from grid_world import GridWorld
+from trajectory import reconstruct_trajectory
+
+
+class ReconstructTrajectoryTest(unittest.TestCase):
+
+    def test_matches_stepping_the_grid_world(self):
+        for grid_dim in ((4, 6), (3, 4, 2)):
+            np.random.seed(len(grid_dim))
+            names = [name for name, _, _ in get_action_moves(len(grid_dim))]
+            goal = tuple(dim - 1 for dim in grid_dim)
+            reward_vector = [10, -0.1, -1]
+            environment = GridWorld(grid_dim, goal=goal, reward_vector=reward_vector)
+            start = (0,) * len(grid_dim)
+            environment.reset(start)
+
+            action_sequence, positions, rewards = [], [start], []
+            done = False
+            while not done and len(action_sequence) < 5000:
+                action = int(np.random.randint(len(names)))
+                reward, done = environment.step_agent(names[action])
+                action_sequence.append(action)
+                positions.append(environment.index_to_position(environment.get_state_index()))
+                rewards.append(reward)
+
+            reconstructed, bumps, reconstructed_rewards = reconstruct_trajectory(action_sequence, grid_dim, start, goal, reward_vector)
+            np.testing.assert_array_equal(reconstructed, np.array(positions))
+            np.testing.assert_array_equal(reconstructed_rewards, np.array(rewards))
+            np.testing.assert_array_equal(bumps, np.array(rewards) == reward_vector[2])
+
+    def test_long_walk_along_a_wall(self):
+        # More steps than one chunk of the clipped walk, pressing into the wall most of the time
+        action_sequence = [3] * 3 + [2] * 5000 + [3] * 4
+        positions, bumps, _ = reconstruct_trajectory(action_sequence, (5, 5), (0, 0), (4, 4))
+        np.testing.assert_array_equal(positions[-1], (4, 0))
+        self.assertEqual(int(bumps.sum()), 4997)
+
+    def test_rejects_unknown_actions(self):
+        with self.assertRaises(ValueError):
+            reconstruct_trajectory([0, 4], (5, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
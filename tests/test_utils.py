@@ -0,0 +1,55 @@
+"""
+Tests for the headless animation export in utils.py.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+import utils
+from utils import export_action_sequence_animation
+
+
+class ExportActionSequenceAnimationTest(unittest.TestCase):
+
+    def test_long_gif_is_capped_at_max_frames(self):
+        action_sequence = np.random.default_rng(0).integers(0, 4, 5000).tolist()
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "episode.gif")
+            export_action_sequence_animation(action_sequence, 6, 6, filename, title="Long Episode", max_frames=40,
+                                             figsize=(3, 3), dpi=40)
+
+            self.assertTrue(os.path.exists(filename))
+            with Image.open(filename) as image:
+                self.assertEqual(image.format, 'GIF')
+                self.assertLessEqual(image.n_frames, 40)
+                self.assertGreater(image.n_frames, 20) # Every frame shows a new step counter, so few are merged
+
+    def test_short_gif_has_one_frame_per_step(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "episode.gif")
+            export_action_sequence_animation([3, 1, 3, 1], 3, 3, filename, max_frames=40, figsize=(3, 3), dpi=40)
+            with Image.open(filename) as image:
+                self.assertEqual(image.n_frames, 5) # The start and each of the four steps
+
+    def test_mp4_without_ffmpeg_is_a_clear_error(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "episode.mp4")
+            with mock.patch.object(utils.animation.writers, 'is_available', return_value=False):
+                with self.assertRaisesRegex(RuntimeError, "ffmpeg"):
+                    export_action_sequence_animation([3, 1], 3, 3, filename)
+            self.assertFalse(os.path.exists(filename))
+
+    def test_rejects_unknown_formats(self):
+        with self.assertRaises(ValueError):
+            export_action_sequence_animation([3, 1], 3, 3, "episode.avi")
+
+
+if __name__ == "__main__":
+    unittest.main()